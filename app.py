@@ -1,13 +1,11 @@
 import os
 import secrets
-from flask import Flask, g
-from extensions import db, login_manager, migrate
-from werkzeug.security import generate_password_hash
-from models.models import User, ParkingLot, Booking  # Import here for app-wide access
-
-admin_check_done = False  # Global flag to avoid multiple inserts
+from flask import Flask
+from extensions import db, login_manager
 
 def create_app():
+    from services import init_response_cache, init_search_index, init_spot_index, init_user_cache, initialize_database
+
     app = Flask(__name__)
     
     # Use environment variable for SECRET_KEY, fallback to generated key for development
@@ -23,11 +21,54 @@ def create_app():
     app.config['SQLALCHEMY_DATABASE_URI'] = database_url
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 
+    # Create missing tables and the admin account when the app starts. Set
+    # AUTO_INIT_DB=false in production and run `flask init-db` as a deploy step
+    # instead, so workers start without touching the database.
+    app.config['AUTO_INIT_DB'] = os.environ.get('AUTO_INIT_DB', 'true').lower() in ('1', 'true', 'yes')
+
+    # Optional in-memory free-spot index for large lots (see services/spot_index.py)
+    app.config['SPOT_INDEX_ENABLED'] = os.environ.get('SPOT_INDEX_ENABLED', 'false').lower() in ('1', 'true', 'yes')
+    app.config['SPOT_INDEX_TTL_SECONDS'] = int(os.environ.get('SPOT_INDEX_TTL_SECONDS', '30'))
+
+    # Cache for the admin chart JSON endpoints (see services/response_cache.py);
+    # set RESPONSE_CACHE_URL=redis://... to share it between workers.
+    app.config['RESPONSE_CACHE_ENABLED'] = os.environ.get('RESPONSE_CACHE_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+    app.config['RESPONSE_CACHE_TTL_SECONDS'] = int(os.environ.get('RESPONSE_CACHE_TTL_SECONDS', '30'))
+    app.config['RESPONSE_CACHE_MAX_ENTRIES'] = int(os.environ.get('RESPONSE_CACHE_MAX_ENTRIES', '256'))
+    app.config['RESPONSE_CACHE_URL'] = os.environ.get('RESPONSE_CACHE_URL')
+
+    # Per-worker cache for the Flask-Login user loader (see services/user_cache.py)
+    app.config['USER_CACHE_ENABLED'] = os.environ.get('USER_CACHE_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+    app.config['USER_CACHE_TTL_SECONDS'] = int(os.environ.get('USER_CACHE_TTL_SECONDS', '30'))
+    app.config['USER_CACHE_MAX_ENTRIES'] = int(os.environ.get('USER_CACHE_MAX_ENTRIES', '1024'))
+
     db.init_app(app)
     login_manager.init_app(app)
-    migrate.init_app(app, db)
     login_manager.login_view = 'auth.login'
+    init_spot_index(app)
+    init_response_cache(app)
+    init_user_cache(app)
+    init_search_index(app)
+    if os.environ.get('FLASK_RUN_FROM_CLI') == 'true':
+        # CLI commands and Flask-Migrate (which pulls in Alembic) are only
+        # needed under `flask ...`, not in web workers.
+        from commands import register_commands
+        from flask_migrate import Migrate
+        register_commands(app)
+        Migrate(app, db)
+
+    register_blueprints(app)
 
+    if app.config['AUTO_INIT_DB']:
+        with app.app_context():
+            admin = initialize_database()
+            if admin is not None:
+                print(f" Admin user created: {admin.email}")
+
+    return app
+
+
+def register_blueprints(app):
     from controllers.auth_controller import auth_bp
     from controllers.dashboard_controller import dashboard_bp
     from controllers.admin_controller import admin_bp
@@ -41,33 +82,6 @@ def create_app():
     app.register_blueprint(user_bp)
     app.register_blueprint(graph_bp)
 
-    # Ensure newly added feature tables exist in non-migrated environments.
-    with app.app_context():
-        db.create_all()
-    
-    @app.before_request
-    def ensure_admin_user_exists():
-        global admin_check_done
-        if not admin_check_done:
-            with app.app_context():
-                admin_email = os.environ.get('ADMIN_EMAIL', 'admin@parking.com')
-                admin_password = os.environ.get('ADMIN_PASSWORD', 'admin123')
-                
-                if not User.query.filter_by(email=admin_email).first():
-                    admin = User(
-                        email=admin_email,
-                        password=generate_password_hash(admin_password),
-                        full_name='Admin',
-                        address='Head Office',
-                        pincode='000000',
-                        role='admin'
-                    )
-                    db.session.add(admin)
-                    db.session.commit()
-                    print(f" Admin user created: {admin_email}")
-                admin_check_done = True
-
-    return app
 
 app = create_app()
 
@@ -0,0 +1,147 @@
+"""Count commits and time the booking and release requests end to end.
+
+Drives the real routes through the test client against a file-backed SQLite
+database, so every COMMIT pays for a journal sync. With ``--waitlist`` a
+waiting entry is queued before each release, so the release also runs the
+waitlist hand-off.
+
+Usage: python benchmarks/bench_booking_pipeline.py [--requests 200] [--waitlist]
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+_db_file = tempfile.NamedTemporaryFile(suffix='.db', delete=False)
+os.environ['DATABASE_URL'] = f'sqlite:///{_db_file.name}'
+
+from sqlalchemy import event  # noqa: E402
+
+from app import app  # noqa: E402
+from extensions import db  # noqa: E402
+from models.models import Booking, NotificationLog, ParkingLot, ParkingSpot, User, WaitlistEntry  # noqa: E402
+
+LOT_SPOTS = 50
+
+
+def seed() -> int:
+    owner = User(email='bench-owner@parking.local', full_name='Bench Owner', role='admin')
+    owner.set_password('bench')
+    driver = User(email='bench-driver@parking.local', full_name='Bench Driver', role='user')
+    driver.set_password('bench')
+    waiter = User(email='bench-waiter@parking.local', full_name='Bench Waiter', role='user')
+    waiter.set_password('bench')
+    db.session.add_all([owner, driver, waiter])
+    db.session.flush()
+
+    lot = ParkingLot(
+        owner_id=owner.id,
+        location_name='Bench Lot',
+        address='Bench Road',
+        pincode='000000',
+        price=10.0,
+        total_slots=LOT_SPOTS,
+        available_slots=LOT_SPOTS,
+    )
+    db.session.add(lot)
+    db.session.flush()
+    db.session.execute(
+        ParkingSpot.__table__.insert(),
+        [{'lot_id': lot.id, 'spot_number': f'S{i}', 'is_available': True} for i in range(1, LOT_SPOTS + 1)],
+    )
+    db.session.commit()
+    return lot.id
+
+
+class CommitCounter:
+    def __init__(self, engine):
+        self.engine = engine
+        self.count = 0
+
+    def _on_commit(self, connection):
+        self.count += 1
+
+    def __enter__(self):
+        event.listen(self.engine, 'commit', self._on_commit)
+        return self
+
+    def __exit__(self, *exc_info):
+        event.remove(self.engine, 'commit', self._on_commit)
+
+
+def measure(counter: CommitCounter, send):
+    before = counter.count
+    started = time.perf_counter()
+    response = send()
+    elapsed = (time.perf_counter() - started) * 1000
+    assert response.status_code == 302, response.status_code
+    return counter.count - before, elapsed
+
+
+def report(label: str, samples) -> None:
+    commits = [commit_count for commit_count, _ in samples]
+    latencies = sorted(ms for _, ms in samples)
+    p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+    print(
+        f'{label:<8} {len(samples)} requests  '
+        f'{statistics.mean(commits):.2f} commits/request  '
+        f'median {statistics.median(latencies):.2f} ms  p95 {p95:.2f} ms'
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--waitlist', action='store_true', help='Queue a waitlist entry before every release.')
+    args = parser.parse_args()
+
+    with app.app_context():
+        db.create_all()
+        lot_id = seed()
+        waiter_id = User.query.filter_by(email='bench-waiter@parking.local').one().id
+        engine = db.engine
+
+    client = app.test_client()
+    client.post('/', data={'email': 'bench-driver@parking.local', 'password': 'bench'})
+
+    bookings, releases = [], []
+    with CommitCounter(engine) as counter:
+        for _ in range(args.requests):
+            client.get(f'/book/{lot_id}')  # places the spot hold the POST converts
+            bookings.append(measure(counter, lambda: client.post(f'/book/{lot_id}', data={'vehicle_number': 'KA01BENCH'})))
+
+            with app.app_context():
+                booking_id = Booking.query.filter_by(vehicle_no='KA01BENCH', status='active').one().id
+                if args.waitlist:
+                    db.session.add(WaitlistEntry(user_id=waiter_id, lot_id=lot_id, vehicle_no='KA02WAIT', status='waiting'))
+                    db.session.commit()
+
+            releases.append(measure(counter, lambda: client.post(f'/user/release/{booking_id}')))
+
+            if args.waitlist:
+                # Free the waitlisted booking again so the lot never fills up.
+                with app.app_context():
+                    for booking in Booking.query.filter_by(vehicle_no='KA02WAIT', status='active'):
+                        booking.status = 'released'
+                        ParkingSpot.query.filter_by(id=booking.spot_id).update({'is_available': True})
+                        ParkingLot.query.filter_by(id=lot_id).update({
+                            'occupied_slots': ParkingLot.occupied_slots - 1,
+                            'available_slots': ParkingLot.available_slots + 1,
+                        })
+                    db.session.commit()
+
+    report('book', bookings)
+    report('release', releases)
+    with app.app_context():
+        print(f'{NotificationLog.query.count()} notifications written')
+
+    os.unlink(_db_file.name)
+
+
+if __name__ == '__main__':
+    main()
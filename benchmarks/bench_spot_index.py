@@ -0,0 +1,109 @@
+"""Compare the free-spot index against the full scan in get_bookable_spot.
+
+Usage: python benchmarks/bench_spot_index.py [--spots 5000] [--lookups 200]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+_db_file = tempfile.NamedTemporaryFile(suffix='.db', delete=False)
+os.environ['DATABASE_URL'] = f'sqlite:///{_db_file.name}'
+
+from app import app  # noqa: E402
+from extensions import db  # noqa: E402
+from models.models import ParkingLot, ParkingSpot, SpotHold, SpotMaintenanceWindow, User  # noqa: E402
+from services.parking_features import _scan_bookable_spot, get_bookable_spot  # noqa: E402
+from services.spot_index import init_spot_index, registry  # noqa: E402
+
+
+def seed(total_spots: int) -> int:
+    owner = User(email='bench@parking.local', password='x', role='admin')
+    db.session.add(owner)
+    db.session.flush()
+
+    lot = ParkingLot(
+        owner_id=owner.id,
+        location_name='Bench Lot',
+        address='Bench Road',
+        pincode='000000',
+        price=10.0,
+        total_slots=total_spots,
+        available_slots=total_spots,
+    )
+    db.session.add(lot)
+    db.session.flush()
+
+    # Fill most of the lot so the scan has to walk past occupied rows.
+    occupied = int(total_spots * 0.9)
+    db.session.execute(
+        ParkingSpot.__table__.insert(),
+        [
+            {'lot_id': lot.id, 'spot_number': f'S{i}', 'is_available': i > occupied}
+            for i in range(1, total_spots + 1)
+        ],
+    )
+
+    free_ids = [
+        spot_id for (spot_id,) in db.session.query(ParkingSpot.id).filter_by(lot_id=lot.id, is_available=True)
+    ]
+    now = datetime.utcnow()
+    for spot_id in random.sample(free_ids, len(free_ids) // 4):
+        db.session.add(SpotHold(
+            user_id=owner.id,
+            lot_id=lot.id,
+            spot_id=spot_id,
+            status='active',
+            created_at=now,
+            expires_at=now + timedelta(minutes=30),
+        ))
+    for spot_id in random.sample(free_ids, len(free_ids) // 10):
+        db.session.add(SpotMaintenanceWindow(spot_id=spot_id, lot_id=lot.id, reason='bench'))
+
+    db.session.commit()
+    return lot.id
+
+
+def timed(label: str, lookups: int, func) -> float:
+    started = time.perf_counter()
+    for _ in range(lookups):
+        func()
+    elapsed = time.perf_counter() - started
+    print(f'{label:<8} {lookups} lookups in {elapsed:.3f}s ({elapsed / lookups * 1000:.2f} ms/lookup)')
+    return elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--spots', type=int, default=5000)
+    parser.add_argument('--lookups', type=int, default=200)
+    args = parser.parse_args()
+
+    app.config['SPOT_INDEX_ENABLED'] = True
+    app.config['SPOT_INDEX_TTL_SECONDS'] = 3600
+    init_spot_index(app)
+
+    with app.app_context():
+        db.create_all()
+        lot_id = seed(args.spots)
+        user_id = -1
+
+        expected = _scan_bookable_spot(lot_id, user_id)
+        assert get_bookable_spot(lot_id, user_id).id == expected.id
+
+        scan = timed('scan', args.lookups, lambda: _scan_bookable_spot(lot_id, user_id))
+        registry.invalidate()
+        index = timed('index', args.lookups, lambda: get_bookable_spot(lot_id, user_id))
+        print(f'speedup  {scan / index:.1f}x on a {args.spots}-spot lot')
+
+    os.unlink(_db_file.name)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,111 @@
+"""Measure worker cold start: app import time, startup queries and the first request.
+
+Each run is a fresh interpreter, like a newly forked gunicorn worker, once
+with AUTO_INIT_DB=true (tables and admin checked at startup) and once with
+AUTO_INIT_DB=false (the `flask init-db` deploy step has already run). The
+two modes are run alternately and compared run by run, so machine noise
+(page cache, CPU frequency, neighbours) hits both sides of each pair alike.
+
+Usage: python benchmarks/bench_startup.py [--runs 20] [--database-url URL]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Runs in the child interpreter; prints one JSON line.
+_WORKER = """
+import json, sys, time
+started = time.perf_counter()
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+queries = []
+event.listen(Engine, 'before_cursor_execute', lambda *args: queries.append(1))
+sys.path.insert(0, {root!r})
+from app import app
+imported = time.perf_counter()
+startup_queries = len(queries)
+status = app.test_client().get('/').status_code
+finished = time.perf_counter()
+print(json.dumps({{
+    'import_ms': (imported - started) * 1000,
+    'first_request_ms': (finished - imported) * 1000,
+    'startup_queries': startup_queries,
+    'first_request_queries': len(queries) - startup_queries,
+    'alembic_loaded': 'alembic' in sys.modules,
+    'status': status,
+}}))
+"""
+
+
+def run_worker(database_url: str, auto_init: bool) -> dict:
+    env = {**os.environ, 'DATABASE_URL': database_url, 'AUTO_INIT_DB': 'true' if auto_init else 'false', 'SECRET_KEY': 'bench'}
+    env.pop('FLASK_RUN_FROM_CLI', None)
+    output = subprocess.run(
+        [sys.executable, '-c', _WORKER.format(root=ROOT)],
+        env=env,
+        cwd=ROOT,
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=20)
+    parser.add_argument('--database-url', help='Database to start against (default: a temporary SQLite file).')
+    args = parser.parse_args()
+
+    db_file = None
+    database_url = args.database_url
+    if not database_url:
+        db_file = tempfile.NamedTemporaryFile(suffix='.db', delete=False)
+        database_url = f'sqlite:///{db_file.name}'
+
+    # The deploy step: create tables and the admin once, as `flask init-db` would.
+    run_worker(database_url, auto_init=True)
+
+    modes = (('AUTO_INIT_DB=true', True), ('AUTO_INIT_DB=false', False))
+    samples = {label: [] for label, _ in modes}
+    for _ in range(args.runs):
+        for label, auto_init in modes:
+            samples[label].append(run_worker(database_url, auto_init))
+
+    print(f"{'mode':<18} {'import ms':>10} {'1st req ms':>11} {'startup q':>10} {'1st req q':>10}  alembic")
+    for label, _ in modes:
+        runs = samples[label]
+        assert all(sample['status'] == 200 for sample in runs), runs
+        print(
+            f"{label:<18} "
+            f"{statistics.median(sample['import_ms'] for sample in runs):>10.1f} "
+            f"{statistics.median(sample['first_request_ms'] for sample in runs):>11.1f} "
+            f"{runs[-1]['startup_queries']:>10} "
+            f"{runs[-1]['first_request_queries']:>10}  "
+            f"{'yes' if runs[-1]['alembic_loaded'] else 'no'}"
+        )
+
+    saved = sorted(
+        (on['import_ms'] + on['first_request_ms']) - (off['import_ms'] + off['first_request_ms'])
+        for on, off in zip(samples['AUTO_INIT_DB=true'], samples['AUTO_INIT_DB=false'])
+    )
+    quartiles = statistics.quantiles(saved, n=4) if len(saved) > 1 else saved * 3
+    faster = sum(delta > 0 for delta in saved)
+    print(
+        f'AUTO_INIT_DB=false saves {statistics.median(saved):.1f} ms of cold start to first response '
+        f'(median of {args.runs} paired runs, IQR {quartiles[0]:.1f}..{quartiles[2]:.1f} ms; '
+        f'faster in {faster}/{args.runs})'
+    )
+
+    if db_file is not None:
+        os.unlink(db_file.name)
+
+
+if __name__ == '__main__':
+    main()
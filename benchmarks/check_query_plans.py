@@ -0,0 +1,255 @@
+"""Fail if a hot query falls back to a full table scan.
+
+Seeds a throwaway database, runs the booking, hold, waitlist, scheduler and
+notification code paths plus the main user pages, captures every SQL
+statement they issue and EXPLAINs it. Exits non-zero when a statement scans
+a whole table that should be reached through an index.
+
+Usage: python benchmarks/check_query_plans.py [--database-url postgresql://...] [-v]
+
+Against Postgres point --database-url at an empty scratch database; the
+script creates its own tables and data there.
+"""
+import argparse
+import os
+import re
+import sys
+import tempfile
+from datetime import datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+_parser.add_argument('--database-url', help='Scratch database to seed (default: a temporary SQLite file).')
+_parser.add_argument('-v', '--verbose', action='store_true', help='Print every plan, not just failures.')
+ARGS = _parser.parse_args()
+
+_db_file = None
+if ARGS.database_url:
+    os.environ['DATABASE_URL'] = ARGS.database_url
+else:
+    _db_file = tempfile.NamedTemporaryFile(suffix='.db', delete=False)
+    os.environ['DATABASE_URL'] = f'sqlite:///{_db_file.name}'
+os.environ['MAIL_BACKEND'] = 'memory'
+
+from sqlalchemy import event  # noqa: E402
+from werkzeug.security import generate_password_hash  # noqa: E402
+
+from app import app  # noqa: E402
+from extensions import db  # noqa: E402
+from models.models import (  # noqa: E402
+    Booking,
+    NotificationLog,
+    ParkingLot,
+    ParkingSpot,
+    ScheduledBooking,
+    SpotHold,
+    SpotMaintenanceWindow,
+    User,
+    WaitlistEntry,
+)
+from services.parking_features import (  # noqa: E402
+    _allocation_pool,
+    _scan_bookable_spot,
+    activate_due_scheduled_bookings,
+    claim_spots,
+    cleanup_expired_spot_holds,
+    count_bookable_spots_for_lots,
+    fulfill_waitlist_for_lot,
+    get_active_hold_for_user,
+    get_active_maintenance_map,
+)
+from services.outbox import dispatch_queued_notifications  # noqa: E402
+from services.search import rebuild_search_index, search_documents  # noqa: E402
+
+LOTS = 20
+SPOTS_PER_LOT = 200
+USERS = 200
+BOOKINGS_PER_USER = 25
+PASSWORD = 'plan-check'
+
+# Tables whose rows are listed in full by design (every lot on the dashboard,
+# the single-row lease table); scans of these are not regressions.
+SCAN_ALLOWED = {'parking_lot', 'job_lease', 'user'}
+
+
+def seed():
+    now = datetime.utcnow()
+    password = generate_password_hash(PASSWORD)
+    db.session.execute(User.__table__.insert(), [
+        {'email': f'user{i}@plans.local', 'password': password, 'full_name': f'User {i}', 'role': 'user'}
+        for i in range(USERS)
+    ])
+    user_ids = [user_id for (user_id,) in db.session.query(User.id).order_by(User.id)]
+
+    db.session.execute(ParkingLot.__table__.insert(), [
+        {
+            'owner_id': user_ids[0], 'location_name': f'Lot {i}', 'address': f'{i} Plan Road',
+            'pincode': f'{100000 + i}', 'price': 10.0, 'total_slots': SPOTS_PER_LOT,
+            'available_slots': SPOTS_PER_LOT, 'occupied_slots': 0, 'held_slots': 0, 'maintenance_slots': 0,
+        }
+        for i in range(LOTS)
+    ])
+    lot_ids = [lot_id for (lot_id,) in db.session.query(ParkingLot.id).order_by(ParkingLot.id)]
+
+    db.session.execute(ParkingSpot.__table__.insert(), [
+        {'lot_id': lot_id, 'spot_number': n, 'is_available': n % 4 != 0}
+        for lot_id in lot_ids
+        for n in range(1, SPOTS_PER_LOT + 1)
+    ])
+    spots = db.session.query(ParkingSpot.id, ParkingSpot.lot_id).order_by(ParkingSpot.id).all()
+
+    bookings, holds, windows, waitlist, scheduled, notifications = [], [], [], [], [], []
+    for index, user_id in enumerate(user_ids):
+        for n in range(BOOKINGS_PER_USER):
+            spot_id, lot_id = spots[(index * BOOKINGS_PER_USER + n) % len(spots)]
+            started = now - timedelta(days=n, hours=index % 24)
+            bookings.append({
+                'user_id': user_id, 'lot_id': lot_id, 'spot_id': spot_id, 'vehicle_no': f'PL{index:04d}',
+                'timestamp': started, 'status': 'released', 'release_time': started + timedelta(hours=2),
+                'cost': 20.0,
+            })
+            notifications.append({
+                'user_id': user_id, 'channel': 'email' if n % 5 == 0 else 'in_app',
+                'notification_type': 'plan_check', 'message': 'seeded', 'attempts': 0,
+                'status': 'queued' if n == 0 else 'sent', 'created_at': started,
+            })
+
+        spot_id, lot_id = spots[(index * 7) % len(spots)]
+        holds.append({
+            'user_id': user_id, 'lot_id': lot_id, 'spot_id': spot_id, 'created_at': now,
+            'status': 'active' if index % 3 else 'expired',
+            'expires_at': now + timedelta(minutes=5 if index % 2 else -5),
+        })
+        waitlist.append({
+            'user_id': user_id, 'lot_id': lot_ids[index % LOTS], 'vehicle_no': f'PL{index:04d}',
+            'requested_duration_hours': 1, 'created_at': now - timedelta(minutes=index),
+            'status': 'waiting' if index % 4 == 0 else 'fulfilled',
+        })
+        scheduled.append({
+            'user_id': user_id, 'lot_id': lot_ids[index % LOTS], 'vehicle_no': f'PL{index:04d}',
+            'duration_hours': 1, 'created_at': now,
+            'requested_start': now + timedelta(hours=index - 5),
+            'status': 'scheduled' if index % 2 else 'converted',
+        })
+
+    for spot_id, lot_id in spots[::50]:
+        windows.append({
+            'spot_id': spot_id, 'lot_id': lot_id, 'reason': 'plan check', 'starts_at': now,
+            'is_active': spot_id % 3 != 0, 'ends_at': now + timedelta(hours=1),
+        })
+
+    for model, rows in (
+        (Booking, bookings),
+        (SpotHold, holds),
+        (SpotMaintenanceWindow, windows),
+        (WaitlistEntry, waitlist),
+        (ScheduledBooking, scheduled),
+        (NotificationLog, notifications),
+    ):
+        db.session.execute(model.__table__.insert(), rows)
+    db.session.commit()
+    rebuild_search_index()
+    return user_ids, lot_ids
+
+
+def scenarios(user_ids, lot_ids):
+    user_id, lot_id = user_ids[1], lot_ids[1]
+    yield 'active hold lookup', lambda: get_active_hold_for_user(user_id, lot_id)
+    yield 'maintenance map', lambda: get_active_maintenance_map(lot_id)
+    yield 'bookable spot scan', lambda: _scan_bookable_spot(lot_id, user_id)
+    yield 'bookable counts', lambda: count_bookable_spots_for_lots(lot_ids, user_id)
+    yield 'allocate and claim spots', lambda: claim_spots(_allocation_pool(lot_id)[0][:5])
+    yield 'sweep holds', lambda: cleanup_expired_spot_holds(batch_size=50)
+    yield 'fulfil waitlist', lambda: fulfill_waitlist_for_lot(lot_ids[2])
+    yield 'activate scheduled', lambda: activate_due_scheduled_bookings(limit=20)
+    yield 'dispatch notifications', lambda: dispatch_queued_notifications(batch_size=50)
+    yield 'search lots', lambda: search_documents('Plan Road', kind='lot')
+    yield 'search users', lambda: search_documents('user1', kind='user')
+
+    client = app.test_client()
+    client.post('/', data={'email': f'user{user_id - user_ids[0]}@plans.local', 'password': PASSWORD})
+    for path in ('/user/dashboard', '/user/notifications', '/user/invoices', '/user/spot_summary_data'):
+        yield f'GET {path}', lambda path=path: client.get(path)
+
+
+class StatementRecorder:
+    def __init__(self, engine):
+        self.engine = engine
+        self.statements = []
+
+    def __enter__(self):
+        event.listen(self.engine, 'before_cursor_execute', self._record)
+        return self
+
+    def __exit__(self, *exc_info):
+        event.remove(self.engine, 'before_cursor_execute', self._record)
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany):
+        if not executemany and statement.lstrip().upper().startswith(('SELECT', 'UPDATE', 'DELETE', 'WITH')):
+            self.statements.append((statement, parameters))
+
+
+def full_scans(connection, statement, parameters):
+    """Return ``(plan_lines, scanned_tables)`` for one statement."""
+    if connection.dialect.name == 'postgresql':
+        lines = [row[0] for row in connection.exec_driver_sql('EXPLAIN ' + statement, parameters)]
+        scanned = {match.group(1) for line in lines for match in [re.search(r'Seq Scan on (\w+)', line)] if match}
+    else:
+        lines = [row[3] for row in connection.exec_driver_sql('EXPLAIN QUERY PLAN ' + statement, parameters)]
+        scanned = {
+            match.group(1)
+            for line in lines
+            for match in [re.match(r'SCAN (\w+)(?: AS \w+)?$', line)]
+            if match
+        }
+    return lines, {table for table in scanned if table in db.metadata.tables} - SCAN_ALLOWED
+
+
+def main() -> int:
+    with app.app_context():
+        db.create_all()
+        user_ids, lot_ids = seed()
+        engine = db.engine
+        failures = 0
+
+        for name, run in list(scenarios(user_ids, lot_ids)):
+            with StatementRecorder(engine) as recorder:
+                run()
+            db.session.rollback()
+
+            with engine.connect() as connection:
+                if connection.dialect.name == 'postgresql':
+                    # Tiny seeded tables make seq scans look cheap; only ask whether an index path exists.
+                    connection.exec_driver_sql('SET enable_seqscan = off')
+                seen = set()
+                for statement, parameters in recorder.statements:
+                    if statement in seen:
+                        continue
+                    seen.add(statement)
+                    lines, scanned = full_scans(connection, statement, parameters)
+                    if scanned:
+                        failures += 1
+                    if scanned or ARGS.verbose:
+                        status = 'FULL SCAN ' + ', '.join(sorted(scanned)) if scanned else 'ok'
+                        print(f'[{name}] {status}\n  ' + ' '.join(statement.split())[:300])
+                        print('  ' + '\n  '.join(lines))
+
+            print(f'{name:<28} {len(seen)} statement(s) checked')
+
+        db.session.remove()
+        db.drop_all()
+
+    if _db_file is not None:
+        os.unlink(_db_file.name)
+
+    if failures:
+        print(f'{failures} statement(s) fell back to a full table scan.')
+        return 1
+    print('All hot queries use an index.')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
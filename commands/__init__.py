@@ -0,0 +1,21 @@
+from .analytics import backfill_booking_rollups_command
+from .database import init_db_command
+from .holds import sweep_holds_command
+from .lots import import_lots_command, purge_deleted_lots_command, reconcile_lot_counters_command
+from .notifications import dispatch_notifications_command
+from .retention import apply_retention_command
+from .scheduler import run_scheduler_command
+from .search import rebuild_search_index_command
+
+
+def register_commands(app) -> None:
+    app.cli.add_command(init_db_command)
+    app.cli.add_command(sweep_holds_command)
+    app.cli.add_command(reconcile_lot_counters_command)
+    app.cli.add_command(import_lots_command)
+    app.cli.add_command(purge_deleted_lots_command)
+    app.cli.add_command(apply_retention_command)
+    app.cli.add_command(run_scheduler_command)
+    app.cli.add_command(dispatch_notifications_command)
+    app.cli.add_command(backfill_booking_rollups_command)
+    app.cli.add_command(rebuild_search_index_command)
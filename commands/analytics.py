@@ -0,0 +1,22 @@
+import click
+from flask.cli import with_appcontext
+
+from services import parse_schedule_datetime, rebuild_booking_rollups
+
+
+@click.command('backfill-booking-rollups')
+@click.option('--lot-id', 'lot_ids', type=int, multiple=True, help='Only rebuild these lots (repeatable).')
+@click.option('--since', default='', help='Only rebuild hours from this ISO date/time onwards.')
+@with_appcontext
+def backfill_booking_rollups_command(lot_ids, since):
+    """Rebuild the hourly booking rollups behind the admin analytics.
+
+    Rollups are kept current as bookings start and end; run this once after
+    `flask db upgrade`, or to repair a range after manual data fixes.
+    """
+    since_value = parse_schedule_datetime(since)
+    if since and since_value is None:
+        raise click.BadParameter('Use an ISO date or datetime.', param_hint='--since')
+
+    written = rebuild_booking_rollups(list(lot_ids) or None, since=since_value)
+    click.echo(f'Wrote {written} hourly rollup row(s).')
@@ -0,0 +1,22 @@
+import click
+from flask.cli import with_appcontext
+
+from services import initialize_database
+
+
+@click.command('init-db')
+@click.option('--skip-schema', is_flag=True, help='Only seed the admin account (tables come from `flask db upgrade`).')
+@with_appcontext
+def init_db_command(skip_schema):
+    """Create missing tables and the admin account from ADMIN_EMAIL/ADMIN_PASSWORD.
+
+    Safe to re-run: existing tables and an existing admin are left alone.
+    Run it as a deploy step when the app starts with AUTO_INIT_DB=false.
+    """
+    admin = initialize_database(create_tables=not skip_schema)
+    if not skip_schema:
+        click.echo('Database tables are up to date.')
+    if admin is not None:
+        click.echo(f'Admin user created: {admin.email}')
+    else:
+        click.echo('Admin user already exists.')
@@ -0,0 +1,21 @@
+import time
+
+import click
+from flask.cli import with_appcontext
+
+from services import cleanup_expired_spot_holds
+
+
+@click.command('sweep-holds')
+@click.option('--batch-size', default=1000, show_default=True, help='Rows updated per transaction.')
+@click.option('--interval', type=int, default=0, help='Repeat every N seconds instead of running once.')
+@with_appcontext
+def sweep_holds_command(batch_size, interval):
+    """Mark lapsed spot holds as expired."""
+    while True:
+        expired = cleanup_expired_spot_holds(batch_size=batch_size)
+        click.echo(f'Expired {expired} spot hold(s).')
+
+        if interval <= 0:
+            return
+        time.sleep(interval)
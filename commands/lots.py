@@ -0,0 +1,82 @@
+import click
+from flask.cli import with_appcontext
+
+from models.models import User
+from services import (
+    LOT_DELETION_BATCH_SIZE,
+    parse_lot_import,
+    provision_lots,
+    reconcile_lot_counters,
+    requeue_failed_lot_deletions,
+    run_lot_deletions,
+)
+
+
+@click.command('reconcile-lot-counters')
+@click.option('--lot-id', 'lot_ids', type=int, multiple=True, help='Only check these lots (repeatable).')
+@click.option('--dry-run', is_flag=True, help='Report drift without repairing it.')
+@with_appcontext
+def reconcile_lot_counters_command(lot_ids, dry_run):
+    """Recount lot occupancy counters and repair any drift.
+
+    Repairs write absolute values, so run it off-peak or right after
+    `flask db upgrade`.
+    """
+    drift = reconcile_lot_counters(list(lot_ids) or None, repair=not dry_run)
+
+    for lot_id, fields in sorted(drift.items()):
+        changes = ', '.join(f'{field} {stored} -> {expected}' for field, (stored, expected) in fields.items())
+        click.echo(f'Lot #{lot_id}: {changes}')
+
+    verb = 'Found' if dry_run else 'Repaired'
+    click.echo(f'{verb} drift in {len(drift)} lot(s).')
+
+
+@click.command('import-lots')
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--format', 'fmt', type=click.Choice(['csv', 'json']), help='File format (default: from the extension).')
+@click.option('--owner-email', required=True, help='Admin account that will own the imported lots.')
+@click.option('--dry-run', is_flag=True, help='Validate and time the import, then roll it back.')
+@with_appcontext
+def import_lots_command(path, fmt, owner_email, dry_run):
+    """Create parking lots and their spots from a CSV or JSON file.
+
+    Columns/keys: location_name, address, pincode, price, total_slots. The
+    whole file is validated first; any bad row aborts the import.
+    """
+    owner = User.query.filter_by(email=owner_email).first()
+    if owner is None:
+        raise click.BadParameter(f'No user with email {owner_email}.', param_hint='--owner-email')
+
+    fmt = fmt or ('json' if path.lower().endswith('.json') else 'csv')
+    with open(path, encoding='utf-8-sig') as handle:
+        lots, errors = parse_lot_import(handle.read(), fmt)
+
+    if errors:
+        for error in errors:
+            click.echo(error, err=True)
+        raise click.ClickException(f'{len(errors)} validation error(s); nothing imported.')
+
+    result = provision_lots(lots, owner_id=owner.id, dry_run=dry_run)
+    verb = 'Would import' if dry_run else 'Imported'
+    click.echo(
+        f"{verb} {result['lots']} lot(s) with {result['spots']} spot(s) in {result['seconds']:.3f}s "
+        f"({result['spots_per_second']:.0f} spots/sec)."
+    )
+
+
+@click.command('purge-deleted-lots')
+@click.option('--batch-size', default=LOT_DELETION_BATCH_SIZE, show_default=True, help='Rows deleted per transaction.')
+@click.option('--pause', default=0.05, show_default=True, help='Seconds to yield to other writers between batches.')
+@click.option('--once', is_flag=True, help='Drain the queue and exit (for cron).')
+@click.option('--retry-failed', is_flag=True, help='Requeue failed jobs first; they resume where they stopped.')
+@with_appcontext
+def purge_deleted_lots_command(batch_size, pause, once, retry_failed):
+    """Remove the history of deleted lots in small batches, reporting progress.
+
+    Several instances may run; a database lease keeps only one active. A job
+    that hits an error is marked failed and skipped until --retry-failed.
+    """
+    if retry_failed:
+        click.echo(f'Requeued {requeue_failed_lot_deletions()} failed deletion job(s).')
+    run_lot_deletions(batch_size=batch_size, pause_seconds=pause, once=once, echo=click.echo)
@@ -0,0 +1,18 @@
+import click
+from flask.cli import with_appcontext
+
+from services import run_notification_dispatcher
+
+
+@click.command('dispatch-notifications')
+@click.option('--batch-size', default=50, show_default=True, help='Notifications delivered per transaction.')
+@click.option('--idle', 'idle_seconds', default=5, show_default=True, help='Seconds to wait when the queue is empty.')
+@click.option('--once', is_flag=True, help='Deliver one batch and exit (for cron).')
+@with_appcontext
+def dispatch_notifications_command(batch_size, idle_seconds, once):
+    """Deliver queued email and SMS notifications.
+
+    Uses one pooled SMTP connection; set MAIL_BACKEND=console or memory to
+    run without a mail server.
+    """
+    run_notification_dispatcher(batch_size=batch_size, idle_seconds=idle_seconds, once=once, echo=click.echo)
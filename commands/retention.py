@@ -0,0 +1,44 @@
+import click
+from flask.cli import with_appcontext
+
+from services import RETENTION_BATCH_SIZE, RETENTION_POLICIES, apply_retention
+
+
+def _parse_days(ctx, param, values):
+    days = {}
+    for value in values:
+        name, _, number = value.partition('=')
+        if name not in RETENTION_POLICIES or not number.isdigit():
+            raise click.BadParameter(f'Use POLICY=DAYS with a policy from: {", ".join(RETENTION_POLICIES)}.')
+        days[name] = int(number)
+    return days
+
+
+@click.command('apply-retention')
+@click.option('--policy', 'names', type=click.Choice(list(RETENTION_POLICIES)), multiple=True,
+              help='Only run these policies (repeatable; default: all).')
+@click.option('--days', multiple=True, callback=_parse_days, metavar='POLICY=DAYS',
+              help='Override a policy\'s retention window (repeatable).')
+@click.option('--batch-size', default=RETENTION_BATCH_SIZE, show_default=True, help='Rows moved per transaction.')
+@click.option('--archive-dir', type=click.Path(file_okay=False),
+              help='Write archived rows to gzip JSON-lines files here instead of the archived_record table.')
+@click.option('--pause', default=0.0, show_default=True, help='Seconds to yield to other writers between batches.')
+@click.option('--dry-run', is_flag=True, help='Count what would be archived or purged without changing anything.')
+@with_appcontext
+def apply_retention_command(names, days, batch_size, archive_dir, pause, dry_run):
+    """Archive or purge cold rows from the fast-growing tables.
+
+    Expired holds and reset tokens are purged; finished notifications,
+    waitlist entries, scheduled bookings and released bookings are archived
+    first. Run it daily off-peak. Rebuilding booking rollups only
+    reaches back as far as the bookings retention window.
+    """
+    apply_retention(
+        names=names,
+        days=days,
+        batch_size=batch_size,
+        archive_dir=archive_dir,
+        dry_run=dry_run,
+        pause_seconds=pause,
+        echo=click.echo,
+    )
@@ -0,0 +1,17 @@
+import click
+from flask.cli import with_appcontext
+
+from services import run_scheduler
+
+
+@click.command('run-scheduler')
+@click.option('--batch-size', default=50, show_default=True, help='Scheduled bookings converted per transaction.')
+@click.option('--max-sleep', default=30, show_default=True, help='Longest idle wait in seconds.')
+@click.option('--once', is_flag=True, help='Process due bookings once and exit (for cron).')
+@with_appcontext
+def run_scheduler_command(batch_size, max_sleep, once):
+    """Activate scheduled bookings as they come due.
+
+    Several instances may run; a database lease keeps only one active.
+    """
+    run_scheduler(batch_size=batch_size, max_sleep_seconds=max_sleep, once=once, echo=click.echo)
@@ -0,0 +1,16 @@
+import click
+from flask.cli import with_appcontext
+
+from services import rebuild_search_index
+
+
+@click.command('rebuild-search-index')
+@with_appcontext
+def rebuild_search_index_command():
+    """Rebuild the admin search index from lots, users and vehicles.
+
+    Lot, user and vehicle writes keep it current; run this once after
+    `flask db upgrade`, or after loading rows with raw SQL.
+    """
+    written = rebuild_search_index()
+    click.echo(f'Indexed {written} search document(s).')
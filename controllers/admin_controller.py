@@ -1,156 +1,199 @@
-import csv
-import io
-from datetime import datetime, timedelta
+from datetime import datetime
 
-from flask import Blueprint, Response, flash, jsonify, redirect, render_template, request, url_for
+from flask import Blueprint, Response, flash, jsonify, redirect, render_template, request, stream_with_context, url_for
 from flask_login import current_user, login_required
+from sqlalchemy import case, func, or_, select
 
 from models.models import (
     Booking,
-    Invoice,
+    LotDeletion,
     ParkingLot,
     ParkingSpot,
-    ScheduledBooking,
     SpotHold,
     SpotMaintenanceWindow,
     User,
-    WaitlistEntry,
+    Vehicle,
 )
 from .decorators import admin_required
 from extensions import db
 from services import (
-    activate_due_scheduled_bookings,
-    count_bookable_spots_for_lot,
-    get_active_maintenance_map,
+    BOOKING_EXPORT_HEADER,
+    INVOICE_EXPORT_HEADER,
+    adjust_lot_counters,
+    booking_export_rows,
+    cached_json,
+    close_spot_hold,
+    delete_spot_dependents,
+    fulfill_waitlist_for_lot,
+    grow_lot_spots,
+    hourly_booking_counts,
+    insert_lot_spots,
+    invoice_export_rows,
+    lock_lot,
+    matching_ref_ids,
+    parse_export_range,
+    parse_lot_import,
+    provision_lots,
+    request_lot_deletion,
+    search_documents,
+    shrink_lot_spots,
+    stream_csv,
+    top_lots_by_bookings,
+    user_cache,
 )
 
 
 admin_bp = Blueprint('admin', __name__, url_prefix='/admin')
 
-
-def _active_holds_count_for_lot(lot_id: int) -> int:
-    now = datetime.utcnow()
-    return SpotHold.query.filter(
-        SpotHold.lot_id == lot_id,
-        SpotHold.status == 'active',
-        SpotHold.expires_at >= now,
-    ).count()
-
-
-def _cleanup_spot_dependents(spot_id: int) -> None:
-    """Delete records that hold non-null references to a parking spot."""
-    Booking.query.filter_by(spot_id=spot_id).delete(synchronize_session=False)
-    SpotHold.query.filter_by(spot_id=spot_id).delete(synchronize_session=False)
-    SpotMaintenanceWindow.query.filter_by(spot_id=spot_id).delete(synchronize_session=False)
-    ScheduledBooking.query.filter_by(assigned_spot_id=spot_id).update(
-        {'assigned_spot_id': None},
-        synchronize_session=False,
-    )
-
-
-def _cleanup_lot_dependents(lot_id: int) -> None:
-    """Delete/update records that hold non-null references to a parking lot."""
-    Booking.query.filter_by(lot_id=lot_id).delete(synchronize_session=False)
-    SpotHold.query.filter_by(lot_id=lot_id).delete(synchronize_session=False)
-    SpotMaintenanceWindow.query.filter_by(lot_id=lot_id).delete(synchronize_session=False)
-    WaitlistEntry.query.filter_by(lot_id=lot_id).delete(synchronize_session=False)
-    ScheduledBooking.query.filter_by(lot_id=lot_id).delete(synchronize_session=False)
+LOTS_PER_PAGE = 25
+SPOT_PREVIEW_COUNT = 12
+SEARCH_PAGE_SIZE = 20
+USERS_PER_PAGE = 25
+
+# Directory sorts on user columns; 'spend' and 'active' sort on booking totals instead.
+USER_SORTS = {
+    'newest': (User.id.desc(),),
+    'oldest': (User.id.asc(),),
+    'name': (User.full_name.asc(), User.id.asc()),
+    'email': (User.email.asc(),),
+    'spend': None,
+    'active': None,
+}
+
+
+def _spot_previews(lot_ids: list) -> dict:
+    """First ``SPOT_PREVIEW_COUNT`` spots of each lot, ranked in SQL with a window function."""
+    if not lot_ids:
+        return {}
+
+    ranked = db.session.query(
+        ParkingSpot.id.label('id'),
+        ParkingSpot.lot_id.label('lot_id'),
+        ParkingSpot.spot_number.label('spot_number'),
+        ParkingSpot.is_available.label('is_available'),
+        func.row_number().over(
+            partition_by=ParkingSpot.lot_id,
+            order_by=(ParkingSpot.spot_number.asc(), ParkingSpot.id.asc()),
+        ).label('position'),
+    ).filter(ParkingSpot.lot_id.in_(lot_ids)).subquery()
+
+    rows = db.session.query(
+        ranked.c.id,
+        ranked.c.lot_id,
+        ranked.c.spot_number,
+        ranked.c.is_available,
+    ).filter(ranked.c.position <= SPOT_PREVIEW_COUNT).order_by(ranked.c.lot_id, ranked.c.position)
+
+    previews = {}
+    for spot_id, lot_id, spot_number, is_available in rows:
+        previews.setdefault(lot_id, []).append(
+            {'id': spot_id, 'spot_number': spot_number, 'is_available': is_available}
+        )
+    return previews
 
 
 @admin_bp.route('/dashboard')
 @login_required
 @admin_required
 def dashboard():
-    activate_due_scheduled_bookings(limit=25)
-
-    lots = ParkingLot.query.options(db.joinedload(ParkingLot.spots)).all()
-    maintenance_map = get_active_maintenance_map()
+    page = request.args.get('page', 1, type=int)
+    pagination = ParkingLot.query.order_by(ParkingLot.id.asc()).paginate(
+        page=page,
+        per_page=LOTS_PER_PAGE,
+        error_out=False,
+    )
+    previews = _spot_previews([lot.id for lot in pagination.items])
+    deletions = {
+        job.lot_id: job
+        for job in LotDeletion.query.filter(
+            LotDeletion.lot_id.in_([lot.id for lot in pagination.items if lot.deleted_at is not None]),
+            LotDeletion.status != 'done',
+        )
+    }
 
     parking_lots = []
-    for lot in lots:
-        occupied_count = sum(1 for spot in lot.spots if not spot.is_available)
-        maintenance_count = sum(1 for spot in lot.spots if spot.id in maintenance_map)
-        held_count = _active_holds_count_for_lot(lot.id)
-        bookable_count = count_bookable_spots_for_lot(lot.id)
-
+    for lot in pagination.items:
         parking_lots.append(
             {
                 'id': lot.id,
                 'location_name': lot.location_name,
                 'total_slots': lot.total_slots,
-                'occupied_count': occupied_count,
-                'maintenance_count': maintenance_count,
-                'held_count': held_count,
-                'bookable_count': bookable_count,
-                'spots': lot.spots,
+                'occupied_count': lot.occupied_slots,
+                'maintenance_count': lot.maintenance_slots,
+                'held_count': lot.held_slots,
+                'bookable_count': lot.available_slots,
+                'spots': previews.get(lot.id, []),
+                'hidden_spots': max(0, lot.total_slots - len(previews.get(lot.id, []))),
+                'deletion': deletions.get(lot.id),
             }
         )
 
-    return render_template('dashboard_admin.html', parking_lots=parking_lots)
+    return render_template('dashboard_admin.html', parking_lots=parking_lots, pagination=pagination)
+
+
+@admin_bp.route('/lot/<int:lot_id>/spots')
+@login_required
+@admin_required
+def lot_spots_data(lot_id):
+    lot = ParkingLot.query.get_or_404(lot_id)
+    maintenance = {
+        spot_id
+        for (spot_id,) in db.session.query(SpotMaintenanceWindow.spot_id).filter(
+            SpotMaintenanceWindow.lot_id == lot.id,
+            SpotMaintenanceWindow.is_active.is_(True),
+        )
+    }
+    rows = db.session.query(
+        ParkingSpot.id,
+        ParkingSpot.spot_number,
+        ParkingSpot.is_available,
+    ).filter(ParkingSpot.lot_id == lot.id).order_by(ParkingSpot.spot_number.asc(), ParkingSpot.id.asc()).all()
+
+    return jsonify({
+        'lot_id': lot.id,
+        'spots': [
+            {
+                'id': spot_id,
+                'spot_number': spot_number,
+                'is_available': bool(is_available),
+                'in_maintenance': spot_id in maintenance,
+                'url': url_for('admin.view_spot', spot_id=spot_id),
+            }
+            for spot_id, spot_number, is_available in rows
+        ],
+    })
 
 
 @admin_bp.route('/edit_lot/<int:lot_id>', methods=['GET', 'POST'])
 @login_required
 @admin_required
 def edit_lot(lot_id):
-    lot = ParkingLot.query.get_or_404(lot_id)
+    lot = ParkingLot.query.filter_by(id=lot_id, deleted_at=None).first_or_404()
 
     if request.method == 'POST':
+        lot = lock_lot(lot.id)
         lot.location_name = request.form['location_name']
         lot.address = request.form['address']
         lot.pincode = request.form['pincode']
         lot.price = float(request.form['price'])
         desired_spots = int(request.form['total_slots'])
-
-        existing_spots = ParkingSpot.query.filter_by(lot_id=lot.id).all()
-        existing_labels = {str(spot.spot_number) for spot in existing_spots}
-        current_spot_count = len(existing_labels)
-
-        expected_labels = {f'S{i + 1}' for i in range(desired_spots)}
-        missing_labels = sorted(expected_labels - existing_labels, key=lambda item: int(item[1:]))
+        current_spot_count = db.session.query(func.count(ParkingSpot.id)).filter(
+            ParkingSpot.lot_id == lot.id,
+        ).scalar()
 
         if desired_spots > current_spot_count:
-            to_add = desired_spots - current_spot_count
-            added = 0
-
-            for label in missing_labels:
-                if added >= to_add:
-                    break
-                db.session.add(ParkingSpot(lot_id=lot.id, spot_number=label, is_available=True))
-                added += 1
-
-            if added < to_add:
-                existing_indexes = [int(str(label)[1:]) for label in existing_labels if str(label).startswith('S')]
-                max_index = max(existing_indexes, default=0)
-
-                while added < to_add:
-                    max_index += 1
-                    db.session.add(ParkingSpot(lot_id=lot.id, spot_number=f'S{max_index}', is_available=True))
-                    added += 1
-
+            grow_lot_spots(lot.id, desired_spots - current_spot_count)
         elif desired_spots < current_spot_count:
-            spots_to_remove = current_spot_count - desired_spots
-            removable_spots = ParkingSpot.query.filter_by(
-                lot_id=lot.id,
-                is_available=True,
-            ).order_by(ParkingSpot.id.desc()).all()
-
-            if len(removable_spots) < spots_to_remove:
+            if not shrink_lot_spots(lot.id, current_spot_count - desired_spots):
+                db.session.rollback()
                 flash('Cannot reduce total slots because not enough free spots are available.', 'danger')
                 return redirect(request.url)
 
-            remaining = spots_to_remove
-            for spot in removable_spots:
-                if remaining <= 0:
-                    break
-                _cleanup_spot_dependents(spot.id)
-                db.session.delete(spot)
-                remaining -= 1
-
-        lot.total_slots = desired_spots
-        lot.available_slots = count_bookable_spots_for_lot(lot.id)
+        adjust_lot_counters(lot.id, total=desired_spots - lot.total_slots)
 
         db.session.commit()
+        if desired_spots > current_spot_count:
+            fulfill_waitlist_for_lot(lot.id)
         flash('Parking lot updated successfully.', 'success')
         return redirect(url_for('admin.dashboard'))
 
@@ -179,15 +222,7 @@ def add_lot():
         )
         db.session.add(new_lot)
         db.session.flush()
-
-        for i in range(1, total_slots + 1):
-            db.session.add(
-                ParkingSpot(
-                    lot_id=new_lot.id,
-                    spot_number=f'S{i}',
-                    is_available=True,
-                )
-            )
+        insert_lot_spots(db.session.connection(), new_lot.id, 1, total_slots)
 
         db.session.commit()
         flash('New parking lot added successfully.', 'success')
@@ -196,11 +231,33 @@ def add_lot():
     return render_template('new_parking_lot.html')
 
 
+@admin_bp.route('/import_lots', methods=['GET', 'POST'])
+@login_required
+@admin_required
+def import_lots():
+    if request.method == 'POST':
+        upload = request.files.get('lot_file')
+        if upload is None or not upload.filename:
+            flash('Choose a CSV or JSON file to import.', 'danger')
+            return redirect(request.url)
+
+        fmt = 'json' if upload.filename.lower().endswith('.json') else 'csv'
+        lots, errors = parse_lot_import(upload.read().decode('utf-8-sig', errors='replace'), fmt)
+        if errors:
+            return render_template('import_lots.html', errors=errors, result=None)
+
+        dry_run = bool(request.form.get('dry_run'))
+        result = provision_lots(lots, owner_id=current_user.id, dry_run=dry_run)
+        return render_template('import_lots.html', errors=[], result=result, dry_run=dry_run)
+
+    return render_template('import_lots.html', errors=[], result=None)
+
+
 @admin_bp.route('/delete_lot/<int:lot_id>')
 @login_required
 @admin_required
 def delete_lot(lot_id):
-    lot = ParkingLot.query.get_or_404(lot_id)
+    lot = ParkingLot.query.filter_by(id=lot_id, deleted_at=None).first_or_404()
 
     occupied_spots = ParkingSpot.query.filter_by(lot_id=lot.id, is_available=False).count()
     if occupied_spots > 0:
@@ -212,75 +269,217 @@ def delete_lot(lot_id):
         flash('Cannot delete parking lot: active bookings exist.', 'danger')
         return redirect(url_for('admin.dashboard'))
 
-    _cleanup_lot_dependents(lot.id)
+    request_lot_deletion(lot, requested_by=current_user.id)
 
-    db.session.delete(lot)
-    db.session.commit()
-
-    flash('Parking lot deleted successfully.', 'success')
+    flash('Parking lot closed. Its booking history is being removed in the background.', 'success')
     return redirect(url_for('admin.dashboard'))
 
 
+@admin_bp.route('/lot_deletions/<int:job_id>')
+@login_required
+@admin_required
+def lot_deletion_status(job_id):
+    job = LotDeletion.query.get_or_404(job_id)
+    return jsonify({
+        'id': job.id,
+        'lot_id': job.lot_id,
+        'lot_name': job.lot_name,
+        'status': job.status,
+        'deleted_rows': job.deleted_rows,
+        'total_rows': job.total_rows,
+        'progress_percent': job.progress_percent,
+        'last_error': job.last_error,
+    })
+
+
+@admin_bp.route('/user_cache_stats')
+@login_required
+@admin_required
+def user_cache_stats():
+    # Per worker: each process keeps its own cache and counters.
+    return jsonify(user_cache.stats())
+
+
 @admin_bp.route('/admin/users')
 @login_required
 @admin_required
 def view_users():
-    users = User.query.all()
-    return render_template('admin_users.html', users=users)
+    query = (request.args.get('query') or '').strip()
+    role = request.args.get('role') or 'all'
+    sort = request.args.get('sort') if request.args.get('sort') in USER_SORTS else 'newest'
+    page = max(1, request.args.get('page', 1, type=int))
+
+    stmt = select(User.id)
+    if role in ('admin', 'user'):
+        stmt = stmt.where(User.role == role)
+    if query:
+        matches = User.id.in_(matching_ref_ids(query, 'user'))
+        stmt = stmt.where(or_(matches, User.id == int(query)) if query.isdigit() else matches)
+
+    if sort in ('spend', 'active'):
+        totals = db.session.query(
+            Booking.user_id.label('user_id'),
+            func.sum(Booking.cost).label('spend'),
+            func.sum(case((Booking.status == 'active', 1), else_=0)).label('active'),
+        ).group_by(Booking.user_id).subquery()
+        stmt = stmt.outerjoin(totals, totals.c.user_id == User.id)
+        order = (func.coalesce(totals.c[sort], 0).desc(), User.id.desc())
+    else:
+        order = USER_SORTS[sort]
+
+    pagination = db.paginate(stmt.order_by(*order), page=page, per_page=USERS_PER_PAGE, error_out=False)
+    role_counts = dict(db.session.query(User.role, func.count(User.id)).group_by(User.role).all())
+
+    return render_template(
+        'admin_users.html',
+        users=_user_directory_rows(pagination.items),
+        pagination=pagination,
+        role_counts=role_counts,
+        total_users=sum(role_counts.values()),
+        query=query,
+        role=role,
+        sort=sort,
+    )
+
+
+def _user_directory_rows(user_ids: list) -> list:
+    """Directory rows in page order; booking and vehicle totals come from one grouped query."""
+    if not user_ids:
+        return []
+
+    vehicle_count = select(func.count(Vehicle.id)).where(Vehicle.user_id == User.id).correlate(User).scalar_subquery()
+    rows = db.session.query(
+        User.id,
+        User.email,
+        User.full_name,
+        User.address,
+        User.pincode,
+        User.role,
+        func.sum(case((Booking.status == 'active', 1), else_=0)),
+        func.coalesce(func.sum(Booking.cost), 0),
+        vehicle_count,
+    ).outerjoin(Booking, Booking.user_id == User.id).filter(
+        User.id.in_(user_ids),
+    ).group_by(User.id).all()
+
+    by_id = {
+        user_id: {
+            'id': user_id,
+            'email': email,
+            'full_name': full_name,
+            'address': address,
+            'pincode': pincode,
+            'role': role,
+            'active_bookings': int(active or 0),
+            'lifetime_spend': round(float(spend), 2),
+            'vehicles': vehicles,
+        }
+        for user_id, email, full_name, address, pincode, role, active, spend, vehicles in rows
+    }
+    return [by_id[user_id] for user_id in user_ids if user_id in by_id]
 
 
 @admin_bp.route('/search', methods=['GET'])
 @login_required
 @admin_required
 def admin_search():
-    query = request.args.get('query')
-    filter_by = request.args.get('filter')
+    query = (request.args.get('query') or '').strip()
+    filter_by = request.args.get('filter') or 'location'
+    page = max(1, request.args.get('page', 1, type=int))
 
     parking_lots = []
-    user_booked_spot_ids = set()
-    user_booked_slots_per_lot = {}
-    lot_occupied_spots = {}
-
-    if query and filter_by:
-        if filter_by == 'location':
-            parking_lots = ParkingLot.query.options(db.joinedload(ParkingLot.spots)).filter(
-                ParkingLot.location_name.ilike(f'%{query.strip()}%')
-            ).all()
-            for lot in parking_lots:
-                lot_occupied_spots[lot.id] = sum(not spot.is_available for spot in lot.spots)
-
-        elif filter_by == 'user':
-            user = None
-            if query.isdigit():
-                user = User.query.filter_by(id=int(query)).first()
-            else:
-                user = User.query.filter(
-                    (User.email.ilike(f'%{query.strip()}%'))
-                    | (User.full_name.ilike(f'%{query.strip()}%'))
-                ).first()
-
-            if user:
-                bookings = Booking.query.filter_by(user_id=user.id).all()
-                user_booked_spot_ids = {str(item.spot_id) for item in bookings}
-                lot_ids = {item.lot_id for item in bookings}
-                parking_lots = ParkingLot.query.options(db.joinedload(ParkingLot.spots)).filter(
-                    ParkingLot.id.in_(lot_ids)
-                ).all()
-
-                for lot in parking_lots:
-                    user_booked_slots_per_lot[lot.id] = sum(1 for item in bookings if item.lot_id == lot.id)
+    users = []
+    total = 0
+
+    if query:
+        kind = 'user' if filter_by == 'user' else 'lot'
+        matches, total = search_documents(query, kind=kind, page=page, per_page=SEARCH_PAGE_SIZE)
+        ids = [ref_id for _, ref_id in matches]
+        if kind == 'user' and query.isdigit() and page == 1 and int(query) not in ids:
+            # Numeric queries still jump straight to that user id.
+            if db.session.get(User, int(query)) is not None:
+                ids.insert(0, int(query))
+                total += 1
+
+        if kind == 'lot':
+            parking_lots = _lot_search_results(ids)
+        else:
+            users = _user_search_results(ids)
 
     return render_template(
         'admin_search.html',
         parking_lots=parking_lots,
+        users=users,
         query=query,
         filter_by=filter_by,
-        user_booked_spot_ids=user_booked_spot_ids,
-        lot_occupied_spots=lot_occupied_spots,
-        user_booked_slots_per_lot=user_booked_slots_per_lot,
+        page=page,
+        pages=max(1, -(-total // SEARCH_PAGE_SIZE)),
+        total=total,
     )
 
 
+def _lot_search_results(lot_ids: list) -> list:
+    """Matched lots in rank order, with counters and a spot preview."""
+    lots = {lot.id: lot for lot in ParkingLot.query.filter(ParkingLot.id.in_(lot_ids)).all()}
+    previews = _spot_previews(list(lots))
+    return [
+        {
+            'id': lot.id,
+            'location_name': lot.location_name,
+            'address': lot.address,
+            'pincode': lot.pincode,
+            'total_slots': lot.total_slots,
+            'occupied_count': lot.occupied_slots,
+            'spots': previews.get(lot.id, []),
+            'hidden_spots': max(0, lot.total_slots - len(previews.get(lot.id, []))),
+        }
+        for lot in (lots.get(lot_id) for lot_id in lot_ids)
+        if lot is not None
+    ]
+
+
+def _user_search_results(user_ids: list) -> list:
+    """Matched users in rank order with plates and per-lot booking counts aggregated in SQL."""
+    if not user_ids:
+        return []
+
+    users = {
+        user_id: {'id': user_id, 'email': email, 'full_name': full_name, 'plates': [], 'lots': []}
+        for user_id, email, full_name in db.session.query(User.id, User.email, User.full_name).filter(
+            User.id.in_(user_ids),
+        )
+    }
+
+    for user_id, plate in db.session.query(Vehicle.user_id, Vehicle.plate_number).filter(
+        Vehicle.user_id.in_(users),
+    ).order_by(Vehicle.plate_number):
+        users[user_id]['plates'].append(plate)
+
+    booking_counts = db.session.query(
+        Booking.user_id,
+        ParkingLot.id,
+        ParkingLot.location_name,
+        ParkingLot.total_slots,
+        func.count(Booking.id),
+        func.sum(case((Booking.status == 'active', 1), else_=0)),
+    ).join(ParkingLot, ParkingLot.id == Booking.lot_id).filter(
+        Booking.user_id.in_(users),
+    ).group_by(
+        Booking.user_id, ParkingLot.id, ParkingLot.location_name, ParkingLot.total_slots,
+    ).order_by(func.count(Booking.id).desc())
+
+    for user_id, lot_id, location_name, total_slots, bookings, active in booking_counts:
+        users[user_id]['lots'].append({
+            'id': lot_id,
+            'location_name': location_name,
+            'total_slots': total_slots,
+            'bookings': bookings,
+            'active': int(active or 0),
+        })
+
+    return [users[user_id] for user_id in user_ids if user_id in users]
+
+
 @admin_bp.route('/spot/<int:spot_id>')
 @login_required
 @admin_required
@@ -325,16 +524,10 @@ def delete_spot(spot_id):
         flash('Cannot delete this spot: active bookings exist.', 'danger')
         return redirect(url_for('admin.view_spot', spot_id=spot_id))
 
-    _cleanup_spot_dependents(spot.id)
-
-    lot = ParkingLot.query.get(spot.lot_id)
-    if lot:
-        lot.total_slots -= 1
+    delete_spot_dependents(spot.lot_id, [spot.id])
+    adjust_lot_counters(spot.lot_id, total=-1)
 
     db.session.delete(spot)
-    if lot:
-        lot.available_slots = count_bookable_spots_for_lot(lot.id)
-
     db.session.commit()
 
     flash('Spot and related data removed successfully.', 'success')
@@ -357,6 +550,10 @@ def start_spot_maintenance(spot_id):
         flash('Maintenance is already active for this spot.', 'info')
         return redirect(url_for('admin.view_spot', spot_id=spot_id))
 
+    # A spot is counted as held or in maintenance, never both.
+    for hold in SpotHold.query.filter_by(spot_id=spot.id, status='active').all():
+        close_spot_hold(hold, 'cancelled')
+
     maintenance = SpotMaintenanceWindow(
         spot_id=spot.id,
         lot_id=spot.lot_id,
@@ -365,10 +562,7 @@ def start_spot_maintenance(spot_id):
         created_by=current_user.id,
     )
     db.session.add(maintenance)
-
-    lot = ParkingLot.query.get(spot.lot_id)
-    if lot:
-        lot.available_slots = count_bookable_spots_for_lot(lot.id)
+    adjust_lot_counters(spot.lot_id, maintenance=1)
 
     db.session.commit()
     flash('Spot set to maintenance mode.', 'success')
@@ -389,107 +583,62 @@ def stop_spot_maintenance(spot_id):
 
     maintenance.is_active = False
     maintenance.ends_at = datetime.utcnow()
-
-    lot = ParkingLot.query.get(maintenance.lot_id)
-    if lot:
-        lot.available_slots = count_bookable_spots_for_lot(lot.id)
+    adjust_lot_counters(maintenance.lot_id, maintenance=-1)
 
     db.session.commit()
+    fulfill_waitlist_for_lot(maintenance.lot_id)
     flash('Maintenance mode ended for this spot.', 'success')
     return redirect(url_for('admin.view_spot', spot_id=spot_id))
 
 
+def _csv_export_response(filename: str, header: list, row_source):
+    """Stream a filtered CSV export; ``?gzip=1`` compresses it on the fly."""
+    start, end = parse_export_range(request.args.get('start'), request.args.get('end'))
+    rows = row_source(
+        start=start,
+        end=end,
+        lot_id=request.args.get('lot_id', type=int),
+        status=request.args.get('status') or None,
+    )
+    compress = request.args.get('gzip', '').lower() in ('1', 'true', 'yes')
+
+    body = stream_with_context(stream_csv(header, rows, compress=compress))
+    if compress:
+        response = Response(body, mimetype='application/gzip')
+        filename += '.gz'
+    else:
+        response = Response(body, mimetype='text/csv')
+    response.headers['Content-Disposition'] = f'attachment; filename={filename}'
+    return response
+
+
 @admin_bp.route('/export/bookings.csv')
 @login_required
 @admin_required
 def export_bookings_csv():
-    output = io.StringIO()
-    writer = csv.writer(output)
-    writer.writerow(['Booking ID', 'User Email', 'Lot', 'Spot', 'Vehicle', 'Status', 'Start', 'Release', 'Cost'])
-
-    records = Booking.query.order_by(Booking.timestamp.desc()).all()
-    for item in records:
-        writer.writerow(
-            [
-                item.id,
-                item.user.email if item.user else '',
-                item.parking_lot.location_name if item.parking_lot else '',
-                item.parking_spot.spot_number if item.parking_spot else '',
-                item.vehicle_no,
-                item.status,
-                item.timestamp.isoformat() if item.timestamp else '',
-                item.release_time.isoformat() if item.release_time else '',
-                item.cost if item.cost is not None else '',
-            ]
-        )
-
-    response = Response(output.getvalue(), mimetype='text/csv')
-    response.headers['Content-Disposition'] = 'attachment; filename=bookings_export.csv'
-    return response
+    return _csv_export_response('bookings_export.csv', BOOKING_EXPORT_HEADER, booking_export_rows)
 
 
 @admin_bp.route('/export/invoices.csv')
 @login_required
 @admin_required
 def export_invoices_csv():
-    output = io.StringIO()
-    writer = csv.writer(output)
-    writer.writerow(['Invoice No', 'Booking ID', 'User Email', 'Amount', 'Currency', 'Status', 'Issued At', 'Paid At'])
-
-    records = Invoice.query.order_by(Invoice.issued_at.desc()).all()
-    for item in records:
-        writer.writerow(
-            [
-                item.invoice_no,
-                item.booking_id,
-                item.user.email if item.user else '',
-                item.amount,
-                item.currency,
-                item.status,
-                item.issued_at.isoformat() if item.issued_at else '',
-                item.paid_at.isoformat() if item.paid_at else '',
-            ]
-        )
-
-    response = Response(output.getvalue(), mimetype='text/csv')
-    response.headers['Content-Disposition'] = 'attachment; filename=invoices_export.csv'
-    return response
+    return _csv_export_response('invoices_export.csv', INVOICE_EXPORT_HEADER, invoice_export_rows)
 
 
 @admin_bp.route('/analytics/hourly_data')
 @login_required
 @admin_required
+@cached_json
 def analytics_hourly_data():
-    start_window = datetime.utcnow() - timedelta(days=7)
-    bookings = Booking.query.filter(Booking.timestamp >= start_window).all()
-
-    hourly = {f'{hour:02d}:00': 0 for hour in range(24)}
-    for booking in bookings:
-        if booking.timestamp:
-            label = f'{booking.timestamp.hour:02d}:00'
-            hourly[label] += 1
-
-    payload = [{'hour': key, 'count': value} for key, value in hourly.items()]
+    counts = hourly_booking_counts(days=7)
+    payload = [{'hour': f'{hour:02d}:00', 'count': counts.get(hour, 0)} for hour in range(24)]
     return jsonify(payload)
 
 
 @admin_bp.route('/analytics/top_lots_data')
 @login_required
 @admin_required
+@cached_json
 def analytics_top_lots_data():
-    lots = ParkingLot.query.options(db.joinedload(ParkingLot.bookings)).all()
-    rows = []
-
-    for lot in lots:
-        total_bookings = len(lot.bookings)
-        revenue = sum((booking.cost or lot.price) for booking in lot.bookings)
-        rows.append(
-            {
-                'lot': lot.location_name,
-                'bookings': total_bookings,
-                'revenue': round(revenue, 2),
-            }
-        )
-
-    rows.sort(key=lambda item: item['bookings'], reverse=True)
-    return jsonify(rows[:10])
+    return jsonify(top_lots_by_bookings(limit=10))
@@ -8,7 +8,7 @@ from werkzeug.security import check_password_hash, generate_password_hash
 
 from extensions import db, login_manager
 from models.models import PasswordResetToken, User
-from services import log_notification
+from services import load_session_user, log_notification
 
 
 auth_bp = Blueprint('auth', __name__)
@@ -16,7 +16,8 @@ auth_bp = Blueprint('auth', __name__)
 
 @login_manager.user_loader
 def load_user(user_id):
-    return User.query.get(int(user_id))
+    # Served from services.user_cache; User commits (profile, password, role) evict the entry.
+    return load_session_user(int(user_id))
 
 
 @auth_bp.route('/register', methods=['GET', 'POST'])
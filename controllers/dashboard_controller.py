@@ -1,10 +1,17 @@
-from flask import Blueprint, render_template, redirect, url_for,request, flash
+from flask import Blueprint, jsonify, render_template, redirect, url_for,request, flash
 from flask_login import login_required, logout_user, current_user
 from models.models import Booking, NotificationLog, ParkingLot, ParkingSpot, ScheduledBooking, User, WaitlistEntry
 from extensions import db
+from .decorators import admin_required
 from datetime import datetime
 from werkzeug.security import check_password_hash, generate_password_hash
-from services import activate_due_scheduled_bookings, count_bookable_spots_for_lot, get_active_maintenance_map
+from services import (
+    HISTORY_PAGE_SIZE,
+    count_bookable_spots_for_lots,
+    decode_history_cursor,
+    get_active_bookings,
+    get_booking_history_page,
+)
 dashboard_bp = Blueprint('dashboard', __name__)  # name MUST match 'dashboard'
 
 
@@ -12,14 +19,14 @@ dashboard_bp = Blueprint('dashboard', __name__)  # name MUST match 'dashboard'
 @dashboard_bp.route('/user/dashboard')
 @login_required
 def user_dashboard():
-    activate_due_scheduled_bookings(limit=10)
-    bookings = Booking.query.filter_by(user_id=current_user.id).order_by(Booking.timestamp.desc()).all()
-    lots = ParkingLot.query.options(db.joinedload(ParkingLot.spots)).all()
-    maintenance_map = get_active_maintenance_map()
+    active_bookings = get_active_bookings(current_user.id)
+    past_bookings, history_cursor = get_booking_history_page(current_user.id, limit=HISTORY_PAGE_SIZE)
+    lots = ParkingLot.query.filter(ParkingLot.deleted_at.is_(None)).all()
+    counts = count_bookable_spots_for_lots([lot.id for lot in lots], current_user.id)
 
     for lot in lots:
-        lot.bookable_spots = count_bookable_spots_for_lot(lot.id, current_user.id)
-        lot.maintenance_count = sum(1 for spot in lot.spots if spot.id in maintenance_map)
+        lot.bookable_spots = counts[lot.id]['bookable']
+        lot.maintenance_count = counts[lot.id]['maintenance']
 
     waitlist_entries = WaitlistEntry.query.filter_by(
         user_id=current_user.id,
@@ -38,12 +45,44 @@ def user_dashboard():
     return render_template(
         'dashboard_user.html',
         parking_lots=lots,
-        bookings=bookings,
+        active_bookings=active_bookings,
+        bookings=active_bookings + past_bookings,
+        history_cursor=history_cursor,
         waitlist_entries=waitlist_entries,
         scheduled_bookings=scheduled_bookings,
         recent_notifications=recent_notifications,
     )
 
+@dashboard_bp.route('/user/bookings/history')
+@login_required
+def booking_history_data():
+    after = None
+    cursor = request.args.get('cursor')
+    if cursor:
+        after = decode_history_cursor(cursor)
+        if after is None:
+            return jsonify({'error': 'Invalid cursor.'}), 400
+
+    limit = request.args.get('limit', HISTORY_PAGE_SIZE, type=int)
+    bookings, next_cursor = get_booking_history_page(current_user.id, after=after, limit=limit)
+
+    return jsonify({
+        'bookings': [
+            {
+                'id': booking.id,
+                'lot': booking.parking_lot.location_name if booking.parking_lot else None,
+                'spot_number': booking.parking_spot.spot_number if booking.parking_spot else None,
+                'vehicle_no': booking.vehicle_no,
+                'timestamp': booking.timestamp.isoformat() if booking.timestamp else None,
+                'release_time': booking.release_time.isoformat() if booking.release_time else None,
+                'status': booking.status,
+                'cost': booking.cost,
+            }
+            for booking in bookings
+        ],
+        'next_cursor': next_cursor,
+    })
+
 @dashboard_bp.route('/user/book/<int:lot_id>')
 @login_required
 def show_booking_form(lot_id):
@@ -91,8 +130,9 @@ def user_summary():
 # admin users
 @dashboard_bp.route('/admin/users')
 @login_required
+@admin_required
 def users():
-    return render_template('admin_users.html')
+    return redirect(url_for('admin.view_users'))
 
 
 # # admin search 
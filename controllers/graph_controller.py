@@ -1,63 +1,68 @@
-from flask import Blueprint, jsonify
+from flask import Blueprint, jsonify, request
 from flask_login import current_user, login_required
-from models.models import Booking, ParkingSpot, ParkingLot
+from models.models import Booking, ParkingLot
 from extensions import db
+from services import cached_json, parse_export_range
 from sqlalchemy import func
 
 graph_bp = Blueprint('graph', __name__)
 
+
+def _booking_window(query):
+    """Limit a booking query to the optional ``start``/``end`` request args."""
+    start, end = parse_export_range(request.args.get('start'), request.args.get('end'))
+    if start is not None:
+        query = query.filter(Booking.timestamp >= start)
+    if end is not None:
+        query = query.filter(Booking.timestamp < end)
+    return query
+
+
 @graph_bp.route('/user/spot_summary_data')
 @login_required
 def user_spot_summary_data():
-    user_id = current_user.id
-
-    # Get all bookings for the current user
-    bookings = Booking.query.filter_by(user_id=user_id).all()
-
-    usage_data = {}
+    # Booking count per lot for the current user, counted in the database
+    query = db.session.query(
+        ParkingLot.location_name,
+        func.count(Booking.id),
+    ).join(ParkingLot, ParkingLot.id == Booking.lot_id).filter(Booking.user_id == current_user.id)
 
-    for booking in bookings:
-        lot_name = booking.parking_lot.location_name
-        usage_data[lot_name] = usage_data.get(lot_name, 0) + 1
+    rows = _booking_window(query).group_by(ParkingLot.id, ParkingLot.location_name).all()
 
-    summary_list = [{'spot': name, 'usage': count} for name, count in usage_data.items()]
+    summary_list = [{'spot': name, 'usage': count} for name, count in rows]
     return jsonify(summary_list)
 
 @graph_bp.route('/admin/lot_revenue_data')
 @login_required
+@cached_json
 def lot_revenue_data():
-    # Returns revenue per parking lot
-    data = db.session.query(
-        Booking.lot_id,
-        func.count(Booking.id).label("count")
-    ).group_by(Booking.lot_id).all()
-
-    results = []
-    for lot_id, count in data:
-        lot = ParkingLot.query.get(lot_id)
-        if lot:
-            revenue = count * lot.price  # Assuming flat price per booking
-            results.append({
-                "lot": lot.location_name,
-                "revenue": float(revenue)
-            })
+    # Returns revenue per parking lot (sum of released booking costs)
+    query = db.session.query(
+        ParkingLot.location_name,
+        func.coalesce(func.sum(Booking.cost), 0),
+    ).join(ParkingLot, ParkingLot.id == Booking.lot_id).filter(ParkingLot.deleted_at.is_(None))
+
+    rows = _booking_window(query).group_by(ParkingLot.id, ParkingLot.location_name).all()
+
+    results = [{"lot": name, "revenue": round(float(revenue), 2)} for name, revenue in rows]
     return jsonify(results)
 
 
 @graph_bp.route('/admin/lot_occupancy_data')
 @login_required
+@cached_json
 def lot_occupancy_data():
-    lots = ParkingLot.query.options(db.joinedload(ParkingLot.spots)).all()
-    
+    rows = db.session.query(
+        ParkingLot.location_name,
+        ParkingLot.total_slots,
+        ParkingLot.occupied_slots,
+    ).filter(ParkingLot.deleted_at.is_(None)).all()
+
     data = []
-    for lot in lots:
-        total = len(lot.spots)
-        occupied = sum(not spot.is_available for spot in lot.spots)
-        available = total - occupied
+    for name, total, occupied in rows:
         data.append({
-            "lot": lot.location_name,
-            "available": available,
+            "lot": name,
+            "available": total - occupied,
             "occupied": occupied
         })
     return jsonify(data)
-
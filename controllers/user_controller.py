@@ -2,6 +2,7 @@ from datetime import datetime, timedelta
 
 from flask import Blueprint, flash, redirect, render_template, request, url_for
 from flask_login import current_user, login_required
+from sqlalchemy.orm.attributes import set_committed_value
 
 from extensions import db
 from models.models import (
@@ -15,9 +16,9 @@ from models.models import (
     WaitlistEntry,
 )
 from services import (
-    activate_due_scheduled_bookings,
     add_to_waitlist,
-    count_bookable_spots_for_lot,
+    claim_spot,
+    close_spot_hold,
     create_or_refresh_spot_hold,
     create_vehicle_for_user,
     fulfill_waitlist_for_lot,
@@ -26,8 +27,12 @@ from services import (
     get_active_maintenance_map,
     get_bookable_spot,
     get_user_vehicle_choices,
+    invalidate_response_cache,
     log_notification,
     parse_schedule_datetime,
+    record_booking_released,
+    record_bookings_started,
+    release_spot,
 )
 
 
@@ -41,8 +46,7 @@ def _normalize_vehicle_no(raw_value: str) -> str:
 @user_bp.route('/book/<int:lot_id>', methods=['GET', 'POST'])
 @login_required
 def book_parking_lot(lot_id):
-    activate_due_scheduled_bookings(limit=10)
-    lot = ParkingLot.query.get_or_404(lot_id)
+    lot = ParkingLot.query.filter_by(id=lot_id, deleted_at=None).first_or_404()
 
     vehicles = get_user_vehicle_choices(current_user.id)
     selected_vehicle_id = request.form.get('vehicle_id', type=int)
@@ -74,6 +78,7 @@ def book_parking_lot(lot_id):
                 lot_id=lot.id,
                 vehicle_no=vehicle_no,
                 vehicle_id=selected_vehicle.id if selected_vehicle else None,
+                auto_commit=False,
             )
             if created:
                 log_notification(
@@ -81,7 +86,9 @@ def book_parking_lot(lot_id):
                     notification_type='waitlist_joined',
                     subject='Added to Waitlist',
                     message=f'You were added to waitlist for {lot.location_name}.',
+                    auto_commit=False,
                 )
+                db.session.commit()
                 flash('Lot is full. You were added to waitlist.', 'info')
             else:
                 flash('You are already in waitlist for this lot.', 'info')
@@ -107,8 +114,8 @@ def book_parking_lot(lot_id):
                 status='scheduled',
             )
             db.session.add(scheduled_booking)
-            db.session.commit()
 
+            # The booking and its notifications commit together.
             log_notification(
                 user_id=current_user.id,
                 notification_type='scheduled_booking_created',
@@ -117,6 +124,7 @@ def book_parking_lot(lot_id):
                     f'Your booking at {lot.location_name} is scheduled for '
                     f"{scheduled_start.strftime('%Y-%m-%d %H:%M')}"
                 ),
+                auto_commit=False,
             )
             log_notification(
                 user_id=current_user.id,
@@ -127,7 +135,9 @@ def book_parking_lot(lot_id):
                     f"{scheduled_start.strftime('%Y-%m-%d %H:%M')}"
                 ),
                 channel='email',
+                auto_commit=False,
             )
+            db.session.commit()
 
             flash('Scheduled booking created successfully.', 'success')
             return redirect(url_for('dashboard.user_dashboard'))
@@ -140,8 +150,8 @@ def book_parking_lot(lot_id):
         spot = ParkingSpot.query.get(active_hold.spot_id)
         maintenance_map = get_active_maintenance_map(lot.id)
 
-        if not spot or not spot.is_available or spot.id in maintenance_map:
-            active_hold.status = 'expired'
+        if not spot or spot.id in maintenance_map or not claim_spot(spot):
+            close_spot_hold(active_hold, 'expired')
             db.session.commit()
             flash('That spot is no longer available. Try again to lock another spot.', 'warning')
             return redirect(request.url)
@@ -152,20 +162,21 @@ def book_parking_lot(lot_id):
             spot_id=spot.id,
             vehicle_no=vehicle_no,
             status='active',
+            timestamp=datetime.utcnow(),
         )
 
-        active_hold.status = 'converted'
-        spot.is_available = False
-        lot.available_slots = count_bookable_spots_for_lot(lot.id)
+        close_spot_hold(active_hold, 'converted')
 
         db.session.add(booking)
-        db.session.commit()
+        record_bookings_started([booking])
 
+        # One commit for the claim, the booking and its notifications.
         log_notification(
             user_id=current_user.id,
             notification_type='booking_confirmed',
             subject='Booking Confirmed',
             message=f'Parking spot {spot.spot_number} at {lot.location_name} is now active.',
+            auto_commit=False,
         )
         log_notification(
             user_id=current_user.id,
@@ -173,7 +184,9 @@ def book_parking_lot(lot_id):
             subject='Parking Booking Confirmed',
             message=f'You booked spot {spot.spot_number} at {lot.location_name}.',
             channel='email',
+            auto_commit=False,
         )
+        db.session.commit()
 
         flash(f'Parking spot {spot.spot_number} booked successfully!', 'success')
         return redirect(url_for('dashboard.user_dashboard'))
@@ -245,16 +258,27 @@ def release_booking(booking_id):
     duration_hours = max(1, round((release_time - booking.timestamp).total_seconds() / 3600))
     total_cost = duration_hours * spot.lot.price
 
-    booking.status = 'released'
-    booking.release_time = release_time
-    booking.cost = total_cost
-
-    spot.is_available = True
-    spot.lot.available_slots = count_bookable_spots_for_lot(spot.lot_id)
+    # Conditional, so a double-submitted release bills and notifies only once.
+    released = Booking.query.filter(
+        Booking.id == booking.id,
+        Booking.status == 'active',
+    ).update(
+        {'status': 'released', 'release_time': release_time, 'cost': total_cost},
+        synchronize_session=False,
+    )
+    if not released:
+        db.session.rollback()
+        flash('This booking is already released.', 'info')
+        return redirect(url_for('dashboard.user_dashboard'))
 
-    db.session.commit()
+    for field, value in (('status', 'released'), ('release_time', release_time), ('cost', total_cost)):
+        set_committed_value(booking, field, value)
+    release_spot(spot)
+    record_booking_released(booking)
 
-    invoice = generate_invoice_for_release(booking, total_cost)
+    # Release, invoice, notifications and any waitlist hand-off are one unit of
+    # work: a failure anywhere leaves the booking active and nothing billed.
+    invoice = generate_invoice_for_release(booking, total_cost, auto_commit=False)
 
     log_notification(
         user_id=current_user.id,
@@ -264,6 +288,7 @@ def release_booking(booking_id):
             f'Booking #{booking.id} released successfully. '
             f'Invoice {invoice.invoice_no} generated for INR {invoice.amount:.2f}.'
         ),
+        auto_commit=False,
     )
     log_notification(
         user_id=current_user.id,
@@ -274,14 +299,18 @@ def release_booking(booking_id):
             f'Invoice: {invoice.invoice_no}, Amount: INR {invoice.amount:.2f}.'
         ),
         channel='email',
+        auto_commit=False,
     )
 
-    _, waitlist_booking = fulfill_waitlist_for_lot(booking.lot_id)
+    waitlist_fulfilled = fulfill_waitlist_for_lot(booking.lot_id, auto_commit=False)
+    db.session.commit()
+    # The booking row changed through a bulk UPDATE, which the cache listeners do not see.
+    invalidate_response_cache()
 
     flash_message = (
         f'Release completed. Invoice {invoice.invoice_no} paid for INR {invoice.amount:.2f}.'
     )
-    if waitlist_booking:
+    if waitlist_fulfilled:
         flash_message += ' A waitlisted user was auto-assigned this lot.'
 
     flash(flash_message, 'success')
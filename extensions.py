@@ -1,8 +1,6 @@
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import LoginManager
-from flask_migrate import Migrate
 
 
 db = SQLAlchemy()
-login_manager = LoginManager()
-migrate = Migrate()
\ No newline at end of file
+login_manager = LoginManager()
\ No newline at end of file
@@ -0,0 +1,32 @@
+"""Add incrementally maintained occupancy counters to ParkingLot
+
+Revision ID: 5b7c2d9e4f10
+Revises: 2edd11789cc2
+Create Date: 2026-10-18 09:12:41.208377
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5b7c2d9e4f10'
+down_revision = '2edd11789cc2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('parking_lot', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('occupied_slots', sa.Integer(), nullable=False, server_default='0'))
+        batch_op.add_column(sa.Column('held_slots', sa.Integer(), nullable=False, server_default='0'))
+        batch_op.add_column(sa.Column('maintenance_slots', sa.Integer(), nullable=False, server_default='0'))
+
+    # Existing lots start from zero; run `flask reconcile-lot-counters` afterwards.
+
+
+def downgrade():
+    with op.batch_alter_table('parking_lot', schema=None) as batch_op:
+        batch_op.drop_column('maintenance_slots')
+        batch_op.drop_column('held_slots')
+        batch_op.drop_column('occupied_slots')
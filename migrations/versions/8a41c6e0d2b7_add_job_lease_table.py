@@ -0,0 +1,30 @@
+"""Add job_lease table for single-instance background workers
+
+Revision ID: 8a41c6e0d2b7
+Revises: 5b7c2d9e4f10
+Create Date: 2026-10-18 10:03:17.551902
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8a41c6e0d2b7'
+down_revision = '5b7c2d9e4f10'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('job_lease',
+    sa.Column('name', sa.String(length=50), nullable=False),
+    sa.Column('holder', sa.String(length=100), nullable=False),
+    sa.Column('acquired_at', sa.DateTime(), nullable=False),
+    sa.Column('expires_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('name')
+    )
+
+
+def downgrade():
+    op.drop_table('job_lease')
@@ -0,0 +1,37 @@
+"""Add indexes for the admin user directory
+
+Revision ID: a4d1c7e93b25
+Revises: f2b8d46a9c13
+Create Date: 2026-10-18 17:41:52.208113
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'a4d1c7e93b25'
+down_revision = 'f2b8d46a9c13'
+branch_labels = None
+depends_on = None
+
+
+INDEXES = [
+    ('ix_user_role_id', 'user', ['role', 'id']),
+    ('ix_user_full_name', 'user', ['full_name']),
+]
+
+
+def upgrade():
+    if op.get_bind().dialect.name == 'postgresql':
+        with op.get_context().autocommit_block():
+            for name, table, columns in INDEXES:
+                op.create_index(name, table, columns, postgresql_concurrently=True, if_not_exists=True)
+        return
+
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns, if_not_exists=True)
+
+
+def downgrade():
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table, if_exists=True)
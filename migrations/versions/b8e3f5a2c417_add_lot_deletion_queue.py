@@ -0,0 +1,55 @@
+"""Add background lot deletion queue and detachable invoices
+
+Revision ID: b8e3f5a2c417
+Revises: a4d1c7e93b25
+Create Date: 2026-10-18 18:36:14.902561
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b8e3f5a2c417'
+down_revision = 'a4d1c7e93b25'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('lot_deletion',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('lot_id', sa.Integer(), nullable=False),
+    sa.Column('lot_name', sa.String(length=100), nullable=False),
+    sa.Column('requested_by', sa.Integer(), nullable=True),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('total_rows', sa.Integer(), nullable=False),
+    sa.Column('deleted_rows', sa.Integer(), nullable=False),
+    sa.Column('last_error', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('started_at', sa.DateTime(), nullable=True),
+    sa.Column('finished_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['requested_by'], ['user.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('lot_deletion', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_lot_deletion_lot_id'), ['lot_id'], unique=False)
+
+    with op.batch_alter_table('parking_lot', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('deleted_at', sa.DateTime(), nullable=True))
+
+    with op.batch_alter_table('invoice', schema=None) as batch_op:
+        batch_op.alter_column('booking_id', existing_type=sa.Integer(), nullable=True)
+
+
+def downgrade():
+    with op.batch_alter_table('invoice', schema=None) as batch_op:
+        batch_op.alter_column('booking_id', existing_type=sa.Integer(), nullable=False)
+
+    with op.batch_alter_table('parking_lot', schema=None) as batch_op:
+        batch_op.drop_column('deleted_at')
+
+    with op.batch_alter_table('lot_deletion', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_lot_deletion_lot_id'))
+
+    op.drop_table('lot_deletion')
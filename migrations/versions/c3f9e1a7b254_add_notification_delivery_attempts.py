@@ -0,0 +1,28 @@
+"""Add delivery attempt tracking to NotificationLog
+
+Revision ID: c3f9e1a7b254
+Revises: 8a41c6e0d2b7
+Create Date: 2026-10-18 11:26:05.734190
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c3f9e1a7b254'
+down_revision = '8a41c6e0d2b7'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('notification_log', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('attempts', sa.Integer(), nullable=False, server_default='0'))
+        batch_op.add_column(sa.Column('next_attempt_at', sa.DateTime(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('notification_log', schema=None) as batch_op:
+        batch_op.drop_column('next_attempt_at')
+        batch_op.drop_column('attempts')
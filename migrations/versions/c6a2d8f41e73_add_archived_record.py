@@ -0,0 +1,36 @@
+"""Add archived_record table for retention policies
+
+Revision ID: c6a2d8f41e73
+Revises: b8e3f5a2c417
+Create Date: 2026-10-18 19:58:40.116734
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c6a2d8f41e73'
+down_revision = 'b8e3f5a2c417'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('archived_record',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('source_table', sa.String(length=50), nullable=False),
+    sa.Column('record_id', sa.Integer(), nullable=False),
+    sa.Column('archived_at', sa.DateTime(), nullable=False),
+    sa.Column('payload', sa.Text(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('archived_record', schema=None) as batch_op:
+        batch_op.create_index('ix_archived_record_source', ['source_table', 'record_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('archived_record', schema=None) as batch_op:
+        batch_op.drop_index('ix_archived_record_source')
+
+    op.drop_table('archived_record')
@@ -0,0 +1,33 @@
+"""Add booking_hourly_rollup table for admin analytics
+
+Revision ID: d7e24b9c1a06
+Revises: c3f9e1a7b254
+Create Date: 2026-10-18 13:41:52.208731
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd7e24b9c1a06'
+down_revision = 'c3f9e1a7b254'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('booking_hourly_rollup',
+    sa.Column('lot_id', sa.Integer(), nullable=False),
+    sa.Column('bucket_start', sa.DateTime(), nullable=False),
+    sa.Column('bookings', sa.Integer(), nullable=False),
+    sa.Column('releases', sa.Integer(), nullable=False),
+    sa.Column('revenue', sa.Float(), nullable=False),
+    sa.Column('duration_minutes', sa.Float(), nullable=False),
+    sa.ForeignKeyConstraint(['lot_id'], ['parking_lot.id'], ),
+    sa.PrimaryKeyConstraint('lot_id', 'bucket_start')
+    )
+
+
+def downgrade():
+    op.drop_table('booking_hourly_rollup')
@@ -0,0 +1,57 @@
+"""Add indexes for hot booking, hold, waitlist and notification queries
+
+Revision ID: e5a19f3c7d82
+Revises: d7e24b9c1a06
+Create Date: 2026-10-18 14:22:09.417365
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e5a19f3c7d82'
+down_revision = 'd7e24b9c1a06'
+branch_labels = None
+depends_on = None
+
+
+# (name, table, columns, Postgres partial-index predicate)
+INDEXES = [
+    ('ix_booking_user_timestamp', 'booking', ['user_id', 'timestamp'], None),
+    ('ix_booking_spot_status', 'booking', ['spot_id', 'status'], None),
+    ('ix_booking_lot_timestamp', 'booking', ['lot_id', 'timestamp'], None),
+    ('ix_spot_hold_lot_status_expires', 'spot_hold', ['lot_id', 'status', 'expires_at'], "status = 'active'"),
+    ('ix_spot_hold_user_lot_status', 'spot_hold', ['user_id', 'lot_id', 'status'], "status = 'active'"),
+    ('ix_spot_hold_status_expires', 'spot_hold', ['status', 'expires_at'], "status = 'active'"),
+    ('ix_waitlist_entry_lot_status_created', 'waitlist_entry', ['lot_id', 'status', 'created_at'], "status = 'waiting'"),
+    ('ix_waitlist_entry_user_status', 'waitlist_entry', ['user_id', 'status'], None),
+    ('ix_scheduled_booking_status_start', 'scheduled_booking', ['status', 'requested_start'], "status = 'scheduled'"),
+    ('ix_invoice_user_issued', 'invoice', ['user_id', 'issued_at'], None),
+    ('ix_notification_log_user_created', 'notification_log', ['user_id', 'created_at'], None),
+    ('ix_notification_log_status_created', 'notification_log', ['status', 'created_at'], "status = 'queued'"),
+    ('ix_spot_maintenance_window_lot_active_ends', 'spot_maintenance_window', ['lot_id', 'is_active', 'ends_at'], 'is_active'),
+    ('ix_spot_maintenance_window_spot_active', 'spot_maintenance_window', ['spot_id', 'is_active'], None),
+]
+
+
+def upgrade():
+    if op.get_bind().dialect.name == 'postgresql':
+        # Build without blocking writes on live tables.
+        with op.get_context().autocommit_block():
+            for name, table, columns, where in INDEXES:
+                op.create_index(
+                    name, table, columns,
+                    postgresql_where=sa.text(where) if where else None,
+                    postgresql_concurrently=True,
+                    if_not_exists=True,
+                )
+        return
+
+    for name, table, columns, _ in INDEXES:
+        op.create_index(name, table, columns, if_not_exists=True)
+
+
+def downgrade():
+    for name, table, _, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table, if_exists=True)
@@ -0,0 +1,61 @@
+"""Add search_document table and full-text index for admin search
+
+Revision ID: f2b8d46a9c13
+Revises: e5a19f3c7d82
+Create Date: 2026-10-18 15:08:44.902117
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f2b8d46a9c13'
+down_revision = 'e5a19f3c7d82'
+branch_labels = None
+depends_on = None
+
+
+SQLITE_DDL = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS search_document_fts USING fts5("
+    "body, content='search_document', content_rowid='id', tokenize='trigram')",
+    "CREATE TRIGGER IF NOT EXISTS search_document_ai AFTER INSERT ON search_document BEGIN "
+    "INSERT INTO search_document_fts(rowid, body) VALUES (new.id, new.body); END",
+    "CREATE TRIGGER IF NOT EXISTS search_document_ad AFTER DELETE ON search_document BEGIN "
+    "INSERT INTO search_document_fts(search_document_fts, rowid, body) VALUES ('delete', old.id, old.body); END",
+    "CREATE TRIGGER IF NOT EXISTS search_document_au AFTER UPDATE ON search_document BEGIN "
+    "INSERT INTO search_document_fts(search_document_fts, rowid, body) VALUES ('delete', old.id, old.body); "
+    "INSERT INTO search_document_fts(rowid, body) VALUES (new.id, new.body); END",
+)
+
+POSTGRES_DDL = (
+    'CREATE EXTENSION IF NOT EXISTS pg_trgm',
+    'CREATE INDEX IF NOT EXISTS ix_search_document_body_trgm ON search_document USING gin (body gin_trgm_ops)',
+)
+
+
+def upgrade():
+    op.create_table('search_document',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('kind', sa.String(length=10), nullable=False),
+    sa.Column('ref_id', sa.Integer(), nullable=False),
+    sa.Column('body', sa.Text(), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('kind', 'ref_id', name='uix_search_document_ref')
+    )
+
+    statements = {'sqlite': SQLITE_DDL, 'postgresql': POSTGRES_DDL}.get(op.get_bind().dialect.name, ())
+    for statement in statements:
+        op.execute(statement)
+
+
+def downgrade():
+    dialect = op.get_bind().dialect.name
+    if dialect == 'sqlite':
+        for trigger in ('search_document_ai', 'search_document_ad', 'search_document_au'):
+            op.execute(f'DROP TRIGGER IF EXISTS {trigger}')
+        op.execute('DROP TABLE IF EXISTS search_document_fts')
+    elif dialect == 'postgresql':
+        op.execute('DROP INDEX IF EXISTS ix_search_document_body_trgm')
+
+    op.drop_table('search_document')
@@ -12,6 +12,11 @@ class User(db.Model, UserMixin):
     address = db.Column(db.String(200))
     pincode = db.Column(db.String(10))
     role = db.Column(db.String(10), default='user')  # 'user' or 'admin'
+
+    __table_args__ = (
+        db.Index('ix_user_role_id', 'role', 'id'),
+        db.Index('ix_user_full_name', 'full_name'),
+    )
     
     def set_password(self, password):
         self.password= generate_password_hash(password)
@@ -37,12 +42,18 @@ class ParkingLot(db.Model):
     price = db.Column(db.Float, nullable=False) 
     total_slots = db.Column(db.Integer, nullable=False)
     available_slots = db.Column(db.Integer, nullable=False)
+    # Maintained incrementally by services.lot_counters; repair with `flask reconcile-lot-counters`
+    occupied_slots = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    held_slots = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    maintenance_slots = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    # Set when the lot is queued for background deletion (services.lot_deletion); hidden from users from then on
+    deleted_at = db.Column(db.DateTime, nullable=True)
     owner = db.relationship("User")
     spots = db.relationship('ParkingSpot', backref='lot', cascade='all, delete-orphan')
 
     @property
     def available_spots(self):
-        return sum(1 for spot in self.spots if spot.is_available)
+        return self.total_slots - self.occupied_slots
 
 class Booking(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -65,6 +76,12 @@ class Booking(db.Model):
     
     user = db.relationship('User', backref='bookings')
     parking_lot = db.relationship('ParkingLot', backref='bookings')
+
+    __table_args__ = (
+        db.Index('ix_booking_user_timestamp', 'user_id', 'timestamp'),
+        db.Index('ix_booking_spot_status', 'spot_id', 'status'),
+        db.Index('ix_booking_lot_timestamp', 'lot_id', 'timestamp'),
+    )
     
 # class SearchHistory(db.Model):
 #     id = db.Column(db.Integer, primary_key = True)
@@ -114,6 +131,16 @@ class SpotHold(db.Model):
     lot = db.relationship('ParkingLot', backref='spot_holds')
     spot = db.relationship('ParkingSpot', backref='spot_holds')
 
+    # Postgres keeps only live holds in these; SQLite indexes every row.
+    __table_args__ = (
+        db.Index('ix_spot_hold_lot_status_expires', 'lot_id', 'status', 'expires_at',
+                 postgresql_where=db.text("status = 'active'")),
+        db.Index('ix_spot_hold_user_lot_status', 'user_id', 'lot_id', 'status',
+                 postgresql_where=db.text("status = 'active'")),
+        db.Index('ix_spot_hold_status_expires', 'status', 'expires_at',
+                 postgresql_where=db.text("status = 'active'")),
+    )
+
 
 class WaitlistEntry(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -132,6 +159,12 @@ class WaitlistEntry(db.Model):
     lot = db.relationship('ParkingLot', backref='waitlist_entries')
     vehicle = db.relationship('Vehicle', backref='waitlist_entries')
 
+    __table_args__ = (
+        db.Index('ix_waitlist_entry_lot_status_created', 'lot_id', 'status', 'created_at',
+                 postgresql_where=db.text("status = 'waiting'")),
+        db.Index('ix_waitlist_entry_user_status', 'user_id', 'status'),
+    )
+
 
 class ScheduledBooking(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -152,10 +185,15 @@ class ScheduledBooking(db.Model):
     assigned_spot = db.relationship('ParkingSpot', backref='scheduled_bookings')
     converted_booking = db.relationship('Booking', backref='scheduled_source')
 
+    __table_args__ = (
+        db.Index('ix_scheduled_booking_status_start', 'status', 'requested_start',
+                 postgresql_where=db.text("status = 'scheduled'")),
+    )
+
 
 class Invoice(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    booking_id = db.Column(db.Integer, db.ForeignKey('booking.id'), nullable=False)
+    booking_id = db.Column(db.Integer, db.ForeignKey('booking.id'), nullable=True)  # NULL once the lot's history is purged
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     invoice_no = db.Column(db.String(32), unique=True, nullable=False)
     amount = db.Column(db.Float, nullable=False)
@@ -168,6 +206,10 @@ class Invoice(db.Model):
     booking = db.relationship('Booking', backref='invoices')
     user = db.relationship('User', backref='invoices')
 
+    __table_args__ = (
+        db.Index('ix_invoice_user_issued', 'user_id', 'issued_at'),
+    )
+
 
 class NotificationLog(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -180,9 +222,17 @@ class NotificationLog(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
     sent_at = db.Column(db.DateTime, nullable=True)
     error_message = db.Column(db.Text, nullable=True)
+    attempts = db.Column(db.Integer, default=0, nullable=False, server_default='0')
+    next_attempt_at = db.Column(db.DateTime, nullable=True)  # retry backoff for queued email/sms
 
     user = db.relationship('User', backref='notifications')
 
+    __table_args__ = (
+        db.Index('ix_notification_log_user_created', 'user_id', 'created_at'),
+        db.Index('ix_notification_log_status_created', 'status', 'created_at',
+                 postgresql_where=db.text("status = 'queued'")),
+    )
+
 
 class PasswordResetToken(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -208,4 +258,77 @@ class SpotMaintenanceWindow(db.Model):
     spot = db.relationship('ParkingSpot', backref='maintenance_windows')
     lot = db.relationship('ParkingLot', backref='maintenance_windows')
     creator = db.relationship('User', backref='created_maintenance_windows')
+
+    __table_args__ = (
+        db.Index('ix_spot_maintenance_window_lot_active_ends', 'lot_id', 'is_active', 'ends_at',
+                 postgresql_where=db.text('is_active')),
+        db.Index('ix_spot_maintenance_window_spot_active', 'spot_id', 'is_active'),
+    )
     
+
+
+class JobLease(db.Model):
+    name = db.Column(db.String(50), primary_key=True)
+    holder = db.Column(db.String(100), nullable=False)
+    acquired_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    expires_at = db.Column(db.DateTime, nullable=False)
+
+
+class BookingHourlyRollup(db.Model):
+    """Per-lot, per-hour booking totals kept current as bookings start and end."""
+
+    lot_id = db.Column(db.Integer, db.ForeignKey('parking_lot.id'), primary_key=True)
+    bucket_start = db.Column(db.DateTime, primary_key=True)  # UTC, truncated to the hour
+    bookings = db.Column(db.Integer, default=0, nullable=False)  # bookings started in this hour
+    releases = db.Column(db.Integer, default=0, nullable=False)  # bookings released in this hour
+    revenue = db.Column(db.Float, default=0.0, nullable=False)  # cost of those releases
+    duration_minutes = db.Column(db.Float, default=0.0, nullable=False)  # parked time of those releases
+
+
+class SearchDocument(db.Model):
+    """Searchable text for a lot or a user, mirrored into the full-text index (services/search.py)."""
+
+    id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String(10), nullable=False)  # lot, user
+    ref_id = db.Column(db.Integer, nullable=False)
+    body = db.Column(db.Text, nullable=False)
+
+    __table_args__ = (
+        db.UniqueConstraint('kind', 'ref_id', name='uix_search_document_ref'),
+    )
+
+
+class LotDeletion(db.Model):
+    """Progress of a lot being purged in batches by `flask purge-deleted-lots`."""
+
+    id = db.Column(db.Integer, primary_key=True)
+    lot_id = db.Column(db.Integer, nullable=False, index=True)  # not a FK: the lot row is deleted last
+    lot_name = db.Column(db.String(100), nullable=False)
+    requested_by = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=True)
+    status = db.Column(db.String(20), default='pending', nullable=False)  # pending, running, done, failed
+    total_rows = db.Column(db.Integer, default=0, nullable=False)
+    deleted_rows = db.Column(db.Integer, default=0, nullable=False)
+    last_error = db.Column(db.Text, nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    started_at = db.Column(db.DateTime, nullable=True)
+    finished_at = db.Column(db.DateTime, nullable=True)
+
+    @property
+    def progress_percent(self) -> int:
+        if self.status == 'done' or not self.total_rows:
+            return 100 if self.status == 'done' else 0
+        return min(99, int(self.deleted_rows * 100 / self.total_rows))
+
+
+class ArchivedRecord(db.Model):
+    """A row moved out of a hot table by a retention policy (services/retention.py), kept as JSON."""
+
+    id = db.Column(db.Integer, primary_key=True)
+    source_table = db.Column(db.String(50), nullable=False)
+    record_id = db.Column(db.Integer, nullable=False)
+    archived_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    payload = db.Column(db.Text, nullable=False)
+
+    __table_args__ = (
+        db.Index('ix_archived_record_source', 'source_table', 'record_id'),
+    )
@@ -3,7 +3,12 @@ from .parking_features import (
     WAITLIST_LOOKAHEAD_HOURS,
     activate_due_scheduled_bookings,
     add_to_waitlist,
+    allocate_spots_for_entries,
+    claim_spot,
+    claim_spots,
+    close_spot_hold,
     count_bookable_spots_for_lot,
+    count_bookable_spots_for_lots,
     cleanup_expired_spot_holds,
     create_or_refresh_spot_hold,
     create_vehicle_for_user,
@@ -15,4 +20,60 @@ from .parking_features import (
     get_user_vehicle_choices,
     log_notification,
     parse_schedule_datetime,
+    release_spot,
+)
+from .spot_index import init_spot_index
+from .bootstrap import ensure_admin_user, initialize_database
+from .retention import RETENTION_BATCH_SIZE, RETENTION_POLICIES, apply_retention, apply_retention_policy
+from .lot_deletion import (
+    LOT_DELETION_BATCH_SIZE,
+    purge_lot_batch,
+    request_lot_deletion,
+    requeue_failed_lot_deletions,
+    run_lot_deletions,
+)
+from .lot_provisioning import (
+    LOT_IMPORT_FIELDS,
+    MAX_SPOTS_PER_LOT,
+    delete_spot_dependents,
+    grow_lot_spots,
+    insert_lot_spots,
+    lock_lot,
+    parse_lot_import,
+    provision_lots,
+    shrink_lot_spots,
+)
+from .search import (
+    init_search_index,
+    matching_ref_ids,
+    rebuild_search_index,
+    reindex_search_documents,
+    search_documents,
+)
+from .booking_history import (
+    HISTORY_PAGE_SIZE,
+    decode_history_cursor,
+    get_active_bookings,
+    get_booking_history_page,
+)
+from .user_cache import init_user_cache, invalidate_session_user, load_session_user, user_cache
+from .response_cache import cached_json, init_response_cache, invalidate_response_cache, response_cache
+from .rollups import (
+    hourly_booking_counts,
+    rebuild_booking_rollups,
+    record_booking_released,
+    record_bookings_started,
+    retract_booking_rollups,
+    top_lots_by_bookings,
+)
+from .lot_counters import adjust_lot_counters, compute_lot_counters, reconcile_lot_counters
+from .scheduler import acquire_job_lease, release_job_lease, run_scheduler
+from .outbox import dispatch_queued_notifications, run_notification_dispatcher
+from .exports import (
+    BOOKING_EXPORT_HEADER,
+    INVOICE_EXPORT_HEADER,
+    booking_export_rows,
+    invoice_export_rows,
+    parse_export_range,
+    stream_csv,
 )
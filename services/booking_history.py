@@ -0,0 +1,64 @@
+import base64
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+from sqlalchemy import tuple_
+from sqlalchemy.orm import selectinload
+
+from models.models import Booking
+
+HISTORY_PAGE_SIZE = 10
+MAX_HISTORY_PAGE_SIZE = 100
+
+
+def _eager_loads():
+    # Built per query: creating loader options at import time configures every
+    # mapper, which would put that work on each worker's startup path.
+    return selectinload(Booking.parking_lot), selectinload(Booking.parking_spot)
+
+
+def encode_history_cursor(booking: Booking) -> str:
+    raw = f'{booking.timestamp.isoformat()}|{booking.id}'
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_history_cursor(cursor: str) -> Optional[Tuple[datetime, int]]:
+    """Return the ``(timestamp, id)`` a cursor points at, or None if it is malformed."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+        timestamp, booking_id = raw.rsplit('|', 1)
+        return datetime.fromisoformat(timestamp), int(booking_id)
+    except ValueError:
+        return None
+
+
+def get_active_bookings(user_id: int) -> List[Booking]:
+    return Booking.query.options(*_eager_loads()).filter(
+        Booking.user_id == user_id,
+        Booking.status == 'active',
+    ).order_by(Booking.timestamp.desc(), Booking.id.desc()).all()
+
+
+def get_booking_history_page(
+    user_id: int,
+    after: Optional[Tuple[datetime, int]] = None,
+    limit: int = HISTORY_PAGE_SIZE,
+) -> Tuple[List[Booking], Optional[str]]:
+    """One page of finished bookings, newest first, and the cursor for the next page.
+
+    Pages are keyed on ``(timestamp, id)`` rather than an offset, so every
+    page is an index range scan no matter how deep the history goes.
+    Lots and spots are loaded with one ``selectinload`` query each.
+    """
+    limit = max(1, min(limit, MAX_HISTORY_PAGE_SIZE))
+    query = Booking.query.options(*_eager_loads()).filter(
+        Booking.user_id == user_id,
+        Booking.status != 'active',
+    )
+    if after is not None:
+        query = query.filter(tuple_(Booking.timestamp, Booking.id) < tuple_(*after))
+
+    rows = query.order_by(Booking.timestamp.desc(), Booking.id.desc()).limit(limit + 1).all()
+    page = rows[:limit]
+    next_cursor = encode_history_cursor(page[-1]) if len(rows) > limit else None
+    return page, next_cursor
@@ -0,0 +1,37 @@
+import os
+from typing import Optional
+
+from extensions import db
+from models.models import User
+
+
+def ensure_admin_user(email: Optional[str] = None, password: Optional[str] = None) -> Optional[User]:
+    """Create the admin account from ``ADMIN_EMAIL``/``ADMIN_PASSWORD`` if it is missing.
+
+    Returns the new user, or None when an account with that email already
+    exists (its password is left alone).
+    """
+    email = email or os.environ.get('ADMIN_EMAIL', 'admin@parking.com')
+    password = password or os.environ.get('ADMIN_PASSWORD', 'admin123')
+
+    if User.query.filter_by(email=email).first():
+        return None
+
+    admin = User(
+        email=email,
+        full_name='Admin',
+        address='Head Office',
+        pincode='000000',
+        role='admin',
+    )
+    admin.set_password(password)
+    db.session.add(admin)
+    db.session.commit()
+    return admin
+
+
+def initialize_database(create_tables: bool = True) -> Optional[User]:
+    """Create any missing tables, then seed the admin account; returns the admin if one was created."""
+    if create_tables:
+        db.create_all()
+    return ensure_admin_user()
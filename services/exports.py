@@ -0,0 +1,142 @@
+import csv
+import io
+import zlib
+from datetime import datetime, timedelta
+from typing import Iterable, Iterator, Optional
+
+from extensions import db
+from models.models import Booking, Invoice, ParkingLot, ParkingSpot, User
+
+from .parking_features import parse_schedule_datetime
+
+EXPORT_CHUNK_ROWS = 1000
+
+BOOKING_EXPORT_HEADER = ['Booking ID', 'User Email', 'Lot', 'Spot', 'Vehicle', 'Status', 'Start', 'Release', 'Cost']
+INVOICE_EXPORT_HEADER = ['Invoice No', 'Booking ID', 'User Email', 'Amount', 'Currency', 'Status', 'Issued At', 'Paid At']
+
+
+def parse_export_range(start_raw: Optional[str], end_raw: Optional[str]):
+    """Parse ``start``/``end`` query values; a date-only ``end`` includes that day."""
+    start = parse_schedule_datetime(start_raw or '')
+    end = parse_schedule_datetime(end_raw or '')
+    if end is not None and end_raw and len(end_raw.strip()) == 10:
+        end += timedelta(days=1)
+    return start, end
+
+
+def _isoformat(value: Optional[datetime]) -> str:
+    return value.isoformat() if value else ''
+
+
+def booking_export_rows(
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    lot_id: Optional[int] = None,
+    status: Optional[str] = None,
+) -> Iterator[list]:
+    query = db.session.query(
+        Booking.id,
+        User.email,
+        ParkingLot.location_name,
+        ParkingSpot.spot_number,
+        Booking.vehicle_no,
+        Booking.status,
+        Booking.timestamp,
+        Booking.release_time,
+        Booking.cost,
+    ).outerjoin(User, User.id == Booking.user_id).outerjoin(
+        ParkingLot, ParkingLot.id == Booking.lot_id,
+    ).outerjoin(ParkingSpot, ParkingSpot.id == Booking.spot_id)
+
+    if start is not None:
+        query = query.filter(Booking.timestamp >= start)
+    if end is not None:
+        query = query.filter(Booking.timestamp < end)
+    if lot_id is not None:
+        query = query.filter(Booking.lot_id == lot_id)
+    if status:
+        query = query.filter(Booking.status == status)
+
+    query = query.order_by(Booking.timestamp.desc()).yield_per(EXPORT_CHUNK_ROWS)
+    for booking_id, email, lot_name, spot_number, vehicle_no, booking_status, started, released, cost in query:
+        yield [
+            booking_id,
+            email or '',
+            lot_name or '',
+            spot_number if spot_number is not None else '',
+            vehicle_no,
+            booking_status,
+            _isoformat(started),
+            _isoformat(released),
+            cost if cost is not None else '',
+        ]
+
+
+def invoice_export_rows(
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    lot_id: Optional[int] = None,
+    status: Optional[str] = None,
+) -> Iterator[list]:
+    query = db.session.query(
+        Invoice.invoice_no,
+        Invoice.booking_id,
+        User.email,
+        Invoice.amount,
+        Invoice.currency,
+        Invoice.status,
+        Invoice.issued_at,
+        Invoice.paid_at,
+    ).outerjoin(User, User.id == Invoice.user_id)
+
+    if start is not None:
+        query = query.filter(Invoice.issued_at >= start)
+    if end is not None:
+        query = query.filter(Invoice.issued_at < end)
+    if lot_id is not None:
+        query = query.join(Booking, Booking.id == Invoice.booking_id).filter(Booking.lot_id == lot_id)
+    if status:
+        query = query.filter(Invoice.status == status)
+
+    query = query.order_by(Invoice.issued_at.desc()).yield_per(EXPORT_CHUNK_ROWS)
+    for invoice_no, booking_id, email, amount, currency, invoice_status, issued_at, paid_at in query:
+        yield [
+            invoice_no,
+            booking_id,
+            email or '',
+            amount,
+            currency,
+            invoice_status,
+            _isoformat(issued_at),
+            _isoformat(paid_at),
+        ]
+
+
+def stream_csv(header: list, rows: Iterable[list], compress: bool = False) -> Iterator[bytes]:
+    """Encode rows as CSV chunks of ``EXPORT_CHUNK_ROWS``, gzip-compressed if asked."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    compressor = zlib.compressobj(wbits=31) if compress else None
+
+    def flush() -> bytes:
+        data = buffer.getvalue().encode('utf-8')
+        buffer.seek(0)
+        buffer.truncate()
+        return compressor.compress(data) if compressor else data
+
+    writer.writerow(header)
+    pending = 0
+    for row in rows:
+        writer.writerow(row)
+        pending += 1
+        if pending >= EXPORT_CHUNK_ROWS:
+            chunk = flush()
+            if chunk:
+                yield chunk
+            pending = 0
+
+    chunk = flush()
+    if compressor:
+        chunk += compressor.flush()
+    if chunk:
+        yield chunk
@@ -0,0 +1,156 @@
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from sqlalchemy import and_, case, exists, func, not_, or_
+
+from extensions import db
+from models.models import ParkingLot, ParkingSpot, SpotHold, SpotMaintenanceWindow
+
+COUNTER_FIELDS = ('total_slots', 'occupied_slots', 'held_slots', 'maintenance_slots', 'available_slots')
+
+
+def _bookable_expression(total, occupied, held, maintenance):
+    remaining = total - occupied - held - maintenance
+    return case((remaining < 0, 0), else_=remaining)
+
+
+def adjust_lot_counters(
+    lot_id: int,
+    occupied: int = 0,
+    held: int = 0,
+    maintenance: int = 0,
+    total: int = 0,
+) -> None:
+    """Apply counter deltas to a lot inside the caller's transaction.
+
+    The update is a single relative ``SET col = col + delta`` statement, so
+    concurrent workers never overwrite each other's changes, and
+    ``available_slots`` is derived from the new values in the same row.
+    """
+    if not (occupied or held or maintenance or total):
+        return
+
+    ParkingLot.query.filter(ParkingLot.id == lot_id).update(
+        {
+            'total_slots': ParkingLot.total_slots + total,
+            'occupied_slots': ParkingLot.occupied_slots + occupied,
+            'held_slots': ParkingLot.held_slots + held,
+            'maintenance_slots': ParkingLot.maintenance_slots + maintenance,
+            'available_slots': _bookable_expression(
+                ParkingLot.total_slots + total,
+                ParkingLot.occupied_slots + occupied,
+                ParkingLot.held_slots + held,
+                ParkingLot.maintenance_slots + maintenance,
+            ),
+        },
+        synchronize_session=False,
+    )
+
+    lot = db.session.identity_map.get(db.session.identity_key(ParkingLot, lot_id))
+    if lot is not None:
+        db.session.expire(lot, list(COUNTER_FIELDS))
+
+
+def compute_lot_counters(lot_ids: Optional[List[int]] = None) -> Dict[int, Dict[str, int]]:
+    """Recount every lot counter from the spot, hold and maintenance tables.
+
+    The categories are exclusive, so no spot is subtracted twice: a spot is
+    occupied, or else in maintenance, or else held by an unexpired hold, or
+    else available. Maintenance and hold windows use the same ``ends_at`` /
+    ``expires_at`` rules as ``count_bookable_spots_for_lots``.
+    """
+    # Lots queued for deletion have their spots closed without counter changes.
+    lot_query = db.session.query(ParkingLot.id).filter(ParkingLot.deleted_at.is_(None))
+    if lot_ids is not None:
+        lot_query = lot_query.filter(ParkingLot.id.in_(lot_ids))
+
+    counts = {
+        lot_id: {'total_slots': 0, 'occupied_slots': 0, 'held_slots': 0, 'maintenance_slots': 0}
+        for (lot_id,) in lot_query.all()
+    }
+    if not counts:
+        return {}
+
+    now = datetime.utcnow()
+    is_free = ParkingSpot.is_available.is_(True)
+    in_maintenance = exists().where(
+        SpotMaintenanceWindow.spot_id == ParkingSpot.id,
+        SpotMaintenanceWindow.is_active.is_(True),
+        or_(SpotMaintenanceWindow.ends_at.is_(None), SpotMaintenanceWindow.ends_at > now),
+    )
+    held = exists().where(
+        SpotHold.spot_id == ParkingSpot.id,
+        SpotHold.status == 'active',
+        SpotHold.expires_at >= now,
+    )
+
+    rows = db.session.query(
+        ParkingSpot.lot_id,
+        func.count(ParkingSpot.id),
+        func.sum(case((not_(is_free), 1), else_=0)),
+        func.sum(case((and_(is_free, in_maintenance), 1), else_=0)),
+        func.sum(case((and_(is_free, not_(in_maintenance), held), 1), else_=0)),
+    ).filter(ParkingSpot.lot_id.in_(counts)).group_by(ParkingSpot.lot_id).all()
+    for lot_id, total, occupied, maintenance, held_count in rows:
+        counts[lot_id] = {
+            'total_slots': total,
+            'occupied_slots': int(occupied or 0),
+            'held_slots': int(held_count or 0),
+            'maintenance_slots': int(maintenance or 0),
+        }
+
+    for values in counts.values():
+        values['available_slots'] = max(
+            0,
+            values['total_slots'] - values['occupied_slots'] - values['held_slots'] - values['maintenance_slots'],
+        )
+
+    return counts
+
+
+def _expire_lapsed_holds(lot_ids: Optional[List[int]]) -> None:
+    # Lapsed holds stay 'active' (and counted) until sweep-holds expires them.
+    # A repair recounts without them, so expire them here; otherwise the next
+    # sweep would subtract them a second time.
+    query = SpotHold.query.filter(SpotHold.status == 'active', SpotHold.expires_at < datetime.utcnow())
+    if lot_ids is not None:
+        query = query.filter(SpotHold.lot_id.in_(lot_ids))
+    query.update({'status': 'expired'}, synchronize_session=False)
+
+
+def reconcile_lot_counters(lot_ids: Optional[List[int]] = None, repair: bool = True) -> Dict[int, Dict[str, tuple]]:
+    """Compare stored lot counters with a recount and optionally fix them.
+
+    Returns ``{lot_id: {field: (stored, expected)}}`` for every drifted field.
+    Holds that lapsed but were not swept yet show up as ``held_slots`` drift.
+    """
+    if repair:
+        _expire_lapsed_holds(lot_ids)
+    expected = compute_lot_counters(lot_ids)
+    stored_rows = db.session.query(
+        ParkingLot.id,
+        *[getattr(ParkingLot, field) for field in COUNTER_FIELDS],
+    ).filter(ParkingLot.id.in_(expected)).all()
+
+    drift = {}
+    for lot_id, *stored_values in stored_rows:
+        stored = dict(zip(COUNTER_FIELDS, stored_values))
+        lot_drift = {
+            field: (stored[field], expected[lot_id][field])
+            for field in COUNTER_FIELDS
+            if stored[field] != expected[lot_id][field]
+        }
+        if not lot_drift:
+            continue
+
+        drift[lot_id] = lot_drift
+        if repair:
+            ParkingLot.query.filter(ParkingLot.id == lot_id).update(
+                expected[lot_id],
+                synchronize_session=False,
+            )
+
+    if repair:
+        db.session.commit()
+
+    return drift
@@ -0,0 +1,206 @@
+import time
+from typing import Callable, List, Optional
+
+from sqlalchemy import func, select
+
+from extensions import db
+from models.models import (
+    Booking,
+    BookingHourlyRollup,
+    Invoice,
+    LotDeletion,
+    ParkingLot,
+    ParkingSpot,
+    ScheduledBooking,
+    SpotHold,
+    SpotMaintenanceWindow,
+    WaitlistEntry,
+)
+
+from .parking_features import utcnow
+from .response_cache import invalidate_response_cache
+from .scheduler import acquire_job_lease, default_lease_holder, release_job_lease
+from .search import reindex_search_documents
+from .spot_index import registry as spot_index_registry
+
+LOT_DELETION_LEASE_NAME = 'lot-deletions'
+LOT_DELETION_BATCH_SIZE = 1000
+
+# Purged in this order, one bounded batch per transaction: (model, key column, lot column).
+# Bookings are handled separately because invoices point at them.
+_PURGE_STEPS = (
+    (BookingHourlyRollup, BookingHourlyRollup.bucket_start, BookingHourlyRollup.lot_id),
+    (SpotHold, SpotHold.id, SpotHold.lot_id),
+    (SpotMaintenanceWindow, SpotMaintenanceWindow.id, SpotMaintenanceWindow.lot_id),
+    (WaitlistEntry, WaitlistEntry.id, WaitlistEntry.lot_id),
+    (ScheduledBooking, ScheduledBooking.id, ScheduledBooking.lot_id),
+    (ParkingSpot, ParkingSpot.id, ParkingSpot.lot_id),
+)
+
+
+def _count_lot_rows(lot_id: int) -> int:
+    total = db.session.query(func.count(Booking.id)).filter(Booking.lot_id == lot_id).scalar()
+    for model, key, lot_column in _PURGE_STEPS:
+        total += db.session.query(func.count()).select_from(model).filter(lot_column == lot_id).scalar()
+    return total
+
+
+def request_lot_deletion(lot: ParkingLot, requested_by: Optional[int] = None) -> LotDeletion:
+    """Retire a lot now and queue its history for background purging.
+
+    This request only touches live rows: the lot is marked deleted (hidden
+    from users and closed to bookings), its spots are closed, and waiting,
+    scheduled and held entries are cancelled. Historical rows are removed
+    later by :func:`purge_lot_batch` in short transactions.
+    """
+    now = utcnow()
+    lot.deleted_at = now
+    ParkingSpot.query.filter(ParkingSpot.lot_id == lot.id).update({'is_available': False}, synchronize_session=False)
+    WaitlistEntry.query.filter(
+        WaitlistEntry.lot_id == lot.id,
+        WaitlistEntry.status == 'waiting',
+    ).update({'status': 'cancelled'}, synchronize_session=False)
+    ScheduledBooking.query.filter(
+        ScheduledBooking.lot_id == lot.id,
+        ScheduledBooking.status == 'scheduled',
+    ).update({'status': 'cancelled'}, synchronize_session=False)
+    SpotHold.query.filter(
+        SpotHold.lot_id == lot.id,
+        SpotHold.status == 'active',
+    ).update({'status': 'cancelled'}, synchronize_session=False)
+
+    job = LotDeletion(
+        lot_id=lot.id,
+        lot_name=lot.location_name,
+        requested_by=requested_by,
+        total_rows=_count_lot_rows(lot.id) + 1,
+    )
+    db.session.add(job)
+    db.session.commit()
+    spot_index_registry.invalidate(lot.id)
+    return job
+
+
+def _purge_bookings(lot_id: int, batch_size: int) -> int:
+    booking_ids = list(db.session.execute(
+        select(Booking.id).where(Booking.lot_id == lot_id).order_by(Booking.id).limit(batch_size)
+    ).scalars())
+    if not booking_ids:
+        return 0
+
+    # Invoices are financial records: keep them, detached from the purged booking.
+    Invoice.query.filter(Invoice.booking_id.in_(booking_ids)).update(
+        {'booking_id': None},
+        synchronize_session=False,
+    )
+    ScheduledBooking.query.filter(ScheduledBooking.converted_booking_id.in_(booking_ids)).update(
+        {'converted_booking_id': None},
+        synchronize_session=False,
+    )
+    return Booking.query.filter(Booking.id.in_(booking_ids)).delete(synchronize_session=False)
+
+
+def _purge_step(model, key, lot_column, lot_id: int, batch_size: int) -> int:
+    batch = select(key).where(lot_column == lot_id).limit(batch_size).scalar_subquery()
+    return model.query.filter(lot_column == lot_id, key.in_(batch)).delete(synchronize_session=False)
+
+
+def purge_lot_batch(job: LotDeletion, batch_size: int = LOT_DELETION_BATCH_SIZE) -> int:
+    """Delete one batch of the lot's rows and commit; returns rows removed.
+
+    Each call is its own short transaction touching at most ``batch_size``
+    rows of one table, so bookings on other lots only ever wait for one
+    batch. Once every dependent table is empty the lot row itself goes and
+    the job is marked done.
+    """
+    if job.status == 'pending':
+        job.status = 'running'
+        job.started_at = utcnow()
+
+    deleted = _purge_bookings(job.lot_id, batch_size)
+    for model, key, lot_column in _PURGE_STEPS:
+        if deleted:
+            break
+        deleted = _purge_step(model, key, lot_column, job.lot_id, batch_size)
+
+    if not deleted:
+        deleted = ParkingLot.query.filter(ParkingLot.id == job.lot_id).delete(synchronize_session=False)
+        reindex_search_documents(db.session.connection(), lot_ids=[job.lot_id])
+        job.status = 'done'
+        job.finished_at = utcnow()
+
+    job.deleted_rows += deleted
+    db.session.commit()
+    if job.status == 'done':
+        invalidate_response_cache()
+    return deleted
+
+
+def run_lot_deletions(
+    batch_size: int = LOT_DELETION_BATCH_SIZE,
+    pause_seconds: float = 0.05,
+    once: bool = False,
+    idle_seconds: int = 30,
+    holder: Optional[str] = None,
+    echo: Callable[[str], None] = print,
+) -> None:
+    """Purge queued lot deletions batch by batch until stopped.
+
+    A job lease keeps a single worker active. ``pause_seconds`` between
+    batches gives other writers a turn at the SQLite write lock. With
+    ``once`` it stops when the queue is empty instead of polling every
+    ``idle_seconds``.
+    """
+    holder = holder or default_lease_holder()
+
+    try:
+        while True:
+            if not acquire_job_lease(LOT_DELETION_LEASE_NAME, holder):
+                if once:
+                    echo('Another worker holds the lot-deletion lease.')
+                    return
+                time.sleep(idle_seconds)
+                continue
+
+            job = LotDeletion.query.filter(LotDeletion.status.in_(('pending', 'running'))).order_by(
+                LotDeletion.created_at.asc(),
+            ).first()
+            if job is None:
+                if once:
+                    return
+                time.sleep(idle_seconds)
+                continue
+
+            try:
+                deleted = purge_lot_batch(job, batch_size)
+            except Exception as exc:
+                db.session.rollback()
+                job.status = 'failed'
+                job.last_error = str(exc)[:2000]
+                db.session.commit()
+                echo(f'Lot #{job.lot_id} ({job.lot_name}): failed: {exc}')
+                continue
+
+            echo(
+                f'Lot #{job.lot_id} ({job.lot_name}): removed {deleted} row(s), '
+                f'{job.deleted_rows}/{job.total_rows} ({job.progress_percent}%)'
+            )
+            time.sleep(pause_seconds)
+    finally:
+        # Never commit half a batch on the way out (e.g. Ctrl-C mid-purge).
+        db.session.rollback()
+        release_job_lease(LOT_DELETION_LEASE_NAME, holder)
+
+
+def requeue_failed_lot_deletions(job_ids: Optional[List[int]] = None) -> int:
+    """Put failed deletion jobs back in the queue; returns how many were requeued.
+
+    Purging resumes where it stopped: every batch is its own transaction, so
+    the rows a failed job already removed stay removed.
+    """
+    query = LotDeletion.query.filter(LotDeletion.status == 'failed')
+    if job_ids:
+        query = query.filter(LotDeletion.id.in_(job_ids))
+    requeued = query.update({'status': 'pending', 'last_error': None}, synchronize_session=False)
+    db.session.commit()
+    return requeued
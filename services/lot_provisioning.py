@@ -0,0 +1,285 @@
+import csv
+import io
+import json
+import re
+import time
+from typing import Dict, Iterable, List, Tuple
+
+from sqlalchemy import func, insert, select, update
+
+from extensions import db
+from models.models import (
+    Booking,
+    Invoice,
+    ParkingLot,
+    ParkingSpot,
+    ScheduledBooking,
+    SpotHold,
+    SpotMaintenanceWindow,
+)
+from .lot_counters import adjust_lot_counters
+from .response_cache import invalidate_response_cache
+from .rollups import retract_booking_rollups
+from .search import reindex_search_documents
+from .spot_index import note_lot_invalidated
+
+SPOT_INSERT_BATCH_SIZE = 5000
+MAX_SPOTS_PER_LOT = 20000
+LOT_IMPORT_FIELDS = ('location_name', 'address', 'pincode', 'price', 'total_slots')
+
+_PINCODE_PATTERN = re.compile(r'^[0-9]{6}$')
+
+
+def _insert_spot_labels(connection, lot_id: int, labels: List[str]) -> int:
+    for start in range(0, len(labels), SPOT_INSERT_BATCH_SIZE):
+        connection.execute(
+            insert(ParkingSpot),
+            [
+                {'lot_id': lot_id, 'spot_number': label, 'is_available': True}
+                for label in labels[start:start + SPOT_INSERT_BATCH_SIZE]
+            ],
+        )
+    return len(labels)
+
+
+def insert_lot_spots(connection, lot_id: int, first_number: int, count: int) -> int:
+    """Insert ``count`` free spots numbered from ``S<first_number>`` upwards.
+
+    Each batch is one multi-row INSERT (executemany) rather than one ORM
+    object per spot, so it bypasses flush events; callers adjust counters
+    and caches themselves.
+    """
+    return _insert_spot_labels(connection, lot_id, [f'S{number}' for number in range(first_number, first_number + count)])
+
+
+def _chunks(ids: List[int]):
+    for start in range(0, len(ids), SPOT_INSERT_BATCH_SIZE):
+        yield ids[start:start + SPOT_INSERT_BATCH_SIZE]
+
+
+def delete_spot_dependents(lot_id: int, spot_ids: List[int]) -> None:
+    """Delete or detach everything that references ``spot_ids``, a few set-based statements per batch.
+
+    Active holds and maintenance windows on those spots are taken off the
+    lot counters; deleted bookings are subtracted from the hourly rollups.
+    Invoices and converted scheduled bookings are kept, detached from the
+    deleted bookings.
+    """
+    for chunk in _chunks(list(spot_ids)):
+        held = db.session.query(func.count(SpotHold.id)).filter(
+            SpotHold.spot_id.in_(chunk),
+            SpotHold.status == 'active',
+        ).scalar()
+        in_maintenance = db.session.query(func.count(func.distinct(SpotMaintenanceWindow.spot_id))).filter(
+            SpotMaintenanceWindow.spot_id.in_(chunk),
+            SpotMaintenanceWindow.is_active.is_(True),
+        ).scalar()
+        adjust_lot_counters(lot_id, held=-held, maintenance=-in_maintenance)
+        retract_booking_rollups(Booking.spot_id.in_(chunk))
+
+        # Invoices outlive their bookings; detach them (and converted schedules) first.
+        booking_ids = select(Booking.id).where(Booking.spot_id.in_(chunk)).scalar_subquery()
+        Invoice.query.filter(Invoice.booking_id.in_(booking_ids)).update(
+            {'booking_id': None},
+            synchronize_session=False,
+        )
+        ScheduledBooking.query.filter(ScheduledBooking.converted_booking_id.in_(booking_ids)).update(
+            {'converted_booking_id': None},
+            synchronize_session=False,
+        )
+        Booking.query.filter(Booking.spot_id.in_(chunk)).delete(synchronize_session=False)
+        SpotHold.query.filter(SpotHold.spot_id.in_(chunk)).delete(synchronize_session=False)
+        SpotMaintenanceWindow.query.filter(SpotMaintenanceWindow.spot_id.in_(chunk)).delete(synchronize_session=False)
+        ScheduledBooking.query.filter(ScheduledBooking.assigned_spot_id.in_(chunk)).update(
+            {'assigned_spot_id': None},
+            synchronize_session=False,
+        )
+
+
+def grow_lot_spots(lot_id: int, count: int) -> int:
+    """Add ``count`` free spots to a lot with bulk inserts.
+
+    Gaps in the ``S1..Sn`` sequence are filled first, then numbering
+    continues after the highest existing label. Call with the lot row
+    locked (see :func:`lock_lot`) so concurrent resizes cannot pick the
+    same labels.
+    """
+    existing = {str(label) for (label,) in db.session.query(ParkingSpot.spot_number).filter(ParkingSpot.lot_id == lot_id)}
+    numbers = sorted(int(label[1:]) for label in existing if label.startswith('S') and label[1:].isdigit())
+    desired = len(existing) + count
+
+    labels = [f'S{number}' for number in range(1, desired + 1) if f'S{number}' not in existing][:count]
+    next_number = max(numbers, default=0)
+    while len(labels) < count:
+        next_number += 1
+        labels.append(f'S{next_number}')
+
+    added = _insert_spot_labels(db.session.connection(), lot_id, labels)
+    note_lot_invalidated(db.session, lot_id)
+    return added
+
+
+def shrink_lot_spots(lot_id: int, count: int) -> bool:
+    """Remove ``count`` free spots from a lot; False (and nothing removed) if too few are free.
+
+    The victims are claimed with the same conditional ``UPDATE ... WHERE
+    is_available`` that bookings use, so a spot booked mid-resize is never
+    deleted: whichever statement wins the row keeps it. On PostgreSQL the
+    candidate subquery uses ``FOR UPDATE SKIP LOCKED`` to step over spots
+    that an in-flight booking is claiming. Everything after the claim is
+    set-based: a handful of statements however many spots go.
+    """
+    candidates = select(ParkingSpot.id).where(
+        ParkingSpot.lot_id == lot_id,
+        ParkingSpot.is_available.is_(True),
+    ).order_by(ParkingSpot.id.desc()).limit(count)
+    if db.session.get_bind().dialect.name == 'postgresql':
+        candidates = candidates.with_for_update(skip_locked=True)
+
+    if db.session.get_bind().dialect.update_returning:
+        claimed_ids = list(db.session.execute(
+            update(ParkingSpot)
+            .where(ParkingSpot.id.in_(candidates.scalar_subquery()), ParkingSpot.is_available.is_(True))
+            .values(is_available=False)
+            .returning(ParkingSpot.id)
+            .execution_options(synchronize_session=False)
+        ).scalars())
+    else:
+        claimed_ids = list(db.session.execute(candidates).scalars())
+        matched = ParkingSpot.query.filter(
+            ParkingSpot.id.in_(claimed_ids),
+            ParkingSpot.is_available.is_(True),
+        ).update({'is_available': False}, synchronize_session=False)
+        if matched != len(claimed_ids):
+            claimed_ids = []
+
+    if len(claimed_ids) < count:
+        return False
+
+    delete_spot_dependents(lot_id, claimed_ids)
+    for chunk in _chunks(claimed_ids):
+        ParkingSpot.query.filter(ParkingSpot.id.in_(chunk)).delete(synchronize_session=False)
+    note_lot_invalidated(db.session, lot_id)
+    return True
+
+
+def lock_lot(lot_id: int) -> ParkingLot:
+    """Load a lot for a structural change, row-locked on PostgreSQL until commit."""
+    query = ParkingLot.query.filter(ParkingLot.id == lot_id)
+    if db.session.get_bind().dialect.name == 'postgresql':
+        query = query.with_for_update().populate_existing()
+    return query.one()
+
+
+def _validate_lot(raw: Dict[str, object]) -> Tuple[Dict[str, object], List[str]]:
+    errors = []
+    values = {field: str(raw.get(field) if raw.get(field) is not None else '').strip() for field in LOT_IMPORT_FIELDS}
+
+    for field in ('location_name', 'address'):
+        if not values[field]:
+            errors.append(f'{field} is required')
+    if not _PINCODE_PATTERN.match(values['pincode']):
+        errors.append('pincode must be 6 digits')
+
+    try:
+        values['price'] = float(values['price'])
+        if values['price'] <= 0:
+            errors.append('price must be positive')
+    except ValueError:
+        errors.append('price must be a number')
+
+    try:
+        values['total_slots'] = int(values['total_slots'])
+        if not 1 <= values['total_slots'] <= MAX_SPOTS_PER_LOT:
+            errors.append(f'total_slots must be between 1 and {MAX_SPOTS_PER_LOT}')
+    except ValueError:
+        errors.append('total_slots must be a whole number')
+
+    return values, errors
+
+
+def parse_lot_import(text: str, fmt: str) -> Tuple[List[Dict[str, object]], List[str]]:
+    """Parse a CSV or JSON lot list into validated lot dicts and ``row N: ...`` errors.
+
+    CSV needs a header row with ``location_name, address, pincode, price,
+    total_slots``; JSON is a list of objects with the same keys. Any error
+    means nothing should be imported.
+    """
+    if fmt == 'json':
+        try:
+            rows = json.loads(text)
+        except ValueError as exc:
+            return [], [f'invalid JSON: {exc}']
+        if not isinstance(rows, list) or not all(isinstance(row, dict) for row in rows):
+            return [], ['JSON import must be a list of lot objects']
+        first_row = 1
+    else:
+        reader = csv.DictReader(io.StringIO(text))
+        missing = [field for field in LOT_IMPORT_FIELDS if field not in (reader.fieldnames or [])]
+        if missing:
+            return [], [f'missing CSV column(s): {", ".join(missing)}']
+        rows = list(reader)
+        first_row = 2  # line 1 is the header
+
+    lots, errors, seen = [], [], set()
+    for row_number, raw in enumerate(rows, start=first_row):
+        values, row_errors = _validate_lot(raw)
+        key = (str(values['location_name']).lower(), values['pincode'])
+        if not row_errors and key in seen:
+            row_errors.append('duplicate lot in this import')
+        seen.add(key)
+        errors.extend(f'row {row_number}: {message}' for message in row_errors)
+        lots.append(values)
+
+    if not lots and not errors:
+        errors.append('no lots found')
+    return lots, errors
+
+
+def provision_lots(lots: Iterable[Dict[str, object]], owner_id: int, dry_run: bool = False) -> Dict[str, float]:
+    """Create validated lots and all of their spots in one transaction.
+
+    Lots go in with one INSERT ... RETURNING and spots with batched
+    executemany inserts. With ``dry_run`` the work is rolled back, so the
+    reported throughput is still a real measurement.
+    """
+    lots = list(lots)
+    if not lots:
+        return {'lots': 0, 'spots': 0, 'seconds': 0.0, 'spots_per_second': 0.0}
+
+    started = time.perf_counter()
+    connection = db.session.connection()
+
+    lot_ids = connection.execute(
+        insert(ParkingLot).returning(ParkingLot.id, sort_by_parameter_order=True),
+        [
+            {
+                **lot,
+                'owner_id': owner_id,
+                'available_slots': lot['total_slots'],
+                'occupied_slots': 0,
+                'held_slots': 0,
+                'maintenance_slots': 0,
+            }
+            for lot in lots
+        ],
+    ).scalars().all()
+
+    spots = 0
+    for lot_id, lot in zip(lot_ids, lots):
+        spots += insert_lot_spots(connection, lot_id, 1, lot['total_slots'])
+    reindex_search_documents(connection, lot_ids=lot_ids)
+
+    if dry_run:
+        db.session.rollback()
+    else:
+        db.session.commit()
+        invalidate_response_cache()
+
+    elapsed = time.perf_counter() - started
+    return {
+        'lots': len(lot_ids),
+        'spots': spots,
+        'seconds': elapsed,
+        'spots_per_second': spots / elapsed if elapsed > 0 else float(spots),
+    }
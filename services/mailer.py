@@ -0,0 +1,153 @@
+import os
+import smtplib
+import threading
+import time
+from email.message import EmailMessage
+from typing import List, Optional, Tuple
+
+IDLE_CHECK_SECONDS = 30
+
+
+def build_email(to_email: str, subject: str, body: str, sender: Optional[str] = None) -> EmailMessage:
+    message = EmailMessage()
+    message['Subject'] = subject
+    message['From'] = sender or os.environ.get('SMTP_FROM', os.environ.get('SMTP_USERNAME') or 'no-reply@parking.local')
+    message['To'] = to_email
+    message.set_content(body)
+    return message
+
+
+class SMTPMailer:
+    """Sends mail over one reusable SMTP connection.
+
+    The connection (STARTTLS and login included) is opened on first use and
+    kept for later batches; a NOOP probes it after it has been idle, and a
+    dropped connection is reopened once before a message counts as failed.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        port: int = 587,
+        username: Optional[str] = None,
+        password: Optional[str] = None,
+        use_tls: bool = True,
+        timeout: int = 10,
+    ):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.use_tls = use_tls
+        self.timeout = timeout
+        self._connection: Optional[smtplib.SMTP] = None
+        self._last_used = 0.0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> Optional['SMTPMailer']:
+        host = os.environ.get('SMTP_HOST')
+        if not host:
+            return None
+        return cls(
+            host=host,
+            port=int(os.environ.get('SMTP_PORT', '587')),
+            username=os.environ.get('SMTP_USERNAME'),
+            password=os.environ.get('SMTP_PASSWORD'),
+            use_tls=os.environ.get('SMTP_USE_TLS', 'true').lower() in ('1', 'true', 'yes'),
+        )
+
+    def _connect(self) -> smtplib.SMTP:
+        connection = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        if self.use_tls:
+            connection.starttls()
+        if self.username and self.password:
+            connection.login(self.username, self.password)
+        return connection
+
+    def _get_connection(self) -> smtplib.SMTP:
+        if self._connection is not None and time.monotonic() - self._last_used > IDLE_CHECK_SECONDS:
+            try:
+                if self._connection.noop()[0] != 250:
+                    self.close()
+            except (smtplib.SMTPException, OSError):
+                self.close()
+
+        if self._connection is None:
+            self._connection = self._connect()
+        return self._connection
+
+    def close(self) -> None:
+        if self._connection is not None:
+            try:
+                self._connection.quit()
+            except (smtplib.SMTPException, OSError):
+                pass
+            self._connection = None
+
+    def send(self, message: EmailMessage) -> Tuple[bool, str]:
+        with self._lock:
+            for attempt in range(2):
+                try:
+                    self._get_connection().send_message(message)
+                    self._last_used = time.monotonic()
+                    return True, 'sent'
+                except smtplib.SMTPServerDisconnected as exc:
+                    self._connection = None
+                    if attempt:
+                        return False, str(exc)
+                except (smtplib.SMTPRecipientsRefused, smtplib.SMTPSenderRefused, smtplib.SMTPDataError) as exc:
+                    # The server rejected this message only; the connection stays usable.
+                    self._last_used = time.monotonic()
+                    return False, str(exc)
+                except (smtplib.SMTPException, OSError) as exc:  # pragma: no cover - external dependency
+                    self.close()
+                    return False, str(exc)
+        return False, 'SMTP connection lost'
+
+
+class ConsoleMailer:
+    """Prints messages instead of sending them (local development)."""
+
+    def send(self, message: EmailMessage) -> Tuple[bool, str]:
+        print(f"[mail] To: {message['To']} | {message['Subject']}\n{message.get_content()}")
+        return True, 'sent'
+
+    def close(self) -> None:
+        pass
+
+
+class MemoryMailer:
+    """Keeps sent messages in ``outbox``; a stand-in SMTP server for tests."""
+
+    def __init__(self):
+        self.outbox: List[EmailMessage] = []
+
+    def send(self, message: EmailMessage) -> Tuple[bool, str]:
+        self.outbox.append(message)
+        return True, 'sent'
+
+    def close(self) -> None:
+        pass
+
+
+_mailer = None
+
+
+def get_mailer():
+    """Return the process-wide mailer selected by ``MAIL_BACKEND``.
+
+    ``smtp`` (default) uses ``SMTP_*`` settings and returns None when
+    ``SMTP_HOST`` is unset; ``console`` and ``memory`` never touch the network.
+    """
+    global _mailer
+
+    if _mailer is None:
+        backend = os.environ.get('MAIL_BACKEND', 'smtp').lower()
+        if backend == 'console':
+            _mailer = ConsoleMailer()
+        elif backend == 'memory':
+            _mailer = MemoryMailer()
+        else:
+            _mailer = SMTPMailer.from_env()
+    return _mailer
@@ -0,0 +1,116 @@
+import time
+from datetime import timedelta
+from typing import Callable, Optional
+
+from sqlalchemy import or_
+
+from extensions import db
+from models.models import NotificationLog, User
+
+from .mailer import build_email, get_mailer
+from .parking_features import utcnow
+from .scheduler import acquire_job_lease, default_lease_holder, release_job_lease
+
+DISPATCHER_LEASE_NAME = 'notification-dispatcher'
+MAX_DELIVERY_ATTEMPTS = 5
+RETRY_BASE_SECONDS = 30
+RETRY_MAX_SECONDS = 3600
+
+
+def retry_delay(attempts: int) -> timedelta:
+    return timedelta(seconds=min(RETRY_MAX_SECONDS, RETRY_BASE_SECONDS * 2 ** max(0, attempts - 1)))
+
+
+def _deliver(notification: NotificationLog, email: Optional[str], mailer):
+    if notification.channel == 'sms':
+        return False, 'SMS provider not configured'
+    if email is None:
+        return False, 'User not found'
+    if mailer is None:
+        return False, 'SMTP is not configured'
+
+    return mailer.send(build_email(
+        to_email=email,
+        subject=notification.subject or 'Parking App Notification',
+        body=notification.message,
+    ))
+
+
+def dispatch_queued_notifications(batch_size: int = 50, max_attempts: int = MAX_DELIVERY_ATTEMPTS) -> dict:
+    """Deliver one batch of queued email/SMS notifications.
+
+    Failures are retried with exponential backoff and marked 'failed' after
+    ``max_attempts``. Returns counts of sent, retried and failed rows.
+    """
+    now = utcnow()
+    queued = NotificationLog.query.filter(
+        NotificationLog.status == 'queued',
+        NotificationLog.channel.in_(('email', 'sms')),
+        or_(NotificationLog.next_attempt_at.is_(None), NotificationLog.next_attempt_at <= now),
+    ).order_by(NotificationLog.created_at.asc()).limit(batch_size).all()
+
+    stats = {'sent': 0, 'retried': 0, 'failed': 0}
+    if not queued:
+        return stats
+
+    emails = dict(db.session.query(User.id, User.email).filter(
+        User.id.in_({notification.user_id for notification in queued}),
+    ).all())
+    mailer = get_mailer()
+
+    for notification in queued:
+        sent, info = _deliver(notification, emails.get(notification.user_id), mailer)
+        notification.attempts = (notification.attempts or 0) + 1
+
+        if sent:
+            notification.status = 'sent'
+            notification.sent_at = utcnow()
+            notification.error_message = None
+            notification.next_attempt_at = None
+            stats['sent'] += 1
+        elif notification.attempts >= max_attempts:
+            notification.status = 'failed'
+            notification.error_message = info
+            notification.next_attempt_at = None
+            stats['failed'] += 1
+        else:
+            notification.error_message = info
+            notification.next_attempt_at = now + retry_delay(notification.attempts)
+            stats['retried'] += 1
+
+    db.session.commit()
+    return stats
+
+
+def run_notification_dispatcher(
+    batch_size: int = 50,
+    idle_seconds: int = 5,
+    once: bool = False,
+    holder: Optional[str] = None,
+    echo: Callable[[str], None] = print,
+) -> None:
+    """Deliver queued notifications until stopped, as the single lease holder."""
+    holder = holder or default_lease_holder()
+    lease_ttl = max(60, idle_seconds * 4)
+
+    try:
+        while True:
+            busy = False
+            if acquire_job_lease(DISPATCHER_LEASE_NAME, holder, lease_ttl):
+                stats = dispatch_queued_notifications(batch_size=batch_size)
+                if any(stats.values()):
+                    echo(f"Sent {stats['sent']}, retrying {stats['retried']}, failed {stats['failed']}.")
+                busy = sum(stats.values()) >= batch_size
+
+            db.session.remove()
+            if once:
+                return
+            if not busy:
+                time.sleep(idle_seconds)
+    finally:
+        # A failed batch leaves the session unusable until it is rolled back.
+        db.session.rollback()
+        release_job_lease(DISPATCHER_LEASE_NAME, holder)
+        mailer = get_mailer()
+        if mailer is not None:
+            mailer.close()
@@ -1,11 +1,10 @@
-import os
 import secrets
-import smtplib
 from datetime import datetime, timedelta, timezone
-from email.message import EmailMessage
-from typing import Optional, Tuple
+from typing import Dict, Iterable, List, Optional, Tuple
 
-from sqlalchemy import or_
+from flask import current_app
+from sqlalchemy import and_, case, exists, func, not_, or_, update
+from sqlalchemy.orm.attributes import set_committed_value
 
 from extensions import db
 from models.models import (
@@ -17,12 +16,15 @@ from models.models import (
     ScheduledBooking,
     SpotHold,
     SpotMaintenanceWindow,
-    User,
     Vehicle,
     WaitlistEntry,
 )
+from .lot_counters import adjust_lot_counters
+from .rollups import record_bookings_started
+from .spot_index import note_hold_change, note_spot_change, registry as spot_index
 
 HOLD_DURATION_MINUTES = 5
+ALLOCATION_ATTEMPTS = 3
 WAITLIST_LOOKAHEAD_HOURS = 24
 
 
@@ -45,24 +47,68 @@ def parse_schedule_datetime(raw_value: str) -> Optional[datetime]:
     return parsed
 
 
-def cleanup_expired_spot_holds() -> int:
+def cleanup_expired_spot_holds(batch_size: int = 1000) -> int:
+    """Mark lapsed holds as 'expired' in bounded batches.
+
+    Read paths already ignore holds past ``expires_at``, so this only tidies
+    statuses and the lots' held counters, then offers the freed capacity to
+    waitlists. It is meant to run out-of-band (``flask sweep-holds``).
+    """
     now = utcnow()
-    expired = SpotHold.query.filter(
-        SpotHold.status == 'active',
-        SpotHold.expires_at < now,
-    ).all()
+    total = 0
+    freed_lot_ids = set()
+
+    while True:
+        batch = db.session.query(SpotHold.id, SpotHold.lot_id).filter(
+            SpotHold.status == 'active',
+            SpotHold.expires_at < now,
+        ).limit(batch_size).all()
+        if not batch:
+            break
+
+        ids_by_lot = {}
+        for hold_id, lot_id in batch:
+            ids_by_lot.setdefault(lot_id, []).append(hold_id)
+
+        updated = 0
+        for lot_id, hold_ids in ids_by_lot.items():
+            # Row counts are exact even if a booking converted a hold meanwhile.
+            expired = SpotHold.query.filter(
+                SpotHold.id.in_(hold_ids),
+                SpotHold.status == 'active',
+            ).update({'status': 'expired'}, synchronize_session=False)
+            adjust_lot_counters(lot_id, held=-expired)
+            updated += expired
+            if expired:
+                freed_lot_ids.add(lot_id)
 
-    for hold in expired:
-        hold.status = 'expired'
+        db.session.commit()
+        total += updated
 
-    if expired:
-        db.session.flush()
+        if len(batch) < batch_size:
+            break
+
+    for lot_id in freed_lot_ids:
+        fulfill_waitlist_for_lot(lot_id)
+
+    return total
+
+
+def close_spot_hold(hold: SpotHold, status: str) -> bool:
+    """Move an active hold to ``status`` and release it from the lot's held count."""
+    closed = SpotHold.query.filter(
+        SpotHold.id == hold.id,
+        SpotHold.status == 'active',
+    ).update({'status': status}, synchronize_session=False)
 
-    return len(expired)
+    set_committed_value(hold, 'status', status)
+    if closed:
+        adjust_lot_counters(hold.lot_id, held=-1)
+        note_hold_change(db.session, hold, is_active=False)
+    return bool(closed)
 
 
 def get_active_hold_for_user(user_id: int, lot_id: int) -> Optional[SpotHold]:
-    cleanup_expired_spot_holds()
     now = utcnow()
     return SpotHold.query.filter(
         SpotHold.user_id == user_id,
@@ -88,9 +134,7 @@ def get_active_maintenance_map(lot_id: Optional[int] = None):
     return {item.spot_id: item for item in query.all()}
 
 
-def get_bookable_spot(lot_id: int, user_id: Optional[int] = None) -> Optional[ParkingSpot]:
-    cleanup_expired_spot_holds()
-
+def _scan_bookable_spot(lot_id: int, user_id: Optional[int] = None) -> Optional[ParkingSpot]:
     now = utcnow()
     active_holds = SpotHold.query.filter(
         SpotHold.lot_id == lot_id,
@@ -118,33 +162,272 @@ def get_bookable_spot(lot_id: int, user_id: Optional[int] = None) -> Optional[Pa
     return None
 
 
-def count_bookable_spots_for_lot(lot_id: int, user_id: Optional[int] = None) -> int:
-    cleanup_expired_spot_holds()
+def _get_indexed_bookable_spot(lot_id: int, user_id: Optional[int]) -> Optional[ParkingSpot]:
+    spot_id = spot_index.find_spot_id(lot_id, user_id)
+    if spot_id is None:
+        # A full lot only scans its few free-but-blocked rows, so this is
+        # cheap and catches spots another worker released.
+        spot = _scan_bookable_spot(lot_id, user_id)
+        if spot is not None:
+            spot_index.invalidate(lot_id)
+        return spot
 
+    # The index is per worker; confirm the pick before handing it out.
     now = utcnow()
-    active_holds = SpotHold.query.filter(
+    spot = db.session.get(ParkingSpot, spot_id)
+    conflict = spot is None or not spot.is_available or spot.lot_id != lot_id
+
+    if not conflict:
+        foreign_holds = SpotHold.query.filter(
+            SpotHold.spot_id == spot_id,
+            SpotHold.status == 'active',
+            SpotHold.expires_at >= now,
+        )
+        if user_id is not None:
+            foreign_holds = foreign_holds.filter(SpotHold.user_id != user_id)
+        maintenance = SpotMaintenanceWindow.query.filter(
+            SpotMaintenanceWindow.spot_id == spot_id,
+            SpotMaintenanceWindow.is_active.is_(True),
+            or_(
+                SpotMaintenanceWindow.ends_at.is_(None),
+                SpotMaintenanceWindow.ends_at > now,
+            ),
+        )
+        conflict = db.session.query(
+            or_(foreign_holds.exists(), maintenance.exists())
+        ).scalar()
+
+    if conflict:
+        spot_index.invalidate(lot_id)
+        return _scan_bookable_spot(lot_id, user_id)
+
+    return spot
+
+
+def get_bookable_spot(lot_id: int, user_id: Optional[int] = None) -> Optional[ParkingSpot]:
+    if current_app.config.get('SPOT_INDEX_ENABLED'):
+        return _get_indexed_bookable_spot(lot_id, user_id)
+    return _scan_bookable_spot(lot_id, user_id)
+
+
+def claim_spots(spots: List[ParkingSpot]) -> List[ParkingSpot]:
+    """Atomically mark ``spots`` occupied and return the ones this call won.
+
+    One conditional ``UPDATE ... WHERE is_available ... RETURNING id`` claims
+    the whole batch; rows another request took first are simply left out.
+    """
+    if not spots:
+        return []
+
+    by_id = {spot.id: spot for spot in spots}
+    if db.session.get_bind().dialect.update_returning:
+        claimed_ids = set(db.session.execute(
+            update(ParkingSpot)
+            .where(ParkingSpot.id.in_(by_id), ParkingSpot.is_available.is_(True))
+            .values(is_available=False)
+            .returning(ParkingSpot.id)
+            .execution_options(synchronize_session=False)
+        ).scalars())
+    else:
+        claimed_ids = {
+            spot_id
+            for spot_id in by_id
+            if ParkingSpot.query.filter(
+                ParkingSpot.id == spot_id,
+                ParkingSpot.is_available.is_(True),
+            ).update({'is_available': False}, synchronize_session=False) == 1
+        }
+
+    claimed = []
+    claimed_per_lot = {}
+    for spot in spots:
+        if spot.id not in claimed_ids:
+            db.session.expire(spot, ['is_available'])
+            continue
+        set_committed_value(spot, 'is_available', False)
+        note_spot_change(db.session, spot.lot_id, spot.id, spot.spot_number, False)
+        claimed_per_lot[spot.lot_id] = claimed_per_lot.get(spot.lot_id, 0) + 1
+        claimed.append(spot)
+
+    for lot_id, count in claimed_per_lot.items():
+        adjust_lot_counters(lot_id, occupied=count)
+    _close_holds_on_claimed_spots([spot.id for spot in claimed])
+
+    return claimed
+
+
+def _close_holds_on_claimed_spots(spot_ids: List[int]) -> None:
+    """Close active holds on spots that just became occupied.
+
+    A spot is counted as occupied or as held, never both: the claimer's own
+    hold becomes 'converted', anyone's lapsed hold 'expired'.
+    """
+    if not spot_ids:
+        return
+
+    holds_by_lot = {}
+    for hold in SpotHold.query.filter(SpotHold.spot_id.in_(spot_ids), SpotHold.status == 'active'):
+        holds_by_lot.setdefault(hold.lot_id, []).append(hold)
+
+    now = utcnow()
+    for lot_id, holds in holds_by_lot.items():
+        closed = SpotHold.query.filter(
+            SpotHold.id.in_([hold.id for hold in holds]),
+            SpotHold.status == 'active',
+        ).update(
+            {'status': case((SpotHold.expires_at < now, 'expired'), else_='converted')},
+            synchronize_session=False,
+        )
+        adjust_lot_counters(lot_id, held=-closed)
+        for hold in holds:
+            db.session.expire(hold, ['status'])
+            note_hold_change(db.session, hold, is_active=False)
+
+
+def claim_spot(spot: ParkingSpot) -> bool:
+    """Atomically mark ``spot`` occupied; False if another request got it first.
+
+    The conditional UPDATE only matches while the row is still free, so
+    exactly one concurrent caller wins it.
+    """
+    return bool(claim_spots([spot]))
+
+
+def release_spot(spot: ParkingSpot) -> bool:
+    """Atomically mark ``spot`` free again; False if it already was."""
+    released = ParkingSpot.query.filter(
+        ParkingSpot.id == spot.id,
+        ParkingSpot.is_available.isnot(True),
+    ).update({'is_available': True}, synchronize_session=False)
+
+    set_committed_value(spot, 'is_available', True)
+    if released != 1:
+        return False
+
+    adjust_lot_counters(spot.lot_id, occupied=-1)
+    note_spot_change(db.session, spot.lot_id, spot.id, spot.spot_number, True)
+    return True
+
+
+def _allocation_pool(lot_id: int) -> Tuple[List[ParkingSpot], Dict[int, int]]:
+    """Load a lot's free, non-maintenance spots and who holds them, in two queries."""
+    now = utcnow()
+    spots = ParkingSpot.query.filter(
+        ParkingSpot.lot_id == lot_id,
+        ParkingSpot.is_available.is_(True),
+        ~exists().where(
+            SpotMaintenanceWindow.spot_id == ParkingSpot.id,
+            SpotMaintenanceWindow.is_active.is_(True),
+            or_(
+                SpotMaintenanceWindow.ends_at.is_(None),
+                SpotMaintenanceWindow.ends_at > now,
+            ),
+        ),
+    ).order_by(ParkingSpot.spot_number.asc()).all()
+
+    holders = dict(db.session.query(SpotHold.spot_id, SpotHold.user_id).filter(
         SpotHold.lot_id == lot_id,
         SpotHold.status == 'active',
         SpotHold.expires_at >= now,
-    ).all()
-    active_holds_by_spot = {hold.spot_id: hold for hold in active_holds}
-    maintenance_map = get_active_maintenance_map(lot_id)
+    ).all())
+    return spots, holders
+
+
+def allocate_spots_for_entries(lot_id: int, entries, max_attempts: int = ALLOCATION_ATTEMPTS):
+    """Assign one free spot per entry (anything with a ``user_id``) in a lot.
+
+    Spots are matched in order from a single pool load and claimed with one
+    :func:`claim_spots` statement per round; entries whose spot was taken
+    concurrently retry with the next spot. Returns ``(pairs, unassigned)``.
+    """
+    pool, holders = _allocation_pool(lot_id)
+    pending = list(entries)
+    pairs = []
+
+    for _ in range(max_attempts):
+        if not pending or not pool:
+            break
+
+        round_pairs = []
+        unmatched = []
+        for entry in pending:
+            index = next(
+                (i for i, spot in enumerate(pool) if holders.get(spot.id, entry.user_id) == entry.user_id),
+                None,
+            )
+            if index is None:
+                unmatched.append(entry)
+                continue
+            round_pairs.append((entry, pool.pop(index)))
 
-    count = 0
-    candidate_spots = ParkingSpot.query.filter_by(
-        lot_id=lot_id,
-        is_available=True,
-    ).all()
+        won = {spot.id for spot in claim_spots([spot for _, spot in round_pairs])}
+        pairs.extend(pair for pair in round_pairs if pair[1].id in won)
+        pending = unmatched + [entry for entry, spot in round_pairs if spot.id not in won]
 
-    for spot in candidate_spots:
-        if spot.id in maintenance_map:
-            continue
-        hold = active_holds_by_spot.get(spot.id)
-        if hold and hold.user_id != user_id:
-            continue
-        count += 1
+    return pairs, pending
 
-    return count
+
+def count_bookable_spots_for_lot(lot_id: int, user_id: Optional[int] = None) -> int:
+    return count_bookable_spots_for_lots([lot_id], user_id)[lot_id]['bookable']
+
+
+def count_bookable_spots_for_lots(
+    lot_ids: Iterable[int],
+    user_id: Optional[int] = None,
+) -> Dict[int, Dict[str, int]]:
+    """Return total/occupied/maintenance/held/bookable spot counts per lot.
+
+    All lots are counted by one grouped statement over ``parking_spot``;
+    lots without spots come back with zero counts.
+    """
+    lot_ids = list(lot_ids)
+    counts = {
+        lot_id: {'total': 0, 'occupied': 0, 'maintenance': 0, 'held': 0, 'bookable': 0}
+        for lot_id in lot_ids
+    }
+    if not lot_ids:
+        return counts
+
+    now = utcnow()
+    in_maintenance = exists().where(
+        SpotMaintenanceWindow.spot_id == ParkingSpot.id,
+        SpotMaintenanceWindow.is_active.is_(True),
+        or_(
+            SpotMaintenanceWindow.ends_at.is_(None),
+            SpotMaintenanceWindow.ends_at > now,
+        ),
+    )
+    hold_filters = [
+        SpotHold.spot_id == ParkingSpot.id,
+        SpotHold.status == 'active',
+        SpotHold.expires_at >= now,
+    ]
+    if user_id is not None:
+        hold_filters.append(SpotHold.user_id != user_id)
+    held_by_other = exists().where(*hold_filters)
+
+    is_free = ParkingSpot.is_available.is_(True)
+    rows = db.session.query(
+        ParkingSpot.lot_id,
+        func.count(ParkingSpot.id),
+        func.sum(case((not_(is_free), 1), else_=0)),
+        func.sum(case((in_maintenance, 1), else_=0)),
+        func.sum(case((and_(is_free, not_(in_maintenance), held_by_other), 1), else_=0)),
+        func.sum(case((and_(is_free, not_(in_maintenance), not_(held_by_other)), 1), else_=0)),
+    ).filter(
+        ParkingSpot.lot_id.in_(lot_ids),
+    ).group_by(ParkingSpot.lot_id).all()
+
+    for lot_id, total, occupied, maintenance, held, bookable in rows:
+        counts[lot_id] = {
+            'total': total,
+            'occupied': int(occupied or 0),
+            'maintenance': int(maintenance or 0),
+            'held': int(held or 0),
+            'bookable': int(bookable or 0),
+        }
+
+    return counts
 
 
 def create_or_refresh_spot_hold(
@@ -169,7 +452,7 @@ def create_or_refresh_spot_hold(
             db.session.commit()
             return existing_hold
 
-        existing_hold.status = 'cancelled'
+        close_spot_hold(existing_hold, 'cancelled')
 
     hold = SpotHold(
         user_id=user_id,
@@ -180,6 +463,7 @@ def create_or_refresh_spot_hold(
         expires_at=expires_at,
     )
     db.session.add(hold)
+    adjust_lot_counters(lot_id, held=1)
     db.session.commit()
     return hold
 
@@ -258,36 +542,6 @@ def add_to_waitlist(
     return entry, True
 
 
-def _try_send_email(to_email: str, subject: str, body: str) -> Tuple[bool, str]:
-    smtp_host = os.environ.get('SMTP_HOST')
-    smtp_port = int(os.environ.get('SMTP_PORT', '587'))
-    smtp_username = os.environ.get('SMTP_USERNAME')
-    smtp_password = os.environ.get('SMTP_PASSWORD')
-    smtp_from = os.environ.get('SMTP_FROM', smtp_username or 'no-reply@parking.local')
-    smtp_use_tls = os.environ.get('SMTP_USE_TLS', 'true').lower() in ('1', 'true', 'yes')
-
-    if not smtp_host:
-        return False, 'SMTP is not configured'
-
-    message = EmailMessage()
-    message['Subject'] = subject
-    message['From'] = smtp_from
-    message['To'] = to_email
-    message.set_content(body)
-
-    try:
-        with smtplib.SMTP(smtp_host, smtp_port, timeout=10) as server:
-            if smtp_use_tls:
-                server.starttls()
-            if smtp_username and smtp_password:
-                server.login(smtp_username, smtp_password)
-            server.send_message(message)
-    except Exception as exc:  # pragma: no cover - external dependency
-        return False, str(exc)
-
-    return True, 'sent'
-
-
 def log_notification(
     user_id: int,
     notification_type: str,
@@ -308,27 +562,8 @@ def log_notification(
     )
     db.session.add(notification)
 
-    if channel == 'email':
-        user = User.query.get(user_id)
-        if user:
-            sent, info = _try_send_email(
-                to_email=user.email,
-                subject=subject or 'Parking App Notification',
-                body=message,
-            )
-            if sent:
-                notification.status = 'sent'
-                notification.sent_at = now
-            else:
-                notification.status = 'failed'
-                notification.error_message = info
-        else:
-            notification.status = 'failed'
-            notification.error_message = 'User not found'
-    elif channel == 'sms':
-        notification.status = 'queued'
-        notification.error_message = 'SMS provider not configured'
-    else:
+    # Email and SMS stay queued for the outbox dispatcher (flask dispatch-notifications).
+    if channel not in ('email', 'sms'):
         notification.status = 'sent'
         notification.sent_at = now
 
@@ -338,7 +573,7 @@ def log_notification(
     return notification
 
 
-def generate_invoice_for_release(booking: Booking, total_cost: float) -> Invoice:
+def generate_invoice_for_release(booking: Booking, total_cost: float, auto_commit: bool = True) -> Invoice:
     now = utcnow()
     invoice_no = f"INV-{now.strftime('%Y%m%d')}-{booking.id}-{secrets.token_hex(2).upper()}"
     payment_ref = f"PAY-{secrets.token_hex(6).upper()}"
@@ -355,91 +590,166 @@ def generate_invoice_for_release(booking: Booking, total_cost: float) -> Invoice
         paid_at=now,
     )
     db.session.add(invoice)
-    db.session.commit()
+
+    if auto_commit:
+        db.session.commit()
+
     return invoice
 
 
-def fulfill_waitlist_for_lot(lot_id: int):
-    entry = WaitlistEntry.query.filter_by(
+def _move_status(model, ids: List[int], from_status: str, values: Dict[str, object]) -> set:
+    """Conditionally move rows out of ``from_status``; return the ids this call actually moved."""
+    if not ids:
+        return set()
+
+    if db.session.get_bind().dialect.update_returning:
+        return set(db.session.execute(
+            update(model)
+            .where(model.id.in_(ids), model.status == from_status)
+            .values(**values)
+            .returning(model.id)
+            .execution_options(synchronize_session=False)
+        ).scalars())
+
+    return {
+        row_id
+        for row_id in ids
+        if model.query.filter(
+            model.id == row_id,
+            model.status == from_status,
+        ).update(values, synchronize_session=False) == 1
+    }
+
+
+def _take_waiting_entries(entries: List[WaitlistEntry], now: datetime) -> set:
+    """Mark waiting entries fulfilled; return the ids this call actually moved."""
+    values = {'status': 'fulfilled', 'fulfilled_at': now, 'notified_at': now}
+    return _move_status(WaitlistEntry, [entry.id for entry in entries], 'waiting', values)
+
+
+def fulfill_waitlist_for_lot(
+    lot_id: int,
+    limit: Optional[int] = None,
+    auto_commit: bool = True,
+) -> List[Tuple[WaitlistEntry, Booking]]:
+    """Give free spots in a lot to its oldest waiting entries, in one transaction.
+
+    Call after anything that adds capacity (release, maintenance end, lot
+    growth, hold expiry). Returns the ``(entry, booking)`` pairs created.
+    With ``auto_commit=False`` it joins the caller's unit of work.
+    """
+    # Counters move through bulk UPDATEs; re-read them in case the caller's
+    # transaction (e.g. a release) changed them after the lot was loaded.
+    lot = db.session.get(ParkingLot, lot_id, populate_existing=True)
+    if lot is None:
+        return []
+
+    capacity = lot.total_slots - lot.occupied_slots - lot.maintenance_slots
+    if limit is not None:
+        capacity = min(capacity, limit)
+    if capacity <= 0:
+        return []
+
+    query = WaitlistEntry.query.filter_by(
         lot_id=lot_id,
         status='waiting',
-    ).order_by(WaitlistEntry.created_at.asc()).first()
-
-    if not entry:
-        return None, None
+    ).order_by(WaitlistEntry.created_at.asc()).limit(capacity)
+    if db.session.get_bind().dialect.name == 'postgresql':
+        query = query.with_for_update(skip_locked=True)
+    entries = query.all()
+    if not entries:
+        return []
 
-    spot = get_bookable_spot(lot_id=lot_id, user_id=entry.user_id)
-    if not spot:
-        return entry, None
+    pairs, _ = allocate_spots_for_entries(lot_id, entries)
+    if not pairs:
+        return []
 
     now = utcnow()
-    spot.is_available = False
+    taken_ids = _take_waiting_entries([entry for entry, _ in pairs], now)
 
-    booking = Booking(
-        user_id=entry.user_id,
-        lot_id=entry.lot_id,
-        spot_id=spot.id,
-        vehicle_no=entry.vehicle_no,
-        status='active',
-        timestamp=now,
-    )
-    db.session.add(booking)
-    lot = ParkingLot.query.get(lot_id)
-    if lot:
-        lot.available_slots = count_bookable_spots_for_lot(lot_id)
+    fulfilled = []
+    for entry, spot in pairs:
+        if entry.id not in taken_ids:
+            # Another worker fulfilled or cancelled this entry first.
+            release_spot(spot)
+            continue
 
-    entry.status = 'fulfilled'
-    entry.fulfilled_at = now
-    entry.notified_at = now
+        for field, value in (('status', 'fulfilled'), ('fulfilled_at', now), ('notified_at', now)):
+            set_committed_value(entry, field, value)
+        booking = Booking(
+            user_id=entry.user_id,
+            lot_id=entry.lot_id,
+            spot_id=spot.id,
+            vehicle_no=entry.vehicle_no,
+            status='active',
+            timestamp=now,
+        )
+        db.session.add(booking)
+        fulfilled.append((entry, booking))
 
-    db.session.flush()
-    log_notification(
-        user_id=entry.user_id,
-        notification_type='waitlist_fulfilled',
-        subject='Spot Assigned from Waitlist',
-        message=f'Parking spot {spot.spot_number} in {spot.lot.location_name} is now assigned to you.',
-        auto_commit=False,
-    )
-    db.session.commit()
+        log_notification(
+            user_id=entry.user_id,
+            notification_type='waitlist_fulfilled',
+            subject='Spot Assigned from Waitlist',
+            message=f'Parking spot {spot.spot_number} in {lot.location_name} is now assigned to you.',
+            auto_commit=False,
+        )
+
+    record_bookings_started(booking for _, booking in fulfilled)
+
+    if auto_commit:
+        db.session.commit()
+    else:
+        db.session.flush()
 
-    return entry, booking
+    return fulfilled
 
 
 def activate_due_scheduled_bookings(limit: int = 20):
+    """Start due scheduled bookings, or move them to the waitlist when their lot is full.
+
+    Each entry leaves ``scheduled`` through a conditional UPDATE, so if two
+    schedulers race on the same entry only one converts it; the loser hands
+    its claimed spot back.
+    """
     now = utcnow()
-    due_entries = ScheduledBooking.query.filter(
+    query = ScheduledBooking.query.filter(
         ScheduledBooking.status == 'scheduled',
         ScheduledBooking.requested_start <= now,
-    ).order_by(ScheduledBooking.requested_start.asc()).limit(limit).all()
+    ).order_by(ScheduledBooking.requested_start.asc()).limit(limit)
+    if db.session.get_bind().dialect.name == 'postgresql':
+        query = query.with_for_update(skip_locked=True)
+    due_entries = query.all()
 
-    converted = []
-    deferred = []
+    if not due_entries:
+        return [], []
 
+    entries_by_lot = {}
     for scheduled in due_entries:
-        spot = get_bookable_spot(scheduled.lot_id, scheduled.user_id)
-        if not spot:
-            add_to_waitlist(
-                user_id=scheduled.user_id,
-                lot_id=scheduled.lot_id,
-                vehicle_no=scheduled.vehicle_no,
-                vehicle_id=scheduled.vehicle_id,
-                requested_start=scheduled.requested_start,
-                requested_duration_hours=scheduled.duration_hours,
-                auto_commit=False,
-            )
-            scheduled.status = 'missed'
-            deferred.append(scheduled)
-            log_notification(
-                user_id=scheduled.user_id,
-                notification_type='scheduled_booking_deferred',
-                subject='Scheduled Booking Deferred',
-                message='Your scheduled booking could not start on time and was moved to waitlist.',
-                auto_commit=False,
-            )
-            continue
-
-        spot.is_available = False
-        booking = Booking(
+        entries_by_lot.setdefault(scheduled.lot_id, []).append(scheduled)
+    lots = {lot.id: lot for lot in ParkingLot.query.filter(ParkingLot.id.in_(entries_by_lot)).all()}
+
+    assignments = []
+    unassigned = []
+    for lot_id, entries in entries_by_lot.items():
+        pairs, missed = allocate_spots_for_entries(lot_id, entries)
+        assignments.extend(pairs)
+        unassigned.extend(missed)
+
+    taken_ids = _move_status(
+        ScheduledBooking,
+        [scheduled.id for scheduled, _ in assignments],
+        'scheduled',
+        {'status': 'converted'},
+    )
+    for scheduled, spot in assignments:
+        if scheduled.id not in taken_ids:
+            # Another scheduler converted or cancelled this entry first.
+            release_spot(spot)
+    assignments = [(scheduled, spot) for scheduled, spot in assignments if scheduled.id in taken_ids]
+
+    bookings = [
+        Booking(
             user_id=scheduled.user_id,
             lot_id=scheduled.lot_id,
             spot_id=spot.id,
@@ -447,13 +757,15 @@ def activate_due_scheduled_bookings(limit: int = 20):
             status='active',
             timestamp=scheduled.requested_start,
         )
-        db.session.add(booking)
-        db.session.flush()
-        lot = ParkingLot.query.get(scheduled.lot_id)
-        if lot:
-            lot.available_slots = count_bookable_spots_for_lot(scheduled.lot_id)
+        for scheduled, spot in assignments
+    ]
+    db.session.add_all(bookings)
+    record_bookings_started(bookings)
+    db.session.flush()
 
-        scheduled.status = 'converted'
+    converted = []
+    for (scheduled, spot), booking in zip(assignments, bookings):
+        set_committed_value(scheduled, 'status', 'converted')
         scheduled.assigned_spot_id = spot.id
         scheduled.converted_booking_id = booking.id
         converted.append(scheduled)
@@ -462,11 +774,39 @@ def activate_due_scheduled_bookings(limit: int = 20):
             user_id=scheduled.user_id,
             notification_type='scheduled_booking_started',
             subject='Scheduled Booking Started',
-            message=f'Your scheduled booking is now active at {scheduled.lot.location_name}, spot {spot.spot_number}.',
+            message=(
+                f'Your scheduled booking is now active at {lots[scheduled.lot_id].location_name}, '
+                f'spot {spot.spot_number}.'
+            ),
             auto_commit=False,
         )
 
-    if due_entries:
-        db.session.commit()
+    missed_ids = _move_status(
+        ScheduledBooking,
+        [scheduled.id for scheduled in unassigned],
+        'scheduled',
+        {'status': 'missed'},
+    )
+    deferred = [scheduled for scheduled in unassigned if scheduled.id in missed_ids]
+    for scheduled in deferred:
+        set_committed_value(scheduled, 'status', 'missed')
+        add_to_waitlist(
+            user_id=scheduled.user_id,
+            lot_id=scheduled.lot_id,
+            vehicle_no=scheduled.vehicle_no,
+            vehicle_id=scheduled.vehicle_id,
+            requested_start=scheduled.requested_start,
+            requested_duration_hours=scheduled.duration_hours,
+            auto_commit=False,
+        )
+        log_notification(
+            user_id=scheduled.user_id,
+            notification_type='scheduled_booking_deferred',
+            subject='Scheduled Booking Deferred',
+            message='Your scheduled booking could not start on time and was moved to waitlist.',
+            auto_commit=False,
+        )
+
+    db.session.commit()
 
     return converted, deferred
@@ -0,0 +1,263 @@
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from typing import Callable, Dict, Optional, Tuple
+
+from flask import current_app, request
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from models.models import Booking, ParkingLot, ParkingSpot
+
+DEFAULT_TTL_SECONDS = 30
+DEFAULT_MAX_ENTRIES = 256
+LOCK_TIMEOUT_SECONDS = 10
+
+_SESSION_KEY = 'response_cache_stale'
+_INVALIDATING_MODELS = (Booking, ParkingLot, ParkingSpot)
+
+
+class LRUCacheBackend:
+    """In-process cache: bounded LRU with a per-entry TTL."""
+
+    shared = False
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries: 'OrderedDict[str, Tuple[float, bytes]]' = OrderedDict()
+        self._counters: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key: str, value: bytes, ttl_seconds: int) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def add(self, key: str, value: bytes, ttl_seconds: int) -> bool:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                return False
+        self.set(key, value, ttl_seconds)
+        return True
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def incr(self, key: str) -> int:
+        # Counters live outside the LRU so eviction can never roll a generation back.
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + 1
+            return self._counters[key]
+
+    def get_counter(self, key: str) -> int:
+        with self._lock:
+            return self._counters.get(key, 0)
+
+
+class RedisCacheBackend:
+    """Cache shared by every worker and host through Redis (needs the ``redis`` package)."""
+
+    shared = True
+
+    def __init__(self, url: str):
+        try:
+            import redis
+        except ImportError as exc:  # pragma: no cover - optional dependency
+            raise RuntimeError('RESPONSE_CACHE_URL is set but the redis package is not installed') from exc
+        self._client = redis.Redis.from_url(url)
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self._client.get(key)
+
+    def set(self, key: str, value: bytes, ttl_seconds: int) -> None:
+        self._client.set(key, value, ex=ttl_seconds)
+
+    def add(self, key: str, value: bytes, ttl_seconds: int) -> bool:
+        return bool(self._client.set(key, value, ex=ttl_seconds, nx=True))
+
+    def delete(self, key: str) -> None:
+        self._client.delete(key)
+
+    def incr(self, key: str) -> int:
+        return self._client.incr(key)
+
+    def get_counter(self, key: str) -> int:
+        return int(self._client.get(key) or 0)
+
+
+class _Flight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.value: Optional[bytes] = None
+
+
+class ResponseCache:
+    """Read-through cache with single-flight fills.
+
+    Concurrent misses for one key in a process wait on a single computation;
+    with a shared backend a short-lived lock key extends that across
+    processes. Invalidation bumps a generation number that is part of every
+    key, so stale entries are simply never read again.
+    """
+
+    GENERATION_KEY = 'response-cache:generation'
+
+    def __init__(self, backend=None, ttl_seconds: int = DEFAULT_TTL_SECONDS, lock_timeout: int = LOCK_TIMEOUT_SECONDS):
+        self.backend = backend or LRUCacheBackend()
+        self.ttl_seconds = ttl_seconds
+        self.lock_timeout = lock_timeout
+        self.enabled = True
+        self._inflight: Dict[str, _Flight] = {}
+        self._mutex = threading.Lock()
+
+    def _versioned(self, key: str) -> str:
+        return f'response-cache:{self.backend.get_counter(self.GENERATION_KEY)}:{key}'
+
+    def invalidate(self) -> None:
+        self.backend.incr(self.GENERATION_KEY)
+
+    def get_or_compute(self, key: str, compute: Callable[[], bytes]) -> bytes:
+        key = self._versioned(key)
+        value = self.backend.get(key)
+        if value is not None:
+            return value
+
+        with self._mutex:
+            flight = self._inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._inflight[key] = _Flight()
+
+        if not leader:
+            flight.done.wait(self.lock_timeout)
+            if flight.value is not None:
+                return flight.value
+            return compute()
+
+        try:
+            flight.value = self._fill(key, compute)
+            return flight.value
+        finally:
+            with self._mutex:
+                self._inflight.pop(key, None)
+            flight.done.set()
+
+    def _fill(self, key: str, compute: Callable[[], bytes]) -> bytes:
+        if not self.backend.shared:
+            value = compute()
+            self.backend.set(key, value, self.ttl_seconds)
+            return value
+
+        lock_key = f'{key}:lock'
+        deadline = time.monotonic() + self.lock_timeout
+        while not self.backend.add(lock_key, b'1', self.lock_timeout):
+            # Another process is computing this entry; wait for its result.
+            time.sleep(0.05)
+            value = self.backend.get(key)
+            if value is not None:
+                return value
+            if time.monotonic() > deadline:
+                return compute()
+
+        try:
+            value = compute()
+            self.backend.set(key, value, self.ttl_seconds)
+            return value
+        finally:
+            self.backend.delete(lock_key)
+
+
+response_cache = ResponseCache()
+
+
+class _Uncacheable(Exception):
+    """Raised to skip caching a non-200 response."""
+
+
+def cached_json(view):
+    """Serve a JSON view from ``response_cache``, keyed on path and query string.
+
+    Put it below the auth decorators so access checks still run per request.
+    """
+
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if not response_cache.enabled:
+            return view(*args, **kwargs)
+
+        uncached = []
+
+        def compute() -> bytes:
+            response = current_app.make_response(view(*args, **kwargs))
+            if response.status_code != 200:
+                uncached.append(response)
+                raise _Uncacheable()
+            return response.get_data()
+
+        try:
+            body = response_cache.get_or_compute(request.full_path, compute)
+        except _Uncacheable:
+            return uncached[0]
+        return current_app.response_class(body, mimetype='application/json')
+
+    return wrapper
+
+
+def invalidate_response_cache() -> None:
+    """Drop every cached response (booking, release and lot changes call this)."""
+    response_cache.invalidate()
+
+
+def _collect_changes(session, flush_context) -> None:
+    for instance in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(instance, _INVALIDATING_MODELS):
+            session.info[_SESSION_KEY] = True
+            return
+
+
+def _invalidate_after_commit(session) -> None:
+    if session.info.pop(_SESSION_KEY, False):
+        invalidate_response_cache()
+
+
+def _discard_changes(session) -> None:
+    session.info.pop(_SESSION_KEY, None)
+
+
+_listeners_installed = False
+
+
+def init_response_cache(app) -> None:
+    """Configure ``response_cache`` from ``RESPONSE_CACHE_*`` settings."""
+    global _listeners_installed
+
+    response_cache.enabled = app.config.get('RESPONSE_CACHE_ENABLED', True)
+    response_cache.ttl_seconds = app.config.get('RESPONSE_CACHE_TTL_SECONDS', DEFAULT_TTL_SECONDS)
+    if app.config.get('RESPONSE_CACHE_URL'):
+        response_cache.backend = RedisCacheBackend(app.config['RESPONSE_CACHE_URL'])
+    else:
+        response_cache.backend = LRUCacheBackend(app.config.get('RESPONSE_CACHE_MAX_ENTRIES', DEFAULT_MAX_ENTRIES))
+
+    if not response_cache.enabled or _listeners_installed:
+        return
+
+    event.listen(Session, 'after_flush', _collect_changes)
+    event.listen(Session, 'after_commit', _invalidate_after_commit)
+    event.listen(Session, 'after_rollback', _discard_changes)
+    _listeners_installed = True
@@ -0,0 +1,217 @@
+import gzip
+import json
+import os
+import time
+from datetime import date, datetime, timedelta
+from typing import Callable, Dict, Iterable, List, Optional
+
+from sqlalchemy import insert, select, text
+
+from extensions import db
+from models.models import (
+    ArchivedRecord,
+    Booking,
+    Invoice,
+    NotificationLog,
+    PasswordResetToken,
+    ScheduledBooking,
+    SpotHold,
+    WaitlistEntry,
+)
+
+from .parking_features import utcnow
+
+RETENTION_BATCH_SIZE = 1000
+
+
+class RetentionPolicy:
+    """How long rows of one table stay in the hot table, and what happens after.
+
+    ``archive`` policies copy each cold row (as JSON) into ``archived_record``
+    or a gzip file before deleting it; ``purge`` policies just delete. A row
+    is cold once ``age_column`` is older than ``days`` and every extra
+    criterion matches.
+    """
+
+    def __init__(self, name: str, model, age_column, days: int, action: str, criteria=()):
+        self.name = name
+        self.model = model
+        self.age_column = age_column
+        self.days = days
+        self.action = action
+        self.criteria = criteria
+
+    @property
+    def table(self):
+        return self.model.__table__
+
+
+# Applied in this order; scheduled bookings go before the bookings they may point at.
+RETENTION_POLICIES: Dict[str, RetentionPolicy] = {
+    policy.name: policy
+    for policy in (
+        # Still-'active' lapsed holds count towards held_slots until sweep-holds closes them.
+        RetentionPolicy('spot_holds', SpotHold, SpotHold.expires_at, 2, 'purge', (SpotHold.status != 'active',)),
+        RetentionPolicy('password_reset_tokens', PasswordResetToken, PasswordResetToken.expires_at, 1, 'purge'),
+        RetentionPolicy(
+            'notifications', NotificationLog, NotificationLog.created_at, 90, 'archive',
+            (NotificationLog.status != 'queued',),
+        ),
+        RetentionPolicy(
+            'waitlist', WaitlistEntry, WaitlistEntry.created_at, 90, 'archive',
+            (WaitlistEntry.status != 'waiting',),
+        ),
+        RetentionPolicy(
+            'scheduled_bookings', ScheduledBooking, ScheduledBooking.created_at, 90, 'archive',
+            (ScheduledBooking.status != 'scheduled',),
+        ),
+        RetentionPolicy(
+            'bookings', Booking, Booking.release_time, 365, 'archive',
+            (Booking.status != 'active', Booking.release_time.isnot(None)),
+        ),
+    )
+}
+
+
+def _json_default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f'{type(value).__name__} is not JSON serializable')
+
+
+def _payloads(policy: RetentionPolicy, rows: List[dict]) -> List[dict]:
+    """Archived JSON for each row; bookings also keep the ids of their invoices."""
+    if policy.model is not Booking:
+        return rows
+
+    invoices: Dict[int, List[int]] = {}
+    for invoice_id, booking_id in db.session.query(Invoice.id, Invoice.booking_id).filter(
+        Invoice.booking_id.in_([row['id'] for row in rows]),
+    ):
+        invoices.setdefault(booking_id, []).append(invoice_id)
+    return [{**row, 'invoice_ids': invoices.get(row['id'], [])} for row in rows]
+
+
+def _detach_references(policy: RetentionPolicy, ids: List[int]) -> None:
+    if policy.model is Booking:
+        # Invoices outlive their bookings; the archived booking keeps the link.
+        Invoice.query.filter(Invoice.booking_id.in_(ids)).update({'booking_id': None}, synchronize_session=False)
+        ScheduledBooking.query.filter(ScheduledBooking.converted_booking_id.in_(ids)).update(
+            {'converted_booking_id': None},
+            synchronize_session=False,
+        )
+
+
+class _ArchiveFile:
+    """Append-only gzip JSON-lines file per table for one run."""
+
+    def __init__(self, directory: str, table_name: str, started: datetime):
+        os.makedirs(directory, exist_ok=True)
+        self.path = os.path.join(directory, f"{table_name}-{started.strftime('%Y%m%dT%H%M%S')}.jsonl.gz")
+
+    def write(self, payloads: Iterable[dict]) -> None:
+        # Each batch is its own gzip member; readers see one continuous stream.
+        with gzip.open(self.path, 'at', encoding='utf-8') as handle:
+            for payload in payloads:
+                handle.write(json.dumps(payload, default=_json_default) + '\n')
+
+
+def apply_retention_policy(
+    policy: RetentionPolicy,
+    days: Optional[int] = None,
+    batch_size: int = RETENTION_BATCH_SIZE,
+    archive_dir: Optional[str] = None,
+    dry_run: bool = False,
+    pause_seconds: float = 0.0,
+) -> int:
+    """Archive or purge cold rows of one table in batches; returns rows handled.
+
+    Batches walk the primary key upwards, so each one starts where the last
+    stopped and every transaction touches at most ``batch_size`` rows. With
+    ``dry_run`` nothing is written and the count is what would be handled.
+    """
+    cutoff = utcnow() - timedelta(days=policy.days if days is None else days)
+    table = policy.table
+    pk = table.c.id
+    started = utcnow()
+    archive_file = _ArchiveFile(archive_dir, table.name, started) if archive_dir and policy.action == 'archive' else None
+
+    handled = 0
+    last_id = 0
+    while True:
+        rows = [
+            dict(row)
+            for row in db.session.execute(
+                select(table)
+                .where(pk > last_id, policy.age_column < cutoff, *policy.criteria)
+                .order_by(pk)
+                .limit(batch_size)
+            ).mappings()
+        ]
+        if not rows:
+            break
+
+        ids = [row['id'] for row in rows]
+        last_id = ids[-1]
+        handled += len(rows)
+        if dry_run:
+            db.session.rollback()
+            continue
+
+        if policy.action == 'archive':
+            payloads = _payloads(policy, rows)
+            if archive_file is not None:
+                archive_file.write(payloads)
+            else:
+                db.session.execute(insert(ArchivedRecord), [
+                    {
+                        'source_table': table.name,
+                        'record_id': payload['id'],
+                        'archived_at': started,
+                        'payload': json.dumps(payload, default=_json_default),
+                    }
+                    for payload in payloads
+                ])
+
+        _detach_references(policy, ids)
+        db.session.execute(table.delete().where(pk.in_(ids)))
+        db.session.commit()
+        if pause_seconds:
+            time.sleep(pause_seconds)
+
+    if handled and not dry_run:
+        # Keep planner statistics in step with the shrunken table.
+        db.session.execute(text(f'ANALYZE {db.engine.dialect.identifier_preparer.quote(table.name)}'))
+        db.session.commit()
+    return handled
+
+
+def apply_retention(
+    names: Optional[Iterable[str]] = None,
+    days: Optional[Dict[str, int]] = None,
+    batch_size: int = RETENTION_BATCH_SIZE,
+    archive_dir: Optional[str] = None,
+    dry_run: bool = False,
+    pause_seconds: float = 0.0,
+    echo: Callable[[str], None] = print,
+) -> Dict[str, int]:
+    """Run the named policies (all by default) in order; returns rows handled per policy."""
+    days = days or {}
+    selected = list(names) if names else list(RETENTION_POLICIES)
+    results = {}
+    for name in RETENTION_POLICIES:
+        if name not in selected:
+            continue
+        policy = RETENTION_POLICIES[name]
+        handled = apply_retention_policy(
+            policy,
+            days=days.get(name),
+            batch_size=batch_size,
+            archive_dir=archive_dir,
+            dry_run=dry_run,
+            pause_seconds=pause_seconds,
+        )
+        results[name] = handled
+        verb = {'archive': 'archived', 'purge': 'purged'}[policy.action]
+        echo(f"{name}: {'would be ' if dry_run else ''}{verb} {handled} row(s) older than {days.get(name, policy.days)} day(s)")
+    return results
@@ -0,0 +1,227 @@
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import extract, func
+
+from extensions import db
+from models.models import Booking, BookingHourlyRollup, ParkingLot
+
+ROLLUP_FIELDS = ('bookings', 'releases', 'revenue', 'duration_minutes')
+
+RollupDeltas = Dict[Tuple[int, datetime], Dict[str, float]]
+
+
+def hour_bucket(value: datetime) -> datetime:
+    return value.replace(minute=0, second=0, microsecond=0)
+
+
+def _add_delta(deltas: RollupDeltas, lot_id: int, at: datetime, **values) -> None:
+    bucket = deltas.setdefault((lot_id, hour_bucket(at)), dict.fromkeys(ROLLUP_FIELDS, 0))
+    for field, value in values.items():
+        bucket[field] += value
+
+
+def _apply_deltas(deltas: RollupDeltas) -> None:
+    """Add deltas to their rollup rows, creating missing rows, in one upsert."""
+    deltas = {key: values for key, values in deltas.items() if any(values.values())}
+    if not deltas:
+        return
+
+    rows = [
+        {'lot_id': lot_id, 'bucket_start': bucket, **values}
+        for (lot_id, bucket), values in deltas.items()
+    ]
+    dialect = db.session.get_bind().dialect.name
+
+    if dialect in ('postgresql', 'sqlite'):
+        if dialect == 'postgresql':
+            from sqlalchemy.dialects.postgresql import insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert
+
+        statement = insert(BookingHourlyRollup).values(rows)
+        statement = statement.on_conflict_do_update(
+            index_elements=['lot_id', 'bucket_start'],
+            set_={
+                field: getattr(BookingHourlyRollup, field) + getattr(statement.excluded, field)
+                for field in ROLLUP_FIELDS
+            },
+        )
+        db.session.execute(statement)
+        return
+
+    for row in rows:
+        updated = BookingHourlyRollup.query.filter_by(
+            lot_id=row['lot_id'],
+            bucket_start=row['bucket_start'],
+        ).update(
+            {field: getattr(BookingHourlyRollup, field) + row[field] for field in ROLLUP_FIELDS},
+            synchronize_session=False,
+        )
+        if not updated:
+            db.session.add(BookingHourlyRollup(**row))
+    db.session.flush()
+
+
+def record_bookings_started(bookings: Iterable[Booking]) -> None:
+    """Count new bookings in their lot's rollup for the hour they start."""
+    deltas: RollupDeltas = {}
+    for booking in bookings:
+        _add_delta(deltas, booking.lot_id, booking.timestamp or datetime.utcnow(), bookings=1)
+    _apply_deltas(deltas)
+
+
+def record_booking_released(booking: Booking) -> None:
+    """Add a released booking's revenue and duration to the hour it was released."""
+    release_time = booking.release_time or datetime.utcnow()
+    duration = (release_time - booking.timestamp).total_seconds() / 60 if booking.timestamp else 0
+    deltas: RollupDeltas = {}
+    _add_delta(
+        deltas,
+        booking.lot_id,
+        release_time,
+        releases=1,
+        revenue=booking.cost or 0,
+        duration_minutes=max(0.0, duration),
+    )
+    _apply_deltas(deltas)
+
+
+def _hour_bucket_expression(column):
+    if db.session.get_bind().dialect.name == 'postgresql':
+        return func.date_trunc('hour', column)
+    return func.strftime('%Y-%m-%d %H:00:00', column)
+
+
+def _as_datetime(value) -> datetime:
+    return datetime.fromisoformat(value) if isinstance(value, str) else value
+
+
+def aggregate_booking_rollups(*criteria, since: Optional[datetime] = None) -> RollupDeltas:
+    """Compute rollup values straight from ``Booking`` rows matching ``criteria``.
+
+    Starts and releases are grouped by lot and hour in SQL, so only one row
+    per bucket comes back however many bookings there are.
+    """
+    deltas: RollupDeltas = {}
+
+    started_bucket = _hour_bucket_expression(Booking.timestamp)
+    started = db.session.query(Booking.lot_id, started_bucket, func.count(Booking.id)).filter(
+        Booking.timestamp.isnot(None),
+        *criteria,
+    )
+    if since is not None:
+        started = started.filter(Booking.timestamp >= since)
+    for lot_id, bucket, count in started.group_by(Booking.lot_id, started_bucket):
+        _add_delta(deltas, lot_id, _as_datetime(bucket), bookings=count)
+
+    released_bucket = _hour_bucket_expression(Booking.release_time)
+    if db.session.get_bind().dialect.name == 'postgresql':
+        duration = func.extract('epoch', Booking.release_time - Booking.timestamp) / 60
+    else:
+        duration = (func.julianday(Booking.release_time) - func.julianday(Booking.timestamp)) * 1440
+    released = db.session.query(
+        Booking.lot_id,
+        released_bucket,
+        func.count(Booking.id),
+        func.coalesce(func.sum(Booking.cost), 0),
+        func.coalesce(func.sum(duration), 0),
+    ).filter(
+        Booking.status == 'released',
+        Booking.release_time.isnot(None),
+        *criteria,
+    )
+    if since is not None:
+        released = released.filter(Booking.release_time >= since)
+    for lot_id, bucket, count, revenue, minutes in released.group_by(Booking.lot_id, released_bucket):
+        _add_delta(
+            deltas,
+            lot_id,
+            _as_datetime(bucket),
+            releases=count,
+            revenue=float(revenue),
+            duration_minutes=max(0.0, float(minutes)),
+        )
+
+    return deltas
+
+
+def retract_booking_rollups(*criteria) -> None:
+    """Subtract bookings that are about to be deleted from their rollups."""
+    deltas = aggregate_booking_rollups(*criteria)
+    for values in deltas.values():
+        for field in ROLLUP_FIELDS:
+            values[field] = -values[field]
+    _apply_deltas(deltas)
+
+
+def rebuild_booking_rollups(lot_ids: Optional[List[int]] = None, since: Optional[datetime] = None) -> int:
+    """Recompute rollups from the booking table; returns the number of rows written.
+
+    ``since`` limits the rebuild to buckets from that hour onwards, so a
+    partial backfill leaves older history untouched.
+    """
+    if since is not None:
+        since = hour_bucket(since)
+
+    stale = BookingHourlyRollup.query
+    criteria = []
+    if lot_ids:
+        stale = stale.filter(BookingHourlyRollup.lot_id.in_(lot_ids))
+        criteria.append(Booking.lot_id.in_(lot_ids))
+    if since is not None:
+        stale = stale.filter(BookingHourlyRollup.bucket_start >= since)
+    stale.delete(synchronize_session=False)
+
+    deltas = aggregate_booking_rollups(*criteria, since=since)
+    _apply_deltas(deltas)
+    db.session.commit()
+    return len(deltas)
+
+
+def hourly_booking_counts(days: int = 7) -> Dict[int, int]:
+    """Bookings started per hour of day over the last ``days`` days."""
+    start_bucket = hour_bucket(datetime.utcnow() - timedelta(days=days))
+    hour = extract('hour', BookingHourlyRollup.bucket_start)
+    rows = db.session.query(hour, func.sum(BookingHourlyRollup.bookings)).filter(
+        BookingHourlyRollup.bucket_start >= start_bucket,
+    ).group_by(hour).all()
+    return {int(hour_of_day): int(count or 0) for hour_of_day, count in rows}
+
+
+def top_lots_by_bookings(limit: int = 10) -> List[dict]:
+    """Lots ranked by bookings; revenue counts open bookings at the lot's hourly price."""
+    totals = db.session.query(
+        BookingHourlyRollup.lot_id.label('lot_id'),
+        func.sum(BookingHourlyRollup.bookings).label('bookings'),
+        func.sum(BookingHourlyRollup.releases).label('releases'),
+        func.sum(BookingHourlyRollup.revenue).label('revenue'),
+        func.sum(BookingHourlyRollup.duration_minutes).label('duration_minutes'),
+    ).group_by(BookingHourlyRollup.lot_id).subquery()
+
+    bookings = func.coalesce(totals.c.bookings, 0)
+    releases = func.coalesce(totals.c.releases, 0)
+    rows = db.session.query(
+        ParkingLot.location_name,
+        ParkingLot.price,
+        bookings,
+        releases,
+        func.coalesce(totals.c.revenue, 0),
+        func.coalesce(totals.c.duration_minutes, 0),
+    ).outerjoin(totals, totals.c.lot_id == ParkingLot.id).filter(
+        ParkingLot.deleted_at.is_(None),
+    ).order_by(
+        bookings.desc(),
+        ParkingLot.id.asc(),
+    ).limit(limit).all()
+
+    result = []
+    for name, price, booked, released, revenue, minutes in rows:
+        open_bookings = max(0, booked - released)
+        result.append({
+            'lot': name,
+            'bookings': int(booked),
+            'revenue': round(float(revenue) + open_bookings * price, 2),
+            'avg_duration_minutes': round(float(minutes) / released, 1) if released else 0,
+        })
+    return result
@@ -0,0 +1,112 @@
+import os
+import socket
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Optional
+
+from sqlalchemy import func, or_
+from sqlalchemy.exc import IntegrityError
+
+from extensions import db
+from models.models import JobLease, ScheduledBooking
+
+from .parking_features import activate_due_scheduled_bookings, utcnow
+
+SCHEDULER_LEASE_NAME = 'scheduled-bookings'
+LEASE_TTL_SECONDS = 60
+
+
+def default_lease_holder() -> str:
+    return f'{socket.gethostname()}:{os.getpid()}'
+
+
+def acquire_job_lease(name: str, holder: str, ttl_seconds: int = LEASE_TTL_SECONDS) -> bool:
+    """Take or renew the named lease; False while another holder's lease is live.
+
+    Acquisition is a conditional UPDATE (or the first INSERT), so at most one
+    process holds a given lease at a time even across hosts.
+    """
+    now = utcnow()
+    expires_at = now + timedelta(seconds=ttl_seconds)
+
+    renewed = JobLease.query.filter(
+        JobLease.name == name,
+        or_(JobLease.holder == holder, JobLease.expires_at < now),
+    ).update(
+        {'holder': holder, 'acquired_at': now, 'expires_at': expires_at},
+        synchronize_session=False,
+    )
+    if renewed:
+        db.session.commit()
+        return True
+
+    if db.session.get(JobLease, name) is not None:
+        db.session.rollback()
+        return False
+
+    db.session.add(JobLease(name=name, holder=holder, acquired_at=now, expires_at=expires_at))
+    try:
+        db.session.commit()
+    except IntegrityError:
+        db.session.rollback()
+        return False
+    return True
+
+
+def release_job_lease(name: str, holder: str) -> None:
+    JobLease.query.filter_by(name=name, holder=holder).delete(synchronize_session=False)
+    db.session.commit()
+
+
+def next_scheduled_start() -> Optional[datetime]:
+    return db.session.query(func.min(ScheduledBooking.requested_start)).filter(
+        ScheduledBooking.status == 'scheduled',
+    ).scalar()
+
+
+def run_scheduler(
+    batch_size: int = 50,
+    max_sleep_seconds: int = 30,
+    once: bool = False,
+    holder: Optional[str] = None,
+    echo: Callable[[str], None] = print,
+) -> None:
+    """Convert due scheduled bookings until stopped.
+
+    Only the lease holder works; it drains due entries in batches, then
+    sleeps until the next ``requested_start`` (capped at ``max_sleep_seconds``
+    so newly scheduled bookings and lease renewals are not missed).
+    """
+    holder = holder or default_lease_holder()
+    lease_ttl = max(LEASE_TTL_SECONDS, max_sleep_seconds * 2)
+
+    try:
+        while True:
+            if acquire_job_lease(SCHEDULER_LEASE_NAME, holder, lease_ttl):
+                while True:
+                    converted, deferred = activate_due_scheduled_bookings(limit=batch_size)
+                    if converted or deferred:
+                        echo(f'Converted {len(converted)}, deferred {len(deferred)} scheduled booking(s).')
+                    if len(converted) + len(deferred) < batch_size:
+                        break
+                    # A long backlog can outlast the lease; renew it before every
+                    # further batch and stop draining if another instance took over.
+                    if not acquire_job_lease(SCHEDULER_LEASE_NAME, holder, lease_ttl):
+                        echo('Lost the scheduler lease; another instance took over.')
+                        break
+
+                sleep_for = max_sleep_seconds
+                upcoming = next_scheduled_start()
+                if upcoming is not None:
+                    sleep_for = min(sleep_for, max(0.0, (upcoming - utcnow()).total_seconds()))
+            else:
+                sleep_for = max_sleep_seconds
+
+            db.session.remove()
+            if once:
+                return
+            time.sleep(max(sleep_for, 1))
+    finally:
+        # Never commit half a batch on the way out (e.g. Ctrl-C mid-batch).
+        db.session.rollback()
+        release_job_lease(SCHEDULER_LEASE_NAME, holder)
@@ -0,0 +1,200 @@
+from typing import Iterable, List, Optional, Tuple
+
+from sqlalchemy import DDL, column, event, func, literal_column, select, table, text
+from sqlalchemy.orm import Session
+
+from extensions import db
+from models.models import ParkingLot, SearchDocument, User, Vehicle
+
+SEARCH_KINDS = ('lot', 'user')
+MIN_INDEXED_QUERY_LENGTH = 3  # trigram indexes cannot serve shorter terms
+REINDEX_BATCH_SIZE = 500
+
+_SESSION_KEY = 'search_reindex'
+
+# SQLite: an external-content FTS5 table over search_document, kept in step by
+# triggers. The trigram tokenizer gives indexed substring matches like ILIKE.
+SQLITE_SEARCH_DDL = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS search_document_fts USING fts5("
+    "body, content='search_document', content_rowid='id', tokenize='trigram')",
+    "CREATE TRIGGER IF NOT EXISTS search_document_ai AFTER INSERT ON search_document BEGIN "
+    "INSERT INTO search_document_fts(rowid, body) VALUES (new.id, new.body); END",
+    "CREATE TRIGGER IF NOT EXISTS search_document_ad AFTER DELETE ON search_document BEGIN "
+    "INSERT INTO search_document_fts(search_document_fts, rowid, body) VALUES ('delete', old.id, old.body); END",
+    "CREATE TRIGGER IF NOT EXISTS search_document_au AFTER UPDATE ON search_document BEGIN "
+    "INSERT INTO search_document_fts(search_document_fts, rowid, body) VALUES ('delete', old.id, old.body); "
+    "INSERT INTO search_document_fts(rowid, body) VALUES (new.id, new.body); END",
+)
+
+# Postgres: a trigram GIN index answers ILIKE '%term%' and ranks by similarity().
+POSTGRES_SEARCH_DDL = (
+    'CREATE EXTENSION IF NOT EXISTS pg_trgm',
+    'CREATE INDEX IF NOT EXISTS ix_search_document_body_trgm ON search_document USING gin (body gin_trgm_ops)',
+)
+
+for _statement in SQLITE_SEARCH_DDL:
+    event.listen(SearchDocument.__table__, 'after_create', DDL(_statement).execute_if(dialect='sqlite'))
+for _statement in POSTGRES_SEARCH_DDL:
+    event.listen(SearchDocument.__table__, 'after_create', DDL(_statement).execute_if(dialect='postgresql'))
+
+
+def _lot_bodies(connection, lot_ids: Iterable[int]) -> List[dict]:
+    rows = connection.execute(
+        select(ParkingLot.id, ParkingLot.location_name, ParkingLot.address, ParkingLot.pincode)
+        .where(ParkingLot.id.in_(list(lot_ids)), ParkingLot.deleted_at.is_(None))
+    )
+    return [
+        {'kind': 'lot', 'ref_id': lot_id, 'body': ' '.join(filter(None, (name, address, pincode)))}
+        for lot_id, name, address, pincode in rows
+    ]
+
+
+def _user_bodies(connection, user_ids: Iterable[int]) -> List[dict]:
+    user_ids = list(user_ids)
+    plates = {}
+    for user_id, plate in connection.execute(
+        select(Vehicle.user_id, Vehicle.plate_number).where(Vehicle.user_id.in_(user_ids))
+    ):
+        plates.setdefault(user_id, []).append(plate)
+
+    rows = connection.execute(select(User.id, User.email, User.full_name).where(User.id.in_(user_ids)))
+    return [
+        {'kind': 'user', 'ref_id': user_id, 'body': ' '.join(filter(None, (email, full_name, *plates.get(user_id, ()))))}
+        for user_id, email, full_name in rows
+    ]
+
+
+def reindex_search_documents(
+    connection,
+    lot_ids: Iterable[int] = (),
+    user_ids: Iterable[int] = (),
+) -> None:
+    """Rewrite the search documents of the given lots and users from their current rows.
+
+    Documents of rows that no longer exist are dropped. Runs on ``connection``
+    so it joins the caller's transaction; bulk writers that bypass the ORM
+    (imports, raw inserts) call it with the ids they touched.
+    """
+    for kind, ids, build in (('lot', set(lot_ids), _lot_bodies), ('user', set(user_ids), _user_bodies)):
+        ids = sorted(ids)
+        for start in range(0, len(ids), REINDEX_BATCH_SIZE):
+            chunk = ids[start:start + REINDEX_BATCH_SIZE]
+            connection.execute(
+                SearchDocument.__table__.delete().where(
+                    SearchDocument.kind == kind,
+                    SearchDocument.ref_id.in_(chunk),
+                )
+            )
+            documents = build(connection, chunk)
+            if documents:
+                connection.execute(SearchDocument.__table__.insert(), documents)
+
+
+def rebuild_search_index() -> int:
+    """Recreate every search document; returns how many were written."""
+    connection = db.session.connection()
+    connection.execute(SearchDocument.__table__.delete())
+    lot_ids = [lot_id for (lot_id,) in db.session.query(ParkingLot.id)]
+    user_ids = [user_id for (user_id,) in db.session.query(User.id)]
+    reindex_search_documents(connection, lot_ids=lot_ids, user_ids=user_ids)
+    if connection.dialect.name == 'sqlite':
+        connection.execute(text("INSERT INTO search_document_fts(search_document_fts) VALUES ('rebuild')"))
+    db.session.commit()
+    return len(lot_ids) + len(user_ids)
+
+
+def _escape_like(term: str) -> str:
+    return term.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+
+def _matching_documents(term: str, kind: Optional[str]):
+    """Return ``(select, rank)`` over the documents matching ``term``."""
+    dialect = db.session.get_bind().dialect.name
+    documents = SearchDocument.__table__
+
+    if dialect == 'sqlite' and len(term) >= MIN_INDEXED_QUERY_LENGTH:
+        fts = table('search_document_fts', column('rowid'))
+        base = select(documents.c.kind, documents.c.ref_id).select_from(
+            documents.join(fts, fts.c.rowid == documents.c.id)
+        ).where(text('search_document_fts MATCH :phrase').bindparams(phrase='"' + term.replace('"', '""') + '"'))
+        rank = func.bm25(literal_column('search_document_fts'))
+    else:
+        base = select(documents.c.kind, documents.c.ref_id).where(
+            documents.c.body.ilike(f'%{_escape_like(term)}%', escape='\\')
+        )
+        rank = -func.similarity(documents.c.body, term) if dialect == 'postgresql' else documents.c.id
+
+    if kind:
+        base = base.where(documents.c.kind == kind)
+    return base, rank
+
+
+def search_documents(
+    query: str,
+    kind: Optional[str] = None,
+    page: int = 1,
+    per_page: int = 20,
+) -> Tuple[List[Tuple[str, int]], int]:
+    """Ranked ``(kind, ref_id)`` matches for one page, plus the total match count.
+
+    Terms of three or more characters go through the full-text index (FTS5
+    bm25 on SQLite, trigram similarity on Postgres); shorter ones fall back
+    to a substring scan of the document table.
+    """
+    term = (query or '').strip()
+    if not term:
+        return [], 0
+
+    page = max(1, page)
+    base, rank = _matching_documents(term, kind)
+    documents = SearchDocument.__table__
+
+    total = db.session.execute(select(func.count()).select_from(base.subquery())).scalar()
+    rows = db.session.execute(
+        base.order_by(rank, documents.c.id).limit(per_page).offset((page - 1) * per_page)
+    ).all()
+    return [(row_kind, ref_id) for row_kind, ref_id in rows], total
+
+
+def matching_ref_ids(query: str, kind: str):
+    """A ``SELECT ref_id`` of every ``kind`` document matching ``query``, for use in ``IN (...)`` filters."""
+    base, _ = _matching_documents((query or '').strip(), kind)
+    return base.with_only_columns(SearchDocument.__table__.c.ref_id)
+
+
+def _collect_changes(session, flush_context) -> None:
+    pending = session.info.setdefault(_SESSION_KEY, {'lot': set(), 'user': set()})
+    for instance in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(instance, ParkingLot):
+            pending['lot'].add(instance.id)
+        elif isinstance(instance, User):
+            pending['user'].add(instance.id)
+        elif isinstance(instance, Vehicle):
+            pending['user'].add(instance.user_id)
+
+
+def _flush_changes(session) -> None:
+    session.flush()
+    pending = session.info.pop(_SESSION_KEY, None)
+    if pending and (pending['lot'] or pending['user']):
+        reindex_search_documents(session.connection(), lot_ids=pending['lot'], user_ids=pending['user'])
+
+
+def _discard_changes(session) -> None:
+    session.info.pop(_SESSION_KEY, None)
+
+
+_listeners_installed = False
+
+
+def init_search_index(app) -> None:
+    """Keep search documents in step with lot, user and vehicle writes made through the ORM."""
+    global _listeners_installed
+
+    if _listeners_installed:
+        return
+
+    event.listen(Session, 'after_flush', _collect_changes)
+    event.listen(Session, 'before_commit', _flush_changes)
+    event.listen(Session, 'after_rollback', _discard_changes)
+    _listeners_installed = True
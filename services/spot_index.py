@@ -0,0 +1,339 @@
+import heapq
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import event, inspect, or_
+from sqlalchemy.orm import Session
+
+from extensions import db
+from models.models import ParkingSpot, SpotHold, SpotMaintenanceWindow
+
+DEFAULT_TTL_SECONDS = 30
+
+_SESSION_KEY = 'spot_index_changes'
+
+
+def spot_sort_key(spot_number) -> Tuple[int, object]:
+    """Order spot numbers the way SQLite does: integers before text."""
+    if isinstance(spot_number, int):
+        return 0, spot_number
+    return 1, str(spot_number)
+
+
+class LotSpotIndex:
+    """Free-spot index for one lot.
+
+    Open spots (available, not in maintenance, not held) live in a min-heap
+    keyed by spot number. Spots blocked by a hold or a timed maintenance
+    window are parked in an expiry heap and pushed back once they lapse, so
+    lookups stay O(log n) amortized instead of scanning every spot.
+    """
+
+    def __init__(self, lot_id: int):
+        self.lot_id = lot_id
+        self.built_at = 0.0
+        self._keys: Dict[int, Tuple[int, object]] = {}
+        self._available: Set[int] = set()
+        self._maintenance: Dict[int, Optional[datetime]] = {}
+        self._holds: Dict[int, Tuple[int, int, datetime]] = {}
+        self._holds_by_user: Dict[int, Set[int]] = {}
+        self._open_heap: List[Tuple[Tuple[int, object], int]] = []
+        self._in_heap: Set[int] = set()
+        self._expiry_heap: List[Tuple[datetime, int]] = []
+
+    def load(self, spots, holds, maintenance_windows) -> None:
+        for spot_id, spot_number, is_available in spots:
+            self._keys[spot_id] = spot_sort_key(spot_number)
+            if is_available:
+                self._available.add(spot_id)
+
+        for spot_id, ends_at in maintenance_windows:
+            self._set_maintenance(spot_id, ends_at)
+
+        for hold_id, spot_id, user_id, expires_at in holds:
+            self._set_hold(hold_id, spot_id, user_id, expires_at)
+
+        for spot_id in self._keys:
+            self._push_if_open(spot_id, datetime.utcnow())
+
+        self.built_at = time.monotonic()
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def _maintenance_active(self, spot_id: int, now: datetime) -> bool:
+        if spot_id not in self._maintenance:
+            return False
+        ends_at = self._maintenance[spot_id]
+        return ends_at is None or ends_at > now
+
+    def _hold_for(self, spot_id: int, now: datetime) -> Optional[Tuple[int, int, datetime]]:
+        hold = self._holds.get(spot_id)
+        if hold and hold[2] >= now:
+            return hold
+        return None
+
+    def _is_open(self, spot_id: int, now: datetime) -> bool:
+        return (
+            spot_id in self._available
+            and not self._maintenance_active(spot_id, now)
+            and self._hold_for(spot_id, now) is None
+        )
+
+    def _push_if_open(self, spot_id: int, now: datetime) -> None:
+        if spot_id in self._in_heap or not self._is_open(spot_id, now):
+            return
+        heapq.heappush(self._open_heap, (self._keys[spot_id], spot_id))
+        self._in_heap.add(spot_id)
+
+    def _set_maintenance(self, spot_id: int, ends_at: Optional[datetime]) -> None:
+        self._maintenance[spot_id] = ends_at
+        if ends_at is not None:
+            heapq.heappush(self._expiry_heap, (ends_at, spot_id))
+
+    def _set_hold(self, hold_id: int, spot_id: int, user_id: int, expires_at: datetime) -> None:
+        self._drop_hold(spot_id)
+        self._holds[spot_id] = (hold_id, user_id, expires_at)
+        self._holds_by_user.setdefault(user_id, set()).add(spot_id)
+        heapq.heappush(self._expiry_heap, (expires_at, spot_id))
+
+    def _drop_hold(self, spot_id: int) -> None:
+        previous = self._holds.pop(spot_id, None)
+        if previous:
+            user_spots = self._holds_by_user.get(previous[1])
+            if user_spots:
+                user_spots.discard(spot_id)
+                if not user_spots:
+                    del self._holds_by_user[previous[1]]
+
+    def _release_expired(self, now: datetime) -> None:
+        while self._expiry_heap and self._expiry_heap[0][0] < now:
+            _, spot_id = heapq.heappop(self._expiry_heap)
+            self._push_if_open(spot_id, now)
+
+    def find(self, user_id: Optional[int], now: datetime) -> Optional[int]:
+        """Return the lowest-numbered spot id ``user_id`` may book, if any."""
+        self._release_expired(now)
+
+        while self._open_heap:
+            _, spot_id = self._open_heap[0]
+            if self._is_open(spot_id, now):
+                break
+            heapq.heappop(self._open_heap)
+            self._in_heap.discard(spot_id)
+
+        best = self._open_heap[0] if self._open_heap else None
+
+        for spot_id in self._holds_by_user.get(user_id, ()):
+            hold = self._hold_for(spot_id, now)
+            if not hold or spot_id not in self._available or self._maintenance_active(spot_id, now):
+                continue
+            candidate = (self._keys[spot_id], spot_id)
+            if best is None or candidate < best:
+                best = candidate
+
+        return best[1] if best else None
+
+    def apply_spot(self, spot_id: int, spot_number, is_available: bool, now: datetime) -> None:
+        self._keys[spot_id] = spot_sort_key(spot_number)
+        if is_available:
+            self._available.add(spot_id)
+            self._push_if_open(spot_id, now)
+        else:
+            self._available.discard(spot_id)
+
+    def remove_spot(self, spot_id: int) -> None:
+        self._keys.pop(spot_id, None)
+        self._available.discard(spot_id)
+        self._maintenance.pop(spot_id, None)
+        self._drop_hold(spot_id)
+
+    def apply_hold(
+        self,
+        hold_id: int,
+        spot_id: int,
+        user_id: int,
+        expires_at: datetime,
+        is_active: bool,
+        now: datetime,
+    ) -> None:
+        if spot_id not in self._keys:
+            return
+        if is_active:
+            self._set_hold(hold_id, spot_id, user_id, expires_at)
+            return
+        current = self._holds.get(spot_id)
+        if current and current[0] == hold_id:
+            self._drop_hold(spot_id)
+            self._push_if_open(spot_id, now)
+
+    def apply_maintenance(self, spot_id: int, ends_at: Optional[datetime], is_active: bool, now: datetime) -> None:
+        if spot_id not in self._keys:
+            return
+        if is_active:
+            self._set_maintenance(spot_id, ends_at)
+            return
+        self._maintenance.pop(spot_id, None)
+        self._push_if_open(spot_id, now)
+
+
+class SpotIndexRegistry:
+    """Process-local map of lot id to :class:`LotSpotIndex`.
+
+    Each gunicorn worker keeps its own copy, so entries are rebuilt after
+    ``ttl_seconds`` to pick up changes committed by other workers. Callers
+    must still confirm a returned spot against the database.
+    """
+
+    def __init__(self, ttl_seconds: int = DEFAULT_TTL_SECONDS):
+        self.ttl_seconds = ttl_seconds
+        self._lots: Dict[int, LotSpotIndex] = {}
+        self._lock = threading.RLock()
+
+    def _build(self, lot_id: int) -> LotSpotIndex:
+        now = datetime.utcnow()
+        spots = db.session.query(
+            ParkingSpot.id,
+            ParkingSpot.spot_number,
+            ParkingSpot.is_available,
+        ).filter(ParkingSpot.lot_id == lot_id).all()
+        holds = db.session.query(
+            SpotHold.id,
+            SpotHold.spot_id,
+            SpotHold.user_id,
+            SpotHold.expires_at,
+        ).filter(
+            SpotHold.lot_id == lot_id,
+            SpotHold.status == 'active',
+            SpotHold.expires_at >= now,
+        ).order_by(SpotHold.created_at.asc()).all()
+        maintenance_windows = db.session.query(
+            SpotMaintenanceWindow.spot_id,
+            SpotMaintenanceWindow.ends_at,
+        ).filter(
+            SpotMaintenanceWindow.lot_id == lot_id,
+            SpotMaintenanceWindow.is_active.is_(True),
+            or_(
+                SpotMaintenanceWindow.ends_at.is_(None),
+                SpotMaintenanceWindow.ends_at > now,
+            ),
+        ).all()
+
+        index = LotSpotIndex(lot_id)
+        index.load(spots, holds, maintenance_windows)
+        return index
+
+    def get(self, lot_id: int) -> LotSpotIndex:
+        with self._lock:
+            index = self._lots.get(lot_id)
+            if index is None or time.monotonic() - index.built_at > self.ttl_seconds:
+                index = self._build(lot_id)
+                self._lots[lot_id] = index
+            return index
+
+    def find_spot_id(self, lot_id: int, user_id: Optional[int] = None) -> Optional[int]:
+        with self._lock:
+            return self.get(lot_id).find(user_id, datetime.utcnow())
+
+    def invalidate(self, lot_id: Optional[int] = None) -> None:
+        with self._lock:
+            if lot_id is None:
+                self._lots.clear()
+            else:
+                self._lots.pop(lot_id, None)
+
+    def apply(self, changes) -> None:
+        now = datetime.utcnow()
+        with self._lock:
+            for kind, lot_id, payload in changes:
+                index = self._lots.get(lot_id)
+                if index is None:
+                    continue
+                if kind == 'invalidate':
+                    self._lots.pop(lot_id, None)
+                elif kind == 'spot':
+                    index.apply_spot(*payload, now=now)
+                elif kind == 'spot_removed':
+                    index.remove_spot(*payload)
+                elif kind == 'hold':
+                    index.apply_hold(*payload, now=now)
+                elif kind == 'maintenance':
+                    index.apply_maintenance(*payload, now=now)
+
+
+registry = SpotIndexRegistry()
+_listeners_installed = False
+
+
+def _collect_changes(session, flush_context) -> None:
+    now = datetime.utcnow()
+    changes = session.info.setdefault(_SESSION_KEY, [])
+
+    for obj in list(session.new) + list(session.dirty):
+        if isinstance(obj, ParkingSpot):
+            if obj in session.dirty and not inspect(obj).attrs.is_available.history.has_changes():
+                continue
+            changes.append(('spot', obj.lot_id, (obj.id, obj.spot_number, bool(obj.is_available))))
+        elif isinstance(obj, SpotHold):
+            is_active = obj.status == 'active' and obj.expires_at is not None and obj.expires_at >= now
+            changes.append(('hold', obj.lot_id, (obj.id, obj.spot_id, obj.user_id, obj.expires_at, is_active)))
+        elif isinstance(obj, SpotMaintenanceWindow):
+            is_active = bool(obj.is_active) and (obj.ends_at is None or obj.ends_at > now)
+            changes.append(('maintenance', obj.lot_id, (obj.spot_id, obj.ends_at, is_active)))
+
+    for obj in session.deleted:
+        if isinstance(obj, ParkingSpot):
+            changes.append(('spot_removed', obj.lot_id, (obj.id,)))
+        elif isinstance(obj, (SpotHold, SpotMaintenanceWindow)):
+            changes.append(('invalidate', obj.lot_id, None))
+
+
+def note_spot_change(session, lot_id: int, spot_id: int, spot_number, is_available: bool) -> None:
+    """Queue a spot change made by a bulk UPDATE that bypasses flush events."""
+    if _listeners_installed:
+        session.info.setdefault(_SESSION_KEY, []).append(
+            ('spot', lot_id, (spot_id, spot_number, is_available))
+        )
+
+
+def note_hold_change(session, hold: SpotHold, is_active: bool) -> None:
+    """Queue a hold status change made by a bulk UPDATE."""
+    if _listeners_installed:
+        session.info.setdefault(_SESSION_KEY, []).append(
+            ('hold', hold.lot_id, (hold.id, hold.spot_id, hold.user_id, hold.expires_at, is_active))
+        )
+
+
+def note_lot_invalidated(session, lot_id: int) -> None:
+    """Queue a rebuild of a lot's index after bulk spot inserts or deletes."""
+    if _listeners_installed:
+        session.info.setdefault(_SESSION_KEY, []).append(('invalidate', lot_id, None))
+
+
+def _apply_changes(session) -> None:
+    changes = session.info.pop(_SESSION_KEY, None)
+    if changes:
+        registry.apply(changes)
+
+
+def _discard_changes(session) -> None:
+    session.info.pop(_SESSION_KEY, None)
+
+
+def init_spot_index(app) -> None:
+    """Enable the free-spot index when ``SPOT_INDEX_ENABLED`` is set."""
+    global _listeners_installed
+
+    if not app.config.get('SPOT_INDEX_ENABLED'):
+        return
+
+    registry.ttl_seconds = app.config.get('SPOT_INDEX_TTL_SECONDS', DEFAULT_TTL_SECONDS)
+    if _listeners_installed:
+        return
+
+    event.listen(Session, 'after_flush', _collect_changes)
+    event.listen(Session, 'after_commit', _apply_changes)
+    event.listen(Session, 'after_rollback', _discard_changes)
+    _listeners_installed = True
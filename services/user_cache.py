@@ -0,0 +1,147 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Set, Tuple
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, make_transient_to_detached
+
+from extensions import db
+from models.models import User
+
+DEFAULT_TTL_SECONDS = 30
+DEFAULT_MAX_ENTRIES = 1024
+
+_SESSION_KEY = 'user_cache_stale'
+
+
+class SessionUserCache:
+    """Bounded LRU of session users' column values with a per-entry TTL.
+
+    Only plain values are stored, never ORM instances: every lookup builds a
+    fresh ``User`` and merges it into the current request's session without a
+    query, so templates and lazy loads always see an attached object. User
+    changes committed in this process evict the entry straight away; other
+    workers notice within ``ttl_seconds``.
+    """
+
+    def __init__(self, ttl_seconds: int = DEFAULT_TTL_SECONDS, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.enabled = True
+        self._entries: 'OrderedDict[int, Tuple[float, Dict[str, object]]]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._invalidations = 0
+
+    def _get(self, user_id: int) -> Optional[Dict[str, object]]:
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None and entry[0] > time.monotonic():
+                self._entries.move_to_end(user_id)
+                self._hits += 1
+                return entry[1]
+            if entry is not None:
+                del self._entries[user_id]
+            self._misses += 1
+            return None
+
+    def _set(self, user_id: int, values: Dict[str, object]) -> None:
+        with self._lock:
+            self._entries[user_id] = (time.monotonic() + self.ttl_seconds, values)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def load(self, user_id: int) -> Optional[User]:
+        if not self.enabled:
+            return db.session.get(User, user_id)
+
+        values = self._get(user_id)
+        if values is None:
+            user = db.session.get(User, user_id)
+            if user is not None:
+                self._set(user_id, {attr.key: getattr(user, attr.key) for attr in inspect(User).column_attrs})
+            return user
+
+        user = User(**values)
+        make_transient_to_detached(user)
+        # Reuses the instance already in this session's identity map, if any.
+        return db.session.merge(user, load=False)
+
+    def invalidate(self, user_id: int) -> None:
+        with self._lock:
+            if self._entries.pop(user_id, None) is not None:
+                self._invalidations += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                'enabled': self.enabled,
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl_seconds': self.ttl_seconds,
+                'hits': self._hits,
+                'misses': self._misses,
+                'hit_rate': round(self._hits / lookups, 4) if lookups else 0.0,
+                'evictions': self._evictions,
+                'invalidations': self._invalidations,
+            }
+
+
+user_cache = SessionUserCache()
+
+
+def load_session_user(user_id: int) -> Optional[User]:
+    """Flask-Login user loader backed by ``user_cache``."""
+    return user_cache.load(user_id)
+
+
+def invalidate_session_user(user_id: int) -> None:
+    user_cache.invalidate(user_id)
+
+
+def _collect_changes(session, flush_context) -> None:
+    # Profile edits, password resets and role changes all flush a dirty User.
+    for instance in (*session.dirty, *session.deleted):
+        if isinstance(instance, User) and instance.id is not None:
+            session.info.setdefault(_SESSION_KEY, set()).add(instance.id)
+
+
+def _invalidate_after_commit(session) -> None:
+    stale: Set[int] = session.info.pop(_SESSION_KEY, set())
+    for user_id in stale:
+        invalidate_session_user(user_id)
+
+
+def _discard_changes(session) -> None:
+    session.info.pop(_SESSION_KEY, None)
+
+
+_listeners_installed = False
+
+
+def init_user_cache(app) -> None:
+    """Configure ``user_cache`` from ``USER_CACHE_*`` settings."""
+    global _listeners_installed
+
+    user_cache.enabled = app.config.get('USER_CACHE_ENABLED', True)
+    user_cache.ttl_seconds = app.config.get('USER_CACHE_TTL_SECONDS', DEFAULT_TTL_SECONDS)
+    user_cache.max_entries = app.config.get('USER_CACHE_MAX_ENTRIES', DEFAULT_MAX_ENTRIES)
+    user_cache.clear()
+
+    if not user_cache.enabled or _listeners_installed:
+        return
+
+    event.listen(Session, 'after_flush', _collect_changes)
+    event.listen(Session, 'after_commit', _invalidate_after_commit)
+    event.listen(Session, 'after_rollback', _discard_changes)
+    _listeners_installed = True